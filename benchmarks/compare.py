@@ -0,0 +1,63 @@
+"""Compare two benchmark results files; fail on regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.15
+"""
+
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def compare(
+    baseline: dict, candidate: dict, threshold: float
+) -> tuple[list[str], list[str]]:
+    """Return (report lines, names of the regressed benchmarks).
+
+    A benchmark regressed if its median got slower by more than `threshold`
+    (a fraction).
+    """
+    lines = [f"{'benchmark':<40} {'baseline':>10} {'candidate':>10} {'change':>8}"]
+    regressions = []
+
+    base_res, cand_res = baseline["results"], candidate["results"]
+    for name in sorted(base_res.keys() | cand_res.keys()):
+        if name not in base_res or name not in cand_res:
+            lines.append(
+                f"{name:<40} (only in {'candidate' if name in cand_res else 'baseline'})"
+            )
+            continue
+        old, new = base_res[name]["median"], cand_res[name]["median"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        lines.append(f"{name:<40} {old:>10.4f} {new:>10.4f} {change:>+8.1%}{flag}")
+
+    return lines, regressions
+
+
+def main() -> None:
+    """Print the comparison; exit 1 if anything regressed."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    if baseline["meta"]["scale"] != candidate["meta"]["scale"]:
+        print("WARNING: the results were generated at different scales")
+
+    lines, regressions = compare(baseline, candidate, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Generate synthetic, reproducible MOU datasets.
+
+Records use the real WBS (`wbs.WORK_BREAKDOWN_STRUCTURES`) and the real
+`TableConfigCache` columns/dropdown options. The only thing synthesized is
+the list of institutions, which normally comes from KRS.
+"""
+
+
+import base64
+import dataclasses as dc
+import io
+import random
+import time
+from typing import Any
+
+import pandas as pd  # type: ignore[import]
+import universal_utils.constants as uuc
+import universal_utils.types as uut
+from rest_server.data_sources import columns, todays_institutions
+from rest_server.data_sources.mou_db import MOUDatabaseClient
+from rest_server.data_sources.table_config_cache import TableConfigCache
+
+
+@dc.dataclass(frozen=True)
+class Scale:
+    """How big of a dataset to generate."""
+
+    institutions: int = 50
+    rows: int = 2000  # per WBS
+    snapshots: int = 5  # per WBS
+    seed: int = 0
+
+
+def make_institutions(n: int) -> list[uut.Institution]:
+    """Make `n` institutions; roughly half are US."""
+    return [
+        uut.Institution(
+            short_name=f"Inst{i:03d}",
+            long_name=f"Synthetic Institution #{i}",
+            is_us=i % 2 == 0,
+            has_mou=True,
+            institution_lead_uid=f"lead{i}",
+        )
+        for i in range(n)
+    ]
+
+
+def override_krs(institutions: list[uut.Institution]) -> None:
+    """Make the `TableConfigCache` use these institutions instead of asking KRS."""
+
+    async def _overridden_krs() -> list[uut.Institution]:
+        return institutions
+
+    todays_institutions.request_krs_institutions = _overridden_krs
+
+
+async def make_tc_cache(institutions: list[uut.Institution]) -> TableConfigCache:
+    """Make a `TableConfigCache` with synthetic institutions."""
+    override_krs(institutions)
+    return await TableConfigCache.create()
+
+
+def make_record(
+    rand: random.Random,
+    tc_cache: TableConfigCache,
+    wbs_l1: str,
+    inst: uut.Institution,
+) -> uut.DBRecord:
+    """Make one valid, un-mongofied record (without on-the-fly fields)."""
+    l2 = rand.choice(tc_cache.get_l2_categories(wbs_l1))
+    record: uut.DBRecord = {
+        columns.WBS_L2: l2,
+        columns.WBS_L3: rand.choice(tc_cache.get_l3_categories_by_l2(wbs_l1, l2)),
+        columns.INSTITUTION: inst.short_name,
+        columns.LABOR_CAT: rand.choice(
+            tc_cache.get_simple_dropdown_menus(wbs_l1)[columns.LABOR_CAT]
+        ),
+        columns.NAME: f"Person{rand.randrange(10**6)}, Synthetic",
+        columns.TASK_DESCRIPTION: " ".join(
+            rand.choice(["calibrate", "monitor", "deploy", "review", "process"])
+            for _ in range(rand.randint(1, 12))
+        ),
+        columns.FTE: round(rand.uniform(0.05, 1.0), 2),
+    }
+    if wbs_l1 == "mo":
+        _, options = tc_cache.get_conditional_dropdown_menus(wbs_l1)[
+            columns.SOURCE_OF_FUNDS_US_ONLY
+        ]
+        record[columns.SOURCE_OF_FUNDS_US_ONLY] = rand.choice(
+            options[tc_cache.us_or_non_us(inst.short_name)]
+        )
+    return record
+
+
+def make_table(
+    tc_cache: TableConfigCache,
+    wbs_l1: str,
+    institutions: list[uut.Institution],
+    n_rows: int,
+    seed: int = 0,
+) -> uut.DBTable:
+    """Make a table of `n_rows` records, spread over the institutions."""
+    rand = random.Random(f"{seed}-{wbs_l1}")
+    return [
+        make_record(rand, tc_cache, wbs_l1, rand.choice(institutions))
+        for _ in range(n_rows)
+    ]
+
+
+def make_xlsx_base64(table: uut.DBTable) -> str:
+    """Make a base64-encoded xlsx file, like the web app uploads."""
+    buf = io.BytesIO()
+    pd.DataFrame(table).to_excel(buf, index=False)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+async def populate(
+    mou_db_client: MOUDatabaseClient,
+    wbs_l1: str,
+    institutions: list[uut.Institution],
+    scale: Scale,
+) -> None:
+    """Replace `wbs_l1`'s db with a synthetic live table & snapshots.
+
+    Between snapshots, ~1% of the records are edited.
+    """
+    tc_cache = mou_db_client.data_adaptor.tc_cache
+    table = make_table(tc_cache, wbs_l1, institutions, scale.rows, scale.seed)
+    await mou_db_client.ingest_xlsx(
+        wbs_l1, make_xlsx_base64(table), "synthetic.xlsx", "benchmark"
+    )
+
+    rand = random.Random(f"{scale.seed}-{wbs_l1}-edits")
+    for i in range(scale.snapshots):
+        live: list[dict[str, Any]] = await mou_db_client.get_table(
+            wbs_l1, uuc.LIVE_COLLECTION, "", ""
+        )
+        for record in rand.sample(live, k=max(1, len(live) // 100)):
+            record[columns.FTE] = round(rand.uniform(0.05, 1.0), 2)
+            for otf in tc_cache.get_on_the_fly_fields():
+                record.pop(otf, None)
+            await mou_db_client.upsert_record(wbs_l1, record, "benchmark")
+        await mou_db_client.snapshot_live_collection(
+            wbs_l1, f"Synthetic #{i}", "benchmark", admin_only=False
+        )
+        time.sleep(0.001)  # snapshot names are timestamps
@@ -0,0 +1,373 @@
+"""Time the hot paths on a synthetic dataset; write the results as JSON.
+
+    python -m benchmarks.run --rows 2000 --out results.json
+
+CPU-only benchmarks always run. Database benchmarks run against a local
+mongod (`--mongodb-url`); they are skipped if it is unreachable. The
+benchmarked databases (the WBS L1 names) are overwritten, so never point
+this at a production server.
+"""
+
+
+import argparse
+import asyncio
+import base64
+import copy
+import dataclasses as dc
+import functools
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, cast
+from unittest.mock import patch
+
+import pandas as pd  # type: ignore[import]
+import universal_utils.constants as uuc
+import universal_utils.types as uut
+from bson.objectid import ObjectId
+from universal_utils import columnar
+
+from . import generate
+
+# the web app needs its oidc config on import
+os.environ.setdefault(
+    "OIDC_CLIENT_SECRETS",
+    str(
+        Path(__file__).parent.parent
+        / "resources"
+        / "dummy_client_secrets_for_web_app.json"
+    ),
+)
+
+# pylint:disable=wrong-import-position,wrong-import-order
+from motor.motor_tornado import MotorClient  # noqa: E402
+from rest_server.data_sources import columns, mou_db  # noqa: E402
+from rest_server.utils import mongo_tools, utils  # noqa: E402
+from web_app.data_source import data_source as src  # noqa: E402
+from web_app.data_source import table_config as tc  # noqa: E402
+
+WBS_L1 = "mo"
+
+
+@dc.dataclass
+class Result:
+    """Timings for one benchmark, in seconds."""
+
+    name: str
+    repeat: int
+    n_items: int  # how many items (records) each repetition processed
+    min: float = 0.0
+    median: float = 0.0
+    mean: float = 0.0
+
+
+def _summarize(name: str, n_items: int, times: list[float]) -> Result:
+    res = Result(
+        name,
+        len(times),
+        n_items,
+        min=min(times),
+        median=statistics.median(times),
+        mean=statistics.fmean(times),
+    )
+    print(f"{name:<40} median={res.median:.4f}s  min={res.min:.4f}s  ({n_items=})")
+    return res
+
+
+def bench(name: str, func: Callable[[], Any], repeat: int, n_items: int) -> Result:
+    """Time a sync callable."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return _summarize(name, n_items, times)
+
+
+async def abench(
+    name: str, func: Callable[[], Awaitable[Any]], repeat: int, n_items: int
+) -> Result:
+    """Time an async callable."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        times.append(time.perf_counter() - start)
+    return _summarize(name, n_items, times)
+
+
+_Codec = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+def _as_is(body: dict[str, Any]) -> dict[str, Any]:
+    """Plain JSON's (lack of) encoding."""
+    return body
+
+
+def _round_trip(body: dict[str, Any], encode: _Codec, decode: _Codec) -> Any:
+    """Serialize (server) & parse (client) the body, like over the wire."""
+    return decode(json.loads(json.dumps(encode(body))))
+
+
+def cpu_benchmarks(
+    mou_data_adaptor: utils.MOUDataAdaptor, scale: generate.Scale, repeat: int
+) -> list[Result]:
+    """Benchmark the pure-python/CPU paths (no database)."""
+    tc_cache = mou_data_adaptor.tc_cache
+    insts = tc_cache.institutions
+    table = generate.make_table(tc_cache, WBS_L1, insts, scale.rows, scale.seed)
+    tc_adaptor = utils.TableConfigDataAdaptor(tc_cache)
+    full_table = [
+        tc_adaptor.add_on_the_fly_fields(
+            copy.deepcopy(r) | {columns.ID: str(ObjectId())}
+        )
+        for r in table
+    ]
+    mongo_table = [
+        mongo_tools.Mongofier.mongofy_document(
+            r | {columns.ID: ObjectId(str(r[columns.ID]))}
+        )
+        for r in full_table
+    ]
+    n = len(table)
+
+    results = [
+        bench(
+            "rest.mongofy_record",
+            lambda: [mou_data_adaptor.mongofy_record(WBS_L1, r) for r in table],
+            repeat,
+            n,
+        ),
+        bench(
+            "rest.validate_table",
+            lambda: tc_cache.get_record_validator(WBS_L1).validate_table(table),
+            repeat,
+            n,
+        ),
+        bench(
+            "rest.demongofy_record",
+            lambda: [mou_data_adaptor.demongofy_record(dict(r)) for r in mongo_table],
+            repeat,
+            n,
+        ),
+        bench(
+            "rest.add_on_the_fly_fields",
+            lambda: [tc_adaptor.add_on_the_fly_fields(dict(r)) for r in table],
+            repeat,
+            n,
+        ),
+        bench(
+            "rest.get_total_rows",
+            lambda: tc_adaptor.get_total_rows(WBS_L1, full_table),
+            repeat,
+            n,
+        ),
+        bench(
+            "rest.sort_table",
+            lambda: sorted(full_table, key=tc_cache.sort_key),
+            repeat,
+            n,
+        ),
+    ]
+
+    xlsx = generate.make_xlsx_base64(table)
+    results.append(
+        bench(
+            "rest.xlsx_decode_and_read",
+            lambda: pd.read_excel(io.BytesIO(base64.b64decode(xlsx))),
+            max(1, repeat // 5),
+            n,
+        )
+    )
+
+    # wire format: serialize (server) + parse (client), & the bytes between them
+    body: dict[str, Any] = {"table": full_table}
+    codecs: list[tuple[str, _Codec, _Codec]] = [
+        ("json", _as_is, _as_is),
+        ("columnar", columnar.encode_tables, columnar.decode_tables),
+    ]
+    for name, encode, decode in codecs:
+        size = len(json.dumps(encode(body)))
+        logging.info(f"wire.{name}: {size} bytes for {n} records")
+        results.append(
+            bench(
+                f"wire.{name}_round_trip",
+                functools.partial(_round_trip, body, encode, decode),
+                repeat,
+                n,
+            )
+        )
+
+    # web app: served by the REST server's config, without the REST call
+    web_table = cast(uut.WebTable, full_table)  # its IDs are strs
+    configs = {
+        l1: tc._WBSTableCache(**tc_cache.get_table_config(l1))  # pylint:disable=W0212
+        for l1 in [WBS_L1]
+    }
+    with patch.object(
+        tc.TableConfigParser, "_cached_get_configs", staticmethod(lambda: configs)
+    ):
+        tconfig = tc.TableConfigParser(WBS_L1)
+        results += [
+            bench(
+                "web.convert_table_rest_to_dash",
+                lambda: src._convert_table_rest_to_dash(  # pylint:disable=W0212
+                    [dict(r) for r in web_table], tconfig
+                ),
+                repeat,
+                n,
+            ),
+            bench(
+                "web.remove_invalid_data",
+                lambda: [
+                    src._remove_invalid_data(dict(r), tconfig)  # pylint:disable=W0212
+                    for r in web_table
+                ],
+                repeat,
+                n,
+            ),
+        ]
+
+    return results
+
+
+async def db_benchmarks(
+    mongodb_url: str,
+    mou_data_adaptor: utils.MOUDataAdaptor,
+    scale: generate.Scale,
+    repeat: int,
+) -> list[Result]:
+    """Benchmark `MOUDatabaseClient` against a real mongod."""
+    motor_client: Any = MotorClient(mongodb_url, serverSelectionTimeoutMS=2000)
+    try:
+        await motor_client.server_info()
+    except Exception as e:  # pylint:disable=broad-except
+        logging.warning(f"Skipping database benchmarks, no mongod ({e})")
+        return []
+
+    client = mou_db.MOUDatabaseClient(motor_client, mou_data_adaptor)
+    tc_cache = mou_data_adaptor.tc_cache
+    insts = tc_cache.institutions
+
+    start = time.perf_counter()
+    await generate.populate(client, WBS_L1, insts, scale)
+    populated = _summarize("db.populate", scale.rows, [time.perf_counter() - start])
+
+    inst = insts[0].short_name
+    table = generate.make_table(tc_cache, WBS_L1, insts, scale.rows, scale.seed)
+    xlsx = generate.make_xlsx_base64(table)
+    live = await client.get_table(WBS_L1, uuc.LIVE_COLLECTION, "", "")
+    record = {
+        k: v for k, v in live[0].items() if k not in tc_cache.get_on_the_fly_fields()
+    }
+    n = len(live)
+
+    results = [
+        populated,
+        await abench(
+            "db.get_table",
+            lambda: client.get_table(WBS_L1, uuc.LIVE_COLLECTION, "", ""),
+            repeat,
+            n,
+        ),
+        await abench(
+            "db.get_table.institution",
+            lambda: client.get_table(WBS_L1, uuc.LIVE_COLLECTION, "", inst),
+            repeat,
+            n,
+        ),
+        await abench(
+            "db.upsert_record",
+            lambda: client.upsert_record(WBS_L1, dict(record), "benchmark"),
+            repeat,
+            1,
+        ),
+        await abench(
+            "db.list_snapshot_timestamps",
+            lambda: client.list_snapshot_timestamps(WBS_L1, exclude_admin_snaps=True),
+            repeat,
+            scale.snapshots,
+        ),
+        await abench(
+            "db.snapshot_live_collection",
+            lambda: client.snapshot_live_collection(
+                WBS_L1, "bench", "benchmark", admin_only=True
+            ),
+            max(1, repeat // 5),
+            n,
+        ),
+        await abench(
+            "db.ingest_xlsx",
+            lambda: client.ingest_xlsx(WBS_L1, xlsx, "bench.xlsx", "benchmark"),
+            max(1, repeat // 5),
+            scale.rows,
+        ),
+    ]
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:  # pylint:disable=broad-except
+        return ""
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run all the benchmarks."""
+    scale = generate.Scale(args.institutions, args.rows, args.snapshots, args.seed)
+    tc_cache = await generate.make_tc_cache(
+        generate.make_institutions(scale.institutions)
+    )
+    mou_data_adaptor = utils.MOUDataAdaptor(tc_cache)
+
+    results = cpu_benchmarks(mou_data_adaptor, scale, args.repeat)
+    if not args.skip_db:
+        results += await db_benchmarks(
+            args.mongodb_url, mou_data_adaptor, scale, args.repeat
+        )
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "scale": dc.asdict(scale),
+            "repeat": args.repeat,
+        },
+        "results": {r.name: dc.asdict(r) for r in results},
+    }
+
+
+def main() -> None:
+    """Parse args, run, and write out results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--institutions", type=int, default=generate.Scale.institutions)
+    parser.add_argument("--rows", type=int, default=generate.Scale.rows)
+    parser.add_argument("--snapshots", type=int, default=generate.Scale.snapshots)
+    parser.add_argument("--seed", type=int, default=generate.Scale.seed)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    parser.add_argument("--skip-db", action="store_true", help="CPU benchmarks only")
+    parser.add_argument("--out", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("-l", "--log", default="WARNING")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log.upper())
+
+    output = asyncio.run(run(args))
+    args.out.write_text(json.dumps(output, indent=2))
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,35 +3,144 @@
 
 import argparse
 import asyncio
+import contextlib
 import dataclasses as dc
 import json
 import logging
-from urllib.parse import quote_plus
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Coroutine, Iterator
 
 import coloredlogs  # type: ignore[import]
+import tornado.httpserver
+import tornado.netutil
+import tornado.web
 import universal_utils.types as uut
 from motor.motor_tornado import MotorClient
 from rest_tools.server import RestHandlerSetup, RestServer
 
-from .config import ENV
-from .data_sources import mou_db, table_config_cache, todays_institutions
+from .config import ENV, mongodb_client_kwargs, mongodb_url
+from .data_sources import mou_db, table_config_cache, todays_institutions, wbs
 from .routes import (
+    ChangesHandler,
     InstitutionStaticHandler,
     InstitutionValuesConfirmationHandler,
     InstitutionValuesConfirmationTouchstoneHandler,
     InstitutionValuesHandler,
+    JobHandler,
     MainHandler,
     MakeSnapshotHandler,
+    MetricsHandler,
     RecordHandler,
     SnapshotsHandler,
     TableConfigHandler,
     TableHandler,
+    TableTotalsHandler,
+    TableXlsxHandler,
 )
-from .utils import utils
+from .utils import (
+    admission,
+    invalidation_bus,
+    metrics,
+    offload,
+    response_cache,
+    utils,
+)
+
+
+_BACKGROUND_TASKS: set[asyncio.Task[None]] = set()  # strong refs, see asyncio docs
+
+
+def _run_in_background(coro: Coroutine[Any, Any, None]) -> None:
+    task = asyncio.create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+@contextlib.contextmanager
+def _log_phase(phase: str) -> Iterator[None]:
+    """Log how long a startup phase took."""
+    start = time.monotonic()
+    logging.info(f"Startup: {phase}...")
+    yield
+    logging.info(f"Startup: {phase} took {time.monotonic() - start:.2f}s")
+
+
+async def archive_snapshots_periodically(
+    mou_db_client: mou_db.MOUDatabaseClient,
+) -> None:
+    """Archive the cold snapshots of every WBS, forever."""
+    while True:
+        for wbs_db in wbs.WORK_BREAKDOWN_STRUCTURES:
+            try:
+                await mou_db_client.archive_snapshots(
+                    wbs_db, ENV.MOU_ARCHIVE_SNAPSHOTS_AFTER_DAYS * 24 * 60 * 60
+                )
+            except Exception:  # pylint:disable=broad-except
+                logging.exception(f"Failed to archive snapshots ({wbs_db=})")
+        await asyncio.sleep(ENV.MOU_ARCHIVE_INTERVAL_HOURS * 60 * 60)
+
+
+async def check_totals_periodically(
+    mou_db_client: mou_db.MOUDatabaseClient,
+) -> None:
+    """Check (and fix) every WBS's materialized live totals, forever."""
+    while True:
+        for wbs_db in wbs.WORK_BREAKDOWN_STRUCTURES:
+            try:
+                await mou_db_client.check_totals(wbs_db)
+            except Exception:  # pylint:disable=broad-except
+                logging.exception(f"Failed to check live totals ({wbs_db=})")
+        await asyncio.sleep(ENV.MOU_TOTALS_CHECK_INTERVAL_HOURS * 60 * 60)
+
+
+async def check_live_cache_periodically(
+    mou_db_client: mou_db.MOUDatabaseClient,
+) -> None:
+    """Check (and drop) every WBS's cached live table, forever."""
+    while True:
+        await asyncio.sleep(ENV.MOU_LIVE_CACHE_CHECK_SECS)
+        for wbs_db in wbs.WORK_BREAKDOWN_STRUCTURES:
+            try:
+                await mou_db_client.check_live_cache(wbs_db)
+            except Exception:  # pylint:disable=broad-except
+                logging.exception(f"Failed to check cached live table ({wbs_db=})")
+
+
+async def shutdown(server: RestServer, mou_db_client: mou_db.MOUDatabaseClient) -> None:
+    """Stop serving, write out the pending writes, then stop the event loop."""
+    logging.warning("Shutting down...")
+    try:
+        await server.stop()
+        await mou_db_client.flush_pending_writes()
+        mou_db_client.offload.shutdown()
+    finally:
+        asyncio.get_running_loop().stop()
+
+
+def _startup_on_sockets(server: RestServer, sockets: list[socket.socket]) -> None:
+    """Like `RestServer.startup()`, but on already-bound (shared) sockets."""
+    logging.warning(f"tornado listening on {len(sockets)} shared socket(s)")
+    app = tornado.web.Application(server.routes, **server.app_args)
+    server.http_server = tornado.httpserver.HTTPServer(
+        app, xheaders=True, max_body_size=server.max_body_size
+    )
+    server.http_server.add_sockets(sockets)
+
 
+async def start(
+    debug: bool = False,
+    sockets: list[socket.socket] | None = None,
+    is_first_worker: bool = True,
+) -> RestServer:
+    """Start a Mad Dash REST service.
 
-async def start(debug: bool = False) -> RestServer:
-    """Start a Mad Dash REST service."""
+    With `sockets`, this is one of several pre-forked workers: only the
+    first worker runs the database-wide jobs (indexes, archiving).
+    """
     for field in dc.fields(ENV):
         logging.info(
             f"{field.name}\t{getattr(ENV, field.name)}\t({type(getattr(ENV, field.name)).__name__})"
@@ -48,24 +157,76 @@ async def start(debug: bool = False) -> RestServer:
     )
 
     # Setup Mongo
-    mongodb_auth_user = quote_plus(ENV.MOU_MONGODB_AUTH_USER)
-    mongodb_auth_pass = quote_plus(ENV.MOU_MONGODB_AUTH_PASS)
-    mongodb_url = f"mongodb://{ENV.MOU_MONGODB_HOST}:{ENV.MOU_MONGODB_PORT}"
-    if mongodb_auth_user and mongodb_auth_pass:
-        mongodb_url = f"mongodb://{mongodb_auth_user}:{mongodb_auth_pass}@{ENV.MOU_MONGODB_HOST}:{ENV.MOU_MONGODB_PORT}"
+    with _log_phase("table-config cache"):
+        tc_cache = await table_config_cache.TableConfigCache.create()
+    motor_client: MotorClient = MotorClient(  # type: ignore[valid-type]
+        mongodb_url(),
+        event_listeners=[
+            metrics.MongoCommandListener(),
+            metrics.MongoPoolListener(),
+        ],
+        **mongodb_client_kwargs(),
+    )
+    bus = None
+    if ENV.MOU_INVALIDATION_BUS or ENV.MOU_REST_WORKERS != 1:
+        bus = invalidation_bus.InvalidationBus(motor_client)
+        await bus.ensure_collection()
+        _run_in_background(bus.listen())
     mou_db_client = mou_db.MOUDatabaseClient(
-        MotorClient(mongodb_url),
-        utils.MOUDataAdaptor(await table_config_cache.TableConfigCache.create()),
+        motor_client, utils.MOUDataAdaptor(tc_cache), bus
     )
-    await mou_db_client._ensure_all_db_indexes()
+    await mou_db_client.jobs.ensure_indexes()
+
+    async def reconcile_indexes() -> None:
+        with _log_phase("index reconciliation"):
+            await mou_db_client._ensure_all_db_indexes(ENV.MOU_INDEX_CONCURRENCY)
+        with _log_phase("index advisor"):
+            await mou_db_client.log_index_advice()
+
+    if is_first_worker:
+        if ENV.MOU_INDEX_IN_BACKGROUND:
+            _run_in_background(reconcile_indexes())
+        else:
+            await reconcile_indexes()
+        if ENV.MOU_ARCHIVE_SNAPSHOTS_AFTER_DAYS > 0:
+            _run_in_background(archive_snapshots_periodically(mou_db_client))
+        if ENV.MOU_TOTALS_CHECK_INTERVAL_HOURS > 0:
+            _run_in_background(check_totals_periodically(mou_db_client))
+    if ENV.MOU_LIVE_CACHE and ENV.MOU_LIVE_CACHE_CHECK_SECS > 0:  # every worker's
+        _run_in_background(check_live_cache_periodically(mou_db_client))
+    if ENV.MOU_LOOP_LAG_INTERVAL_SECS > 0:
+        _run_in_background(
+            offload.monitor_loop_lag(
+                ENV.MOU_LOOP_LAG_INTERVAL_SECS, ENV.MOU_LOOP_LAG_WARN_SECS
+            )
+        )
     args["mou_db_client"] = mou_db_client
+    args["gates"] = {
+        name: admission.Gate(name, limit, ENV.MOU_ADMIT_QUEUE)
+        for name, limit in [
+            (admission.TOTALS, ENV.MOU_ADMIT_TOTALS),
+            (admission.IMPORTS, ENV.MOU_ADMIT_IMPORTS),
+            (admission.SNAPSHOTS, ENV.MOU_ADMIT_SNAPSHOTS),
+            (admission.SNAPSHOT_LISTS, ENV.MOU_ADMIT_SNAPSHOT_LISTS),
+        ]
+        if limit > 0
+    }
+    if ENV.MOU_RESPONSE_CACHE_MB > 0:
+        args["response_cache"] = response_cache.ResponseCache(
+            int(ENV.MOU_RESPONSE_CACHE_MB * 1024 * 1024)
+        )
 
     # Configure REST Routes
     server = RestServer(debug=debug)
     server.add_route(MainHandler.ROUTE, MainHandler, args)  # get
+    server.add_route(MetricsHandler.ROUTE, MetricsHandler, args)  # get
     server.add_route(TableHandler.ROUTE, TableHandler, args)  # get, post
+    server.add_route(TableXlsxHandler.ROUTE, TableXlsxHandler, args)  # post
+    server.add_route(TableTotalsHandler.ROUTE, TableTotalsHandler, args)  # get
     server.add_route(SnapshotsHandler.ROUTE, SnapshotsHandler, args)  # get
     server.add_route(MakeSnapshotHandler.ROUTE, MakeSnapshotHandler, args)  # post
+    server.add_route(JobHandler.ROUTE, JobHandler, args)  # get
+    server.add_route(ChangesHandler.ROUTE, ChangesHandler, args)  # get
     server.add_route(RecordHandler.ROUTE, RecordHandler, args)  # post, delete
     server.add_route(TableConfigHandler.ROUTE, TableConfigHandler, args)  # get
     server.add_route(  # post, get
@@ -89,14 +250,99 @@ async def start(debug: bool = False) -> RestServer:
         args,
     )
 
-    server.startup(address=ENV.MOU_REST_HOST, port=ENV.MOU_REST_PORT)
+    with _log_phase("server startup"):
+        if sockets:
+            _startup_on_sockets(server, sockets)
+        else:
+            server.startup(address=ENV.MOU_REST_HOST, port=ENV.MOU_REST_PORT)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(
+            sig, lambda: _run_in_background(shutdown(server, mou_db_client))
+        )
     return server
 
 
+def _fork_workers(num_workers: int, max_restarts: int = 100) -> int:
+    """Fork the workers, then return each one's ID (0, 1, ...) in it.
+
+    Like `tornado.process.fork_processes()`, the parent process restarts
+    workers that die -- but it also forwards SIGTERM/SIGINT to them, then
+    waits for them to shut down (& so, flush their pending writes), and
+    exits.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    workers: dict[int, int] = {}  # pid -> worker ID
+    stopping = False
+    stop_signals = {signal.SIGINT, signal.SIGTERM}
+
+    def forward(signum: int, _: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        logging.warning(f"Got signal {signum}, stopping the workers...")
+        for pid in list(workers):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signum)
+
+    def fork(worker_id: int) -> bool:
+        """Fork a worker; return whether this is it."""
+        # a signal mustn't reach a new worker before its handlers are reset
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+        try:
+            if not (pid := os.fork()):
+                for sig in stop_signals:
+                    signal.signal(sig, signal.SIG_DFL)
+                return True
+            workers[pid] = worker_id
+            return False
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+
+    for sig in stop_signals:
+        signal.signal(sig, forward)
+    for worker_id in range(num_workers):
+        if fork(worker_id):
+            return worker_id
+
+    restarts = 0
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if (worker_id := workers.pop(pid, -1)) < 0:
+            continue
+        if stopping:
+            logging.info(f"Worker #{worker_id} stopped ({pid=}, {status=})")
+            continue
+        logging.warning(f"Worker #{worker_id} died ({pid=}, {status=}), restarting")
+        if (restarts := restarts + 1) > max_restarts:
+            raise RuntimeError("Too many worker restarts, giving up")
+        if fork(worker_id):
+            return worker_id
+    sys.exit(0)
+
+
 def main() -> None:
-    """Configure logging and start a MOU data service."""
+    """Configure logging and start a MOU data service.
+
+    With multiple workers, the listening socket is bound first, then the
+    workers are forked (before any event loop or database client exists).
+    The parent process restarts workers that die, & relays SIGTERM/SIGINT
+    to them (see `_fork_workers()`).
+    """
+    sockets, task_id = None, None
+    if ENV.MOU_REST_WORKERS != 1:
+        sockets = tornado.netutil.bind_sockets(
+            ENV.MOU_REST_PORT, address=ENV.MOU_REST_HOST, family=socket.AF_INET
+        )
+        task_id = _fork_workers(ENV.MOU_REST_WORKERS)
+        logging.info(f"Started worker #{task_id} ({os.getpid()=})")
+
     loop = asyncio.get_event_loop()
-    loop.run_until_complete(start(debug=True))
+    loop.run_until_complete(
+        start(debug=True, sockets=sockets, is_first_worker=not task_id)
+    )
     loop.run_forever()
 
 
@@ -1,7 +1,10 @@
 """Config settings."""
 
 import dataclasses as dc
+from typing import Any
+from urllib.parse import quote_plus
 
+from pymongo.read_preferences import read_pref_mode_from_name
 from wipac_dev_tools import from_environment_as_dataclass
 
 # --------------------------------------------------------------------------------------
@@ -21,17 +24,115 @@ class EnvConfig:
     MOU_MONGODB_AUTH_PASS: str = ""  # empty means no authentication required
     MOU_MONGODB_HOST: str = "localhost"
     MOU_MONGODB_PORT: int = 27017
+    # a full connection string, ex: "mongodb://h1,h2,h3/?replicaSet=rs0",
+    # overrides MOU_MONGODB_HOST & MOU_MONGODB_PORT (credentials are still used)
+    MOU_MONGODB_URI: str = ""
+    MOU_MONGODB_MIN_POOL_SIZE: int = 0
+    MOU_MONGODB_MAX_POOL_SIZE: int = 100
+    MOU_MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 0  # 0 means wait forever
+    # wire compression, in order of preference, ex: "zstd,snappy,zlib"
+    # (zstd & snappy need the 'zstandard' & 'python-snappy' packages)
+    MOU_MONGODB_COMPRESSORS: str = ""
+    # where to read immutable snapshots from, ex: "secondaryPreferred"
+    # (the live collection is always read from the primary)
+    MOU_MONGODB_SNAPSHOT_READ_PREFERENCE: str = "primary"
+    # index reconciliation at startup
+    MOU_INDEX_CONCURRENCY: int = 8  # collections at a time
+    MOU_INDEX_IN_BACKGROUND: bool = False  # True: don't wait before serving
+
+    # how new snapshots are stored: "full" copies or "delta"s (see `snapshot_deltas`)
+    MOU_SNAPSHOT_FORMAT: str = "full"
+    MOU_SNAPSHOT_KEYFRAME_INTERVAL: int = 20  # max deltas in a row
+    MOU_SNAPSHOT_CACHE_SIZE: int = 16  # reconstructed snapshots kept in memory
+    # move snapshots older than this into the compressed archive (0 means never)
+    MOU_ARCHIVE_SNAPSHOTS_AFTER_DAYS: float = 0.0
+    MOU_ARCHIVE_INTERVAL_HOURS: float = 24.0  # how often to look for them
+    # how often to re-sum the live totals from scratch, fixing any drift
+    # (0 means never -- they're still built when first needed)
+    MOU_TOTALS_CHECK_INTERVAL_HOURS: float = 24.0
+    # keep each WBS's live table in memory, written through by edits (per process)
+    MOU_LIVE_CACHE: bool = True
+    # how often to compare it to MongoDB, dropping it if it was changed around
+    # the server, ex: by hand (0 means never)
+    MOU_LIVE_CACHE_CHECK_SECS: float = 60.0
 
     MOU_REST_HOST: str = "localhost"
     MOU_REST_PORT: int = 8080
+    MOU_REST_WORKERS: int = 1  # processes sharing the port (0 means one per CPU)
+    # tell every process about writes (always on with multiple workers),
+    # also needed if there are multiple replicas (ex: containers)
+    MOU_INVALIDATION_BUS: bool = False
+
+    # batch institutions' "last edit" updates for this long (0 means write-through)
+    # -- only in a single process: with an invalidation bus (ex: multiple
+    # workers), they're written through so every process reads its own writes
+    MOU_LAST_EDIT_FLUSH_SECS: float = 2.0
+    # the longest a client can wait on `/changes/` for the next change
+    MOU_CHANGES_MAX_WAIT_SECS: float = 30.0
+
+    # CPU-heavy work: parsing in processes (0 means use threads), lighter work
+    # on big tables (at least MOU_OFFLOAD_MIN_ROWS) in threads (0 means inline)
+    MOU_OFFLOAD_PROCESSES: int = 1  # per worker
+    MOU_OFFLOAD_THREADS: int = 4  # per worker
+    MOU_OFFLOAD_MIN_ROWS: int = 2000
+    # how often to measure the event loop's lag (0 means never), & when to warn
+    MOU_LOOP_LAG_INTERVAL_SECS: float = 0.5
+    MOU_LOOP_LAG_WARN_SECS: float = 0.25
+
+    # background jobs (imports & snapshots): a running job's state is updated
+    # at least this often, else it's reported as abandoned (after 3 misses)
+    MOU_JOB_HEARTBEAT_SECS: float = 10.0
+    MOU_JOBS_KEEP_DAYS: float = 30.0  # finished jobs
+
+    # admission control, per worker: how many of each kind of expensive request
+    # run at once (0 means no limit), how many more can wait for a slot, & when
+    # those turned away (503) should retry
+    MOU_ADMIT_TOTALS: int = 4  # tables with total rows
+    MOU_ADMIT_IMPORTS: int = 2  # xlsx imports (the job holds the slot)
+    MOU_ADMIT_SNAPSHOTS: int = 2  # making snapshots
+    MOU_ADMIT_SNAPSHOT_LISTS: int = 8
+    MOU_ADMIT_QUEUE: int = 16  # per kind
+    MOU_ADMIT_RETRY_AFTER_SECS: int = 5
+
+    # the biggest xlsx file that can be uploaded (streamed) to `/table/xlsx/`
+    MOU_XLSX_MAX_MB: float = 100.0
+
+    # encoded GET responses kept until their data changes (0 means no caching)
+    MOU_RESPONSE_CACHE_MB: float = 64.0
+
+    # profile authorized requests sent w/ the `PROFILE_HEADER` (empty means disabled)
+    MOU_PROFILE_DIR: str = ""
 
     CI_TEST: bool = False
 
+    def __post_init__(self) -> None:
+        try:
+            read_pref_mode_from_name(self.MOU_MONGODB_SNAPSHOT_READ_PREFERENCE)
+        except ValueError:
+            raise ValueError(
+                f"Invalid MOU_MONGODB_SNAPSHOT_READ_PREFERENCE: "
+                f"{self.MOU_MONGODB_SNAPSHOT_READ_PREFERENCE!r}"
+            )
+        if self.MOU_SNAPSHOT_FORMAT not in ("full", "delta"):
+            raise ValueError(
+                f"MOU_SNAPSHOT_FORMAT must be 'full' or 'delta', "
+                f"not {self.MOU_SNAPSHOT_FORMAT!r}"
+            )
+
 
 ENV = from_environment_as_dataclass(EnvConfig)
 
 AUTH_SERVICE_ACCOUNT = "mou-service-account"
 
+PROFILE_HEADER = "X-MOU-Profile"
+
+# the server's own databases (see `invalidation_bus` & `jobs`)
+BUS_DB = "mou_invalidation_bus"
+JOBS_DB = "mou_jobs"
+# each WBS's auxiliary databases (see `snapshot_archive` & `materialized_totals`)
+ARCHIVE_DB_SUFFIX = "-archive"
+TOTALS_DB_SUFFIX = "-totals"
+
 EXCLUDE_DBS = [
     "system.indexes",
     "production",
@@ -40,11 +141,46 @@ EXCLUDE_DBS = [
     "config",
     "token_service",
     "admin",
+    BUS_DB,
+    JOBS_DB,
+]
+
+# each WBS's auxiliary databases (`{wbs_db}{suffix}`), not WBS data
+EXCLUDE_DB_SUFFIXES = [
+    ARCHIVE_DB_SUFFIX,
+    TOTALS_DB_SUFFIX,
 ]
 
 EXCLUDE_COLLECTIONS = ["system.indexes"]
 
 
+def mongodb_url() -> str:
+    """Get the MongoDB url, with credentials if given."""
+    if ENV.MOU_MONGODB_URI:
+        return ENV.MOU_MONGODB_URI  # credentials: see `mongodb_client_kwargs()`
+    mongodb_auth_user = quote_plus(ENV.MOU_MONGODB_AUTH_USER)
+    mongodb_auth_pass = quote_plus(ENV.MOU_MONGODB_AUTH_PASS)
+    if mongodb_auth_user and mongodb_auth_pass:
+        return f"mongodb://{mongodb_auth_user}:{mongodb_auth_pass}@{ENV.MOU_MONGODB_HOST}:{ENV.MOU_MONGODB_PORT}"
+    return f"mongodb://{ENV.MOU_MONGODB_HOST}:{ENV.MOU_MONGODB_PORT}"
+
+
+def mongodb_client_kwargs() -> dict[str, Any]:
+    """Get the MongoDB client's connection-pool, compression, etc. options."""
+    kwargs: dict[str, Any] = {
+        "minPoolSize": ENV.MOU_MONGODB_MIN_POOL_SIZE,
+        "maxPoolSize": ENV.MOU_MONGODB_MAX_POOL_SIZE,
+    }
+    if ENV.MOU_MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+        kwargs["waitQueueTimeoutMS"] = ENV.MOU_MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if ENV.MOU_MONGODB_COMPRESSORS:
+        kwargs["compressors"] = ENV.MOU_MONGODB_COMPRESSORS
+    if ENV.MOU_MONGODB_URI and ENV.MOU_MONGODB_AUTH_USER:
+        kwargs["username"] = ENV.MOU_MONGODB_AUTH_USER
+        kwargs["password"] = ENV.MOU_MONGODB_AUTH_PASS
+    return kwargs
+
+
 def is_testing() -> bool:
     """Return true if this is the test environment.
 
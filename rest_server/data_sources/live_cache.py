@@ -0,0 +1,145 @@
+"""An in-memory, write-through copy of each WBS's live table.
+
+The live records (demongofied, non-deleted) are kept by institution, then
+by ID, so a read -- of the whole table, or of an institution's -- doesn't
+touch MongoDB. MongoDB is still the source of truth: `MOUDatabaseClient`
+writes a record there first, then here. Any change this process didn't
+make itself (ex: another process's edit, heard on the invalidation bus)
+invalidates the institution, or the whole WBS, so it's reloaded on the
+next read.
+"""
+
+
+import collections
+from typing import Any, Iterator
+
+import universal_utils.types as uut
+
+from . import columns
+
+# what's compared to spot changes made around the server -- by ID:
+# (institution, last-edit timestamp)
+Fingerprint = dict[str, tuple[Any, Any]]
+
+
+def _id(record: uut.DBRecord) -> str:
+    return str(record[columns.ID])
+
+
+def _institution(record: uut.DBRecord) -> str:
+    return str(record.get(columns.INSTITUTION) or "")
+
+
+def fingerprint(records: list[uut.DBRecord]) -> Fingerprint:
+    """Get the (demongofied) records' fingerprint."""
+    return {_id(r): (_institution(r), r.get(columns.TIMESTAMP) or "") for r in records}
+
+
+class LiveCache:
+    """Every WBS's live records, by institution & ID."""
+
+    def __init__(self) -> None:
+        self._tables: dict[str, dict[str, dict[str, uut.DBRecord]]] = {}
+        self._stale: dict[str, set[str]] = {}  # institutions to reload
+        # bumped by every change, so a load that raced one isn't kept
+        self._generations: collections.Counter[str] = collections.Counter()
+
+    def generation(self, wbs_db: str) -> int:
+        """Get the WBS's generation, to pass to `load()` after reading MongoDB."""
+        return self._generations[wbs_db]
+
+    def to_load(self, wbs_db: str, institution: str) -> set[str] | None:
+        """Get the institutions to (re)load for a read; None means the whole WBS."""
+        if wbs_db not in self._tables:
+            return None
+        if institution:
+            return self._stale[wbs_db] & {institution}
+        return set(self._stale[wbs_db])
+
+    def load(
+        self,
+        wbs_db: str,
+        records: list[uut.DBRecord],
+        generation: int,
+        institution: str | None = None,
+    ) -> bool:
+        """Keep the records read from MongoDB -- all, or only the institution's.
+
+        They're not kept if anything changed since `generation`. Return
+        whether they were kept.
+        """
+        if generation != self._generations[wbs_db]:
+            return False
+
+        if institution is None:
+            table: dict[str, dict[str, uut.DBRecord]] = {}
+            for record in records:
+                table.setdefault(_institution(record), {})[_id(record)] = record
+            self._tables[wbs_db] = table
+            self._stale[wbs_db] = set()
+        elif wbs_db in self._tables:
+            self._tables[wbs_db][institution] = {_id(r): r for r in records}
+            self._stale[wbs_db].discard(institution)
+        else:
+            return False
+        return True
+
+    def _matching(
+        self, wbs_db: str, labor: str, institution: str
+    ) -> Iterator[uut.DBRecord] | None:
+        if self.to_load(wbs_db, institution) != set():
+            return None
+        table = self._tables[wbs_db]
+        subs = [table.get(institution, {})] if institution else list(table.values())
+        return (
+            r
+            for sub in subs
+            for r in sub.values()
+            if not labor or r.get(columns.LABOR_CAT) == labor
+        )
+
+    def get(self, wbs_db: str, labor: str, institution: str) -> uut.DBTable | None:
+        """Get (copies of) the matching records, or None if they're not cached."""
+        if (matching := self._matching(wbs_db, labor, institution)) is None:
+            return None
+        return [dict(r) for r in matching]  # callers add/remove fields
+
+    def count(self, wbs_db: str, labor: str, institution: str) -> int | None:
+        """Count the matching records, or None if they're not cached."""
+        if (matching := self._matching(wbs_db, labor, institution)) is None:
+            return None
+        return sum(1 for _ in matching)
+
+    def put(self, wbs_db: str, record: uut.DBRecord, deleted: bool) -> None:
+        """Write the record through, after it was written to MongoDB."""
+        self._generations[wbs_db] += 1
+        if (table := self._tables.get(wbs_db)) is None:
+            return
+
+        record_id, inst = _id(record), _institution(record)
+        for name, sub in table.items():  # it may have moved from another one
+            if name != inst:
+                sub.pop(record_id, None)
+        if deleted:
+            table.get(inst, {}).pop(record_id, None)
+        else:
+            table.setdefault(inst, {})[record_id] = record
+
+    def invalidate(self, wbs_db: str, institution: str = "") -> None:
+        """Forget the institution's records (blank: the whole WBS's)."""
+        self._generations[wbs_db] += 1
+        if institution and wbs_db in self._tables:
+            self._stale[wbs_db].add(institution)
+        else:
+            self._tables.pop(wbs_db, None)
+            self._stale.pop(wbs_db, None)
+
+    def fingerprint(self, wbs_db: str) -> Fingerprint | None:
+        """Get the cached records' fingerprint, or None if they're not all cached."""
+        if (matching := self._matching(wbs_db, "", "")) is None:
+            return None
+        return fingerprint(list(matching))
+
+    def is_loaded(self, wbs_db: str) -> bool:
+        """Return whether the WBS's records are cached (maybe not all)."""
+        return wbs_db in self._tables
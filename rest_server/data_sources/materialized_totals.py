@@ -0,0 +1,110 @@
+"""Incrementally maintained FTE totals for the live collection.
+
+The live records' FTEs are summed into buckets -- one per (institution,
+L2, L3, source of funds) -- all in one document per WBS. Each record
+write `$inc`s the old & new record's buckets by the difference, so
+totals are read from one document instead of being summed from every
+record. The buckets can be turned back into (pseudo-)records, one per
+bucket, for `TableConfigDataAdaptor.get_total_rows()`.
+
+A record write is marked pending in the document before it's made, and
+unmarked with its `$inc`; both bump the document's version. A rebuild
+from scratch is only stored if no write was pending and the version is
+unchanged, so it can't lose (or double) a concurrent write's `$inc`.
+"""
+
+
+import json
+import time
+from decimal import Decimal
+from typing import Any, Final, Iterable
+
+import universal_utils.types as uut
+
+from ..config import TOTALS_DB_SUFFIX
+from . import columns
+
+TOTALS_COLLECTION: Final[str] = "live"
+DOC_ID: Final[str] = "fte_buckets"
+BUCKETS: Final[str] = "buckets"  # the document's field
+# the document's other fields -- see `MOUDatabaseClient.rebuild_totals()`
+BUILT: Final[str] = "built"  # only then are the buckets complete
+VERSION: Final[str] = "version"  # bumped by every write
+PENDING: Final[str] = "pending"  # the in-flight record writes' start times
+PENDING_STALE_SECS: Final[float] = 60.0  # a write this old was abandoned
+
+# the (human-friendly) columns each bucket is keyed by
+BUCKET_COLUMNS: Final[tuple[str, ...]] = (
+    columns.INSTITUTION,
+    columns.WBS_L2,
+    columns.WBS_L3,
+    columns.SOURCE_OF_FUNDS_US_ONLY,
+)
+
+Bucket = tuple[str, ...]  # values of `BUCKET_COLUMNS`
+Buckets = dict[Bucket, Decimal]
+
+
+def totals_db(wbs_db: str) -> str:
+    """Get the name of the WBS's totals database."""
+    return f"{wbs_db}{TOTALS_DB_SUFFIX}"
+
+
+def encode_bucket(bucket: Bucket) -> str:
+    """Get a mongo-safe field name for the bucket (no '.', no leading '$')."""
+    return json.dumps(list(bucket)).replace(".", "\\u002e")
+
+
+def decode_bucket(field: str) -> Bucket:
+    """Get the bucket from its field name."""
+    return tuple(json.loads(field))
+
+
+def pending_writes(doc: dict[str, Any]) -> list[str]:
+    """Get the tokens of the document's in-flight (not abandoned) record writes."""
+    cutoff = time.time() - PENDING_STALE_SECS
+    return [t for t, start in doc.get(PENDING, {}).items() if start > cutoff]
+
+
+def bucket_of(record: uut.DBRecord) -> tuple[Bucket, Decimal] | None:
+    """Get the (human-friendly, non-deleted) record's bucket & FTE, if it counts."""
+    if columns.TOTAL_COL in record or not record.get(columns.FTE):  # also 0s
+        return None
+    bucket = tuple(str(record.get(c) or "") for c in BUCKET_COLUMNS)
+    return bucket, Decimal(str(record[columns.FTE]))  # avoid floating point loss
+
+
+def compute(records: Iterable[uut.DBRecord]) -> Buckets:
+    """Sum the records' FTEs into buckets, from scratch."""
+    buckets: Buckets = {}
+    for record in records:
+        if counted := bucket_of(record):
+            bucket, fte = counted
+            buckets[bucket] = buckets.get(bucket, Decimal(0)) + fte
+    return buckets
+
+
+def deltas(before: uut.DBRecord | None, after: uut.DBRecord | None) -> Buckets:
+    """Get how much each bucket changes when `before` becomes `after`.
+
+    Pass `None` for a record that doesn't count (ex: new, or deleted).
+    """
+    changes: Buckets = {}
+    for record, sign in [(before, -1), (after, 1)]:
+        if record and (counted := bucket_of(record)):
+            bucket, fte = counted
+            changes[bucket] = changes.get(bucket, Decimal(0)) + sign * fte
+    return {b: d for b, d in changes.items() if d}
+
+
+def to_records(buckets: Buckets, institution: str = "") -> uut.DBTable:
+    """Get a pseudo-record per (non-empty) bucket, optionally for one institution.
+
+    FTEs are the exact sums as strs (ex: "0.4"), which stay exact when summed
+    again via `Decimal(str(fte))` (like `get_total_rows()`) -- unlike floats.
+    """
+    return [
+        {**dict(zip(BUCKET_COLUMNS, bucket)), columns.FTE: str(fte)}
+        for bucket, fte in sorted(buckets.items())
+        if fte and (not institution or bucket[0] == institution)
+    ]
@@ -1,34 +1,191 @@
 """Database interface for MOU data."""
 
+import asyncio
 import base64
+import collections
+import concurrent.futures
 import dataclasses as dc
 import io
 import logging
 import time
-from typing import cast
+import uuid
+from typing import Any, Callable, cast
 
+import cachetools
 import dacite
 import pandas as pd  # type: ignore[import]
 import pymongo.errors
 import universal_utils.constants as uuc
 import universal_utils.types as uut
+from bson.binary import Binary
+from bson.decimal128 import Decimal128
 from motor.motor_tornado import MotorClient
+from pymongo.read_preferences import (
+    ReadPreference,
+    make_read_preference,
+    read_pref_mode_from_name,
+)
 from tornado import web
 
-from ..config import EXCLUDE_COLLECTIONS, EXCLUDE_DBS
-from ..utils import types, utils
+from ..config import ENV, EXCLUDE_COLLECTIONS, EXCLUDE_DB_SUFFIXES, EXCLUDE_DBS
+from ..utils import (
+    change_feed,
+    invalidation_bus,
+    jobs,
+    metrics,
+    offload,
+    types,
+    utils,
+    write_behind,
+)
 from ..utils.mongo_tools import DocumentNotFoundError, Mongofier
-from . import columns
+from . import (
+    columns,
+    live_cache,
+    materialized_totals,
+    snapshot_archive,
+    snapshot_deltas,
+    wbs,
+)
+
+# a new snapshot is read from the primary until it has surely replicated
+SNAPSHOT_REPLICATION_GRACE_SECS = 60
+
+# a rebuild of the live totals is retried while record writes race it
+TOTALS_REBUILD_ATTEMPTS = 5
+TOTALS_REBUILD_BACKOFF_SECS = 0.1  # times the attempt
+
+
+def _read_xlsx(base64_xlsx: str) -> list[uut.DBRecord]:
+    """Decode & read the base64-encoded xlsx file's rows (blanks are '')."""
+    return _read_xlsx_file(io.BytesIO(base64.b64decode(base64_xlsx)))
+
+
+def _read_xlsx_file(xlsx: str | io.BytesIO) -> list[uut.DBRecord]:
+    """Read the xlsx file's rows (blanks are '')."""
+    df = pd.read_excel(xlsx)  # pylint:disable=invalid-name
+    return cast(list[uut.DBRecord], df.fillna("").to_dict("records"))
 
 
 class MOUDatabaseClient:
     """MotorClient with additional guardrails for MOU things."""
 
     def __init__(
-        self, motor_client: MotorClient, data_adaptor: utils.MOUDataAdaptor  # type: ignore[valid-type]
+        self,
+        motor_client: MotorClient,  # type: ignore[valid-type]
+        data_adaptor: utils.MOUDataAdaptor,
+        bus: invalidation_bus.InvalidationBus | None = None,
     ) -> None:
         self.data_adaptor = data_adaptor
         self._mongo = motor_client
+        # with a bus, every process hears about every write
+        self.bus = bus
+        self._versions: collections.Counter[str] = collections.Counter()
+        self.changes = change_feed.ChangeFeed()  # for clients to hear of changes
+        if self.bus:
+            self.bus.subscribe(self._invalidate)
+        # institutions' `table_metadata.last_edit_ts`, bumped by every record edit
+        # -- written behind only if this is the only process (w/o a bus): the
+        # others wouldn't read a bump until it's written
+        last_edit_window = ENV.MOU_LAST_EDIT_FLUSH_SECS
+        if self.bus and last_edit_window:
+            logging.warning("Multiple processes: last edits are written through")
+            last_edit_window = 0.0
+        self._last_edits = write_behind.TimestampCoalescer(
+            self._write_last_edits, last_edit_window
+        )
+        # snapshots are immutable, so their (reconstructed) records can be cached
+        self._snapshot_cache: cachetools.LRUCache[
+            tuple[str, str], snapshot_deltas.SnapshotDocs
+        ] = cachetools.LRUCache(ENV.MOU_SNAPSHOT_CACHE_SIZE)
+        # the live tables, written through by edits (MongoDB is still the truth)
+        self._live_cache = live_cache.LiveCache() if ENV.MOU_LIVE_CACHE else None
+        self._live_loads: collections.defaultdict[
+            str, asyncio.Lock
+        ] = collections.defaultdict(asyncio.Lock)
+        # snapshots are immutable, so they can be read from secondaries
+        self._snapshot_read_preference = make_read_preference(
+            read_pref_mode_from_name(ENV.MOU_MONGODB_SNAPSHOT_READ_PREFERENCE), None
+        )
+        # for CPU-heavy work, so it doesn't block the event loop
+        self.offload = offload.Offloader(
+            ENV.MOU_OFFLOAD_PROCESSES,
+            ENV.MOU_OFFLOAD_THREADS,
+            ENV.MOU_OFFLOAD_MIN_ROWS,
+        )
+        # long requests (imports & snapshots) can run in the background
+        self.jobs = jobs.JobManager(
+            motor_client, ENV.MOU_JOB_HEARTBEAT_SECS, ENV.MOU_JOBS_KEEP_DAYS
+        )
+
+    def data_version(self, wbs_db: str) -> int:
+        """Get a number that changes whenever the WBS's data changes.
+
+        Use it to key caches of the WBS's (live) data.
+        """
+        return self._versions[wbs_db]
+
+    def _invalidate(self, msg: invalidation_bus.Message) -> None:
+        self._versions[msg.wbs_db] += 1
+        self.changes.record(msg)
+        if msg.snapshot:
+            self._snapshot_cache.pop((msg.wbs_db, msg.snapshot), None)
+        # this process's own edits were already written through
+        origin = self.bus.origin if self.bus else ""
+        if (
+            self._live_cache
+            and msg.kind == invalidation_bus.LIVE
+            and msg.origin != origin
+        ):
+            self._live_cache.invalidate(msg.wbs_db, msg.institution)
+
+    async def _publish_change(
+        self, wbs_db: str, kind: str, snapshot: str = "", institution: str = ""
+    ) -> None:
+        """Invalidate this process's cached data, and others' via the bus.
+
+        Pass `institution` if only that institution's live data changed.
+        """
+        if self.bus:
+            await self.bus.publish(wbs_db, kind, snapshot, institution)
+        else:
+            self._invalidate(
+                invalidation_bus.Message(
+                    wbs_db, kind, snapshot, institution=institution
+                )
+            )
+
+    async def flush_pending_writes(self) -> None:
+        """Write out everything that is being written behind (ex: at shutdown)."""
+        await self._last_edits.flush()
+
+    async def _write_last_edits(self, wbs_db: str, last_edits: dict[str, int]) -> None:
+        """Update many institutions' `last_edit_ts`s in one write."""
+        doc = await self._get_supplemental_doc(wbs_db, uuc.LIVE_COLLECTION)
+        for institution, last_edit_ts in last_edits.items():
+            vals = doc.snapshot_institution_values.get(
+                institution, uut.InstitutionValues()
+            )
+            doc.snapshot_institution_values[institution] = self._with_last_edit_ts(
+                vals, last_edit_ts
+            )
+        await self._set_supplemental_doc(wbs_db, uuc.LIVE_COLLECTION, doc)
+        for institution in last_edits:
+            await self._publish_change(
+                wbs_db, invalidation_bus.LIVE, institution=institution
+            )
+        logging.debug(f"Wrote last edits ({wbs_db=}): {last_edits}.")
+
+    @staticmethod
+    def _with_last_edit_ts(
+        vals: uut.InstitutionValues, last_edit_ts: int | None
+    ) -> uut.InstitutionValues:
+        if not last_edit_ts or vals.table_metadata.last_edit_ts >= last_edit_ts:
+            return vals
+        return dc.replace(
+            vals,
+            table_metadata=dc.replace(vals.table_metadata, last_edit_ts=last_edit_ts),
+        )
 
     async def _override_live_collection_for_xlsx(  # pylint: disable=R0913
         self,
@@ -56,14 +213,51 @@ class MOUDatabaseClient:
 
         logging.debug(f"Created Live Collection: ({wbs_db=}) {len(table)} records.")
 
-    async def ingest_xlsx(  # pylint:disable=too-many-locals
-        self, wbs_db: str, base64_xlsx: str, filename: str, creator: str
+    async def ingest_xlsx(  # pylint: disable=R0913
+        self,
+        wbs_db: str,
+        base64_xlsx: str,
+        filename: str,
+        creator: str,
+        progress: jobs.ProgressFunc = jobs.no_progress,
     ) -> tuple[str, str]:
-        """Ingest the xlsx's data as the new Live Collection.
+        """Ingest the base64-encoded xlsx's data as the new Live Collection.
 
         Also make snapshots of the previous live table and the new one.
+        `progress` is told each stage & how many rows are done (see `jobs`).
         """
+        return await self._ingest_xlsx(
+            wbs_db, filename, creator, progress, _read_xlsx, base64_xlsx
+        )
+
+    async def ingest_xlsx_file(  # pylint: disable=R0913
+        self,
+        wbs_db: str,
+        path: str,
+        filename: str,
+        creator: str,
+        progress: jobs.ProgressFunc = jobs.no_progress,
+    ) -> tuple[str, str]:
+        """Ingest the xlsx file's data as the new Live Collection.
+
+        Like `ingest_xlsx()`, but only the path is passed around (not the
+        file's contents), so big files don't need to be held in memory.
+        """
+        return await self._ingest_xlsx(
+            wbs_db, filename, creator, progress, _read_xlsx_file, path
+        )
+
+    async def _ingest_xlsx(  # pylint:disable=too-many-locals
+        self,
+        wbs_db: str,
+        filename: str,
+        creator: str,
+        progress: jobs.ProgressFunc,
+        read: Callable[[str], list[uut.DBRecord]],
+        xlsx: str,
+    ) -> tuple[str, str]:
         logging.info(f"Ingesting xlsx {filename} ({wbs_db=})...")
+        await progress(stage="parsing")
 
         def _is_a_total_row(row: uut.DBRecord) -> bool:
             # check L2, L3, Inst., & US/Non-US  columns for "total" substring
@@ -95,13 +289,14 @@ class MOUDatabaseClient:
         # format as if this was done via POST @ '/record'
         from ..utils.utils import TableConfigDataAdaptor  # pylint: disable=C0415
 
-        # decode base64-excel
+        # read excel -- in another process, it's slow
         try:
-            decoded = base64.b64decode(base64_xlsx)
-            df = pd.read_excel(io.BytesIO(decoded))  # pylint:disable=invalid-name
-            raw_table = cast(list[uut.DBRecord], df.fillna("").to_dict("records"))
+            raw_table = await self.offload.in_process(read, xlsx)
+        except concurrent.futures.BrokenExecutor:
+            raise
         except Exception as e:
             raise web.HTTPError(400, reason=str(e))
+        await progress(stage="validating", rows_parsed=len(raw_table))
 
         # check schema -- aka verify column names
         for row in raw_table:
@@ -116,20 +311,30 @@ class MOUDatabaseClient:
                     f"ALLOWABLE KEYS={self.data_adaptor.tc_cache.get_columns()})",
                 )
 
-        # mongofy table -- and verify data
-        try:
-            tc_adaptor = TableConfigDataAdaptor(self.data_adaptor.tc_cache)
-            table: uut.DBTable = [
-                self.data_adaptor.mongofy_record(
-                    wbs_db,
-                    tc_adaptor.remove_on_the_fly_fields(row),
-                )
-                for row in raw_table
-                if _row_has_data(row) and not _is_a_total_row(row)
-            ]
-        except Exception as e:
-            raise web.HTTPError(422, reason=str(e))
+        # verify data -- report every bad row at once
+        tc_adaptor = TableConfigDataAdaptor(self.data_adaptor.tc_cache)
+        rows = [  # (xlsx row number, record) -- row 1 is the header
+            (i + 2, tc_adaptor.remove_on_the_fly_fields(row))
+            for i, row in enumerate(raw_table)
+            if _row_has_data(row) and not _is_a_total_row(row)
+        ]
+        validator = self.data_adaptor.tc_cache.get_record_validator(wbs_db)
+        if bad := await self.offload.for_table(
+            len(rows), validator.validate_table, [r for _, r in rows]
+        ):
+            raise jobs.DetailedHTTPError(
+                422,
+                f"{len(bad)} invalid rows",
+                [f"Row {rows[i][0]}: {'; '.join(errs)}" for i, errs in bad.items()],
+            )
+
+        # mongofy table -- data is already verified
+        table: uut.DBTable = [
+            self.data_adaptor.mongofy_record(wbs_db, r, assert_data=False)
+            for _, r in rows
+        ]
         logging.debug(f"xlsx table has {len(table)} records ({wbs_db=}).")
+        await progress(stage="writing", rows_validated=len(table))
 
         # snapshot
         try:
@@ -150,6 +355,10 @@ class MOUDatabaseClient:
         await self._override_live_collection_for_xlsx(
             wbs_db, table, creator, all_insts_values
         )
+        await self.rebuild_totals(wbs_db)
+
+        await self._publish_change(wbs_db, invalidation_bus.LIVE)
+        await progress(stage="snapshotting", rows_written=len(table))
 
         # snapshot
         current_snap = await self.snapshot_live_collection(
@@ -164,7 +373,9 @@ class MOUDatabaseClient:
     async def _list_database_names(self) -> list[str]:
         """Return all databases' names."""
         return [
-            n for n in await self._mongo.list_database_names() if n not in EXCLUDE_DBS  # type: ignore[attr-defined]
+            n
+            for n in await self._mongo.list_database_names()  # type: ignore[attr-defined]
+            if n not in EXCLUDE_DBS and not n.endswith(tuple(EXCLUDE_DB_SUFFIXES))
         ]
 
     async def _list_collection_names(self, db: str) -> list[str]:
@@ -201,6 +412,7 @@ class MOUDatabaseClient:
         doc = await self._get_supplemental_doc(wbs_db, uuc.LIVE_COLLECTION)
         doc = dc.replace(doc, confirmation_touchstone_ts=now)
         await self._set_supplemental_doc(wbs_db, uuc.LIVE_COLLECTION, doc)
+        await self._publish_change(wbs_db, invalidation_bus.LIVE)
 
         logging.info(f"Re-touchstoned ({wbs_db=}, {now=}).")
         return now
@@ -256,6 +468,9 @@ class MOUDatabaseClient:
         await self._update_institution_values(
             wbs_db, institution, vals, uuc.LIVE_COLLECTION
         )
+        await self._publish_change(
+            wbs_db, invalidation_bus.LIVE, institution=institution
+        )
 
         logging.info(
             f"Confirmed Institution's Values ({wbs_db=}, {institution=}, {vals=})."
@@ -299,6 +514,9 @@ class MOUDatabaseClient:
         await self._update_institution_values(
             wbs_db, institution, vals, uuc.LIVE_COLLECTION
         )
+        await self._publish_change(
+            wbs_db, invalidation_bus.LIVE, institution=institution
+        )
 
         logging.info(
             f"Upserted Institution's Values ({wbs_db=}, {institution=}, {vals=})."
@@ -358,6 +576,11 @@ class MOUDatabaseClient:
             logging.warning(str(e))
             return uut.InstitutionValues()
 
+        if snapshot_timestamp == uuc.LIVE_COLLECTION:  # include unwritten edits
+            vals = self._with_last_edit_ts(
+                vals, self._last_edits.get(wbs_db, institution)
+            )
+
         logging.info(f"Institution's Values [{vals}] ({wbs_db=}, {institution=}).")
         return vals
 
@@ -407,6 +630,7 @@ class MOUDatabaseClient:
         all_insts_values: dict[str, uut.InstitutionValues],
         admin_only: bool,
         confirmation_touchstone_ts: int,
+        delta: snapshot_deltas.Delta | None = None,
     ) -> None:
         logging.debug(f"Creating Supplemental DB/Document ({wbs_db=}, {snap_coll=})...")
 
@@ -424,6 +648,11 @@ class MOUDatabaseClient:
                 snapshot_institution_values=all_insts_values,
                 admin_only=admin_only,
                 confirmation_touchstone_ts=confirmation_touchstone_ts,
+                snapshot_format=(
+                    snapshot_deltas.DELTA if delta else snapshot_deltas.FULL
+                ),
+                delta_base=delta.base if delta else "",
+                delta_depth=delta.depth if delta else 0,
             ),
         )
 
@@ -442,10 +671,12 @@ class MOUDatabaseClient:
         all_insts_values: dict[str, uut.InstitutionValues],
         admin_only: bool,
         confirmation_touchstone_ts: int,
+        delta: snapshot_deltas.Delta | None = None,
     ) -> None:
         """Add table to a new collection.
 
-        If collection already exists, replace.
+        If collection already exists, replace. If `delta` is given, store
+        its documents instead of the table (see `snapshot_deltas`).
         """
         if admin_only and snap_coll == uuc.LIVE_COLLECTION:
             raise Exception(
@@ -464,9 +695,15 @@ class MOUDatabaseClient:
         await self._ensure_collection_indexes(wbs_db, snap_coll)
 
         # Ingest
-        await coll_obj.insert_many(
-            [self.data_adaptor.mongofy_record(wbs_db, r) for r in table]
-        )
+        self._snapshot_cache.pop((wbs_db, snap_coll), None)
+        if not delta:
+            await coll_obj.insert_many(
+                [self.data_adaptor.mongofy_record(wbs_db, r) for r in table]
+            )
+        elif delta.docs:  # an empty delta means nothing changed
+            await coll_obj.insert_many(delta.docs)
+        if snap_coll == uuc.LIVE_COLLECTION and self._live_cache:
+            self._live_cache.invalidate(wbs_db)
 
         # create supplemental document
         await self._create_supplemental_db_document(
@@ -477,30 +714,84 @@ class MOUDatabaseClient:
             all_insts_values,
             admin_only,
             confirmation_touchstone_ts,
+            delta,
         )
 
-    async def _ensure_collection_indexes(self, wbs_db: str, snap_coll: str) -> None:
-        """Create indexes in collection."""
-        coll_obj = self._mongo[wbs_db][snap_coll]  # type: ignore[index]
-
+    def _desired_indexes(self) -> list[pymongo.IndexModel]:
+        """Get the indexes every collection should have."""
+        _deleted = self.data_adaptor.IS_DELETED
         _inst = Mongofier.mongofy_key_name(columns.INSTITUTION)
-        await coll_obj.create_index(_inst, name=f"{_inst}_index", unique=False)
-
         _labor = Mongofier.mongofy_key_name(columns.LABOR_CAT)
-        await coll_obj.create_index(_labor, name=f"{_labor}_index", unique=False)
+        _timestamp = Mongofier.mongofy_key_name(columns.TIMESTAMP)
 
-        async for index in coll_obj.list_indexes():
-            logging.debug(index)
+        return [
+            pymongo.IndexModel(_inst, name=f"{_inst}_index", unique=False),
+            pymongo.IndexModel(_labor, name=f"{_labor}_index", unique=False),
+            # for the deleted records by institution, e.g. when restoring --
+            # the live records' `{deleted: {$ne: true}}` can't be bounded
+            # tightly on it, those use the institution/labor indexes instead
+            # (NOTE: no partial index repeating `Institution_index`'s keys,
+            # MongoDB <5.0 rejects it & the whole `create_indexes()` call)
+            pymongo.IndexModel(
+                [(_deleted, pymongo.ASCENDING), (_inst, pymongo.ASCENDING)],
+                name=f"{_deleted}_{_inst}_index",
+                unique=False,
+            ),
+            pymongo.IndexModel(
+                [(_timestamp, pymongo.DESCENDING)],
+                name=f"{_timestamp}_index",
+                unique=False,
+            ),
+        ]
+
+    async def _ensure_collection_indexes(self, wbs_db: str, snap_coll: str) -> int:
+        """Create the collection's missing indexes, return how many were created."""
+        coll_obj = self._mongo[wbs_db][snap_coll]  # type: ignore[index]
 
-    async def _ensure_all_db_indexes(self) -> None:
-        """Create all indexes in all databases."""
+        existing = await coll_obj.index_information()
+        missing = [
+            model
+            for model in self._desired_indexes()
+            if model.document["name"] not in existing
+        ]
+        if missing:
+            await coll_obj.create_indexes(missing)
+            logging.debug(
+                f"Created indexes ({wbs_db=}, {snap_coll=}): "
+                f"{[m.document['name'] for m in missing]}"
+            )
+        return len(missing)
+
+    async def _ensure_all_db_indexes(self, concurrency: int = 8) -> None:
+        """Create all missing indexes in all databases.
+
+        Collections are reconciled concurrently, `concurrency` at a time.
+        """
         logging.debug("Ensuring All Databases' Indexes...")
+        start = time.monotonic()
 
-        for wbs_db in await self._list_database_names():
-            for snap_coll in await self._list_collection_names(wbs_db):
-                await self._ensure_collection_indexes(wbs_db, snap_coll)
+        wbs_dbs = await self._list_database_names()
+        colls_per_db = await asyncio.gather(
+            *[self._list_collection_names(db) for db in wbs_dbs]
+        )
+        pairs = [
+            (wbs_db, snap_coll)
+            for wbs_db, colls in zip(wbs_dbs, colls_per_db)
+            for snap_coll in colls
+        ]
+
+        semaphore = asyncio.Semaphore(concurrency)
 
-        logging.debug("Ensured All Databases' Indexes.")
+        async def _bounded(wbs_db: str, snap_coll: str) -> int:
+            async with semaphore:
+                return await self._ensure_collection_indexes(wbs_db, snap_coll)
+
+        created = await asyncio.gather(*[_bounded(db, coll) for db, coll in pairs])
+
+        logging.info(
+            f"Ensured All Databases' Indexes: {sum(created)} created, "
+            f"{len(pairs)} collections checked in {time.monotonic() - start:.2f}s."
+        )
 
     async def get_table(
         self, wbs_db: str, snap_coll: str, labor: str, institution: str
@@ -511,31 +802,310 @@ class MOUDatabaseClient:
 
         logging.debug(f"Getting from {snap_coll} ({wbs_db=})...")
 
-        await self._check_database_state(wbs_db)
-
-        query = {}
-        if labor:
-            query[Mongofier.mongofy_key_name(columns.LABOR_CAT)] = labor
-        if institution:
-            query[Mongofier.mongofy_key_name(columns.INSTITUTION)] = institution
+        if not self._is_live_cached(wbs_db, snap_coll):
+            await self._check_database_state(wbs_db)
 
         # build demongofied table
         table: uut.DBTable = []
-        i, dels = 0, 0
-        async for record in self._mongo[wbs_db][snap_coll].find(query):  # type: ignore[index]
-            if record.get(self.data_adaptor.IS_DELETED):
-                dels += 1
-                continue
-            table.append(self.data_adaptor.demongofy_record(record))
-            i += 1
+        query = self._live_records_query(labor, institution)
+        if snap_coll == uuc.LIVE_COLLECTION:
+            table = await self._get_live_table(wbs_db, labor, institution)
+        elif await self._is_stored_whole(wbs_db, snap_coll):
+            coll_obj = self._snapshot_coll_obj(wbs_db, snap_coll)
+            async for record in coll_obj.find(query):
+                table.append(self.data_adaptor.demongofy_record(record))
+        else:  # reconstructed (& cached) in full, so filtered here
+            docs = await self._get_snapshot_docs(wbs_db, snap_coll)
+            for record in docs.values():
+                if self._matches_query(record, query):
+                    table.append(self.data_adaptor.demongofy_record(record))
 
         logging.info(
             f"Table [{wbs_db=} {snap_coll=}] ({institution=}, {labor=}) "
-            f"has {i} records (and {dels} deleted records)."
+            f"has {len(table)} records."
         )
 
         return table
 
+    async def count_records(
+        self, wbs_db: str, snap_coll: str, labor: str = "", institution: str = ""
+    ) -> int:
+        """Count the (non-deleted) records, without fetching them."""
+        if not snap_coll:
+            raise web.HTTPError(422, reason="collection (snapshot) cannot be falsy")
+
+        if not self._is_live_cached(wbs_db, snap_coll):
+            await self._check_database_state(wbs_db)
+
+        query = self._live_records_query(labor, institution)
+        if snap_coll != uuc.LIVE_COLLECTION:
+            if await self._is_stored_whole(wbs_db, snap_coll):
+                coll_obj = self._snapshot_coll_obj(wbs_db, snap_coll)
+                return cast(int, await coll_obj.count_documents(query))
+            docs = await self._get_snapshot_docs(wbs_db, snap_coll)
+            return sum(1 for r in docs.values() if self._matches_query(r, query))
+        if self._live_cache and (
+            (count := self._live_cache.count(wbs_db, labor, institution)) is not None
+        ):
+            return count
+
+        return cast(
+            int,
+            await self._mongo[wbs_db][snap_coll].count_documents(query),  # type: ignore[index]
+        )
+
+    def _is_live_cached(self, wbs_db: str, snap_coll: str) -> bool:
+        """Return whether it's the live collection, & cached (so it surely exists)."""
+        return bool(
+            snap_coll == uuc.LIVE_COLLECTION
+            and self._live_cache
+            and self._live_cache.is_loaded(wbs_db)
+        )
+
+    async def _read_live_table(
+        self, wbs_db: str, labor: str, institution: str
+    ) -> uut.DBTable:
+        """Read the (demongofied) live records from MongoDB."""
+        coll_obj = self._mongo[wbs_db][uuc.LIVE_COLLECTION]  # type: ignore[index]
+        return [
+            self.data_adaptor.demongofy_record(r)
+            async for r in coll_obj.find(self._live_records_query(labor, institution))
+        ]
+
+    async def _get_live_table(
+        self, wbs_db: str, labor: str, institution: str
+    ) -> uut.DBTable:
+        """Get the (demongofied) live records, from the cache if it's on."""
+        if not self._live_cache:
+            return await self._read_live_table(wbs_db, labor, institution)
+        cache = self._live_cache
+
+        if (table := cache.get(wbs_db, labor, institution)) is not None:
+            metrics.record_cache("live", True)
+            return table
+        metrics.record_cache("live", False)
+
+        async with self._live_loads[wbs_db]:  # concurrent misses load once
+            to_load = cache.to_load(wbs_db, institution)
+            if to_load is None:
+                generation = cache.generation(wbs_db)
+                records = await self._read_live_table(wbs_db, "", "")
+                cache.load(wbs_db, records, generation)
+            for inst in to_load or ():
+                generation = cache.generation(wbs_db)
+                records = await self._read_live_table(wbs_db, "", inst)
+                cache.load(wbs_db, records, generation, inst)
+
+        if (table := cache.get(wbs_db, labor, institution)) is not None:
+            return table
+        # it changed while loading, so read around the cache this time
+        return await self._read_live_table(wbs_db, labor, institution)
+
+    async def check_live_cache(self, wbs_db: str) -> bool:
+        """Compare the cached live records to MongoDB's, and drop them if different.
+
+        This catches changes made around the server & its invalidation bus
+        (ex: by hand) -- ones that touch a record's institution or last-edit
+        timestamp, or add/delete a record. Return whether they were consistent.
+        """
+        if not self._live_cache:
+            return True
+        generation = self._live_cache.generation(wbs_db)
+        if (cached := self._live_cache.fingerprint(wbs_db)) is None:
+            return True
+
+        keys = [columns.INSTITUTION, columns.TIMESTAMP]
+        coll_obj = self._mongo[wbs_db][uuc.LIVE_COLLECTION]  # type: ignore[index]
+        stored = live_cache.fingerprint(
+            [
+                self.data_adaptor.demongofy_record(r)
+                async for r in coll_obj.find(
+                    self._live_records_query("", ""),
+                    projection={Mongofier.mongofy_key_name(k): True for k in keys},
+                )
+            ]
+        )
+
+        if generation != self._live_cache.generation(wbs_db):
+            return True  # it changed meanwhile, so it's not comparable
+        if stored == cached:
+            return True
+        logging.warning(f"Cached live records are out of date ({wbs_db=}), dropping...")
+        self._live_cache.invalidate(wbs_db)
+        return False
+
+    def _live_records_query(self, labor: str, institution: str) -> dict[str, Any]:
+        """Get the query for the non-deleted records, optionally filtered."""
+        # `$ne` also matches records w/o the field (never deleted)
+        query: dict[str, Any] = {self.data_adaptor.IS_DELETED: {"$ne": True}}
+        if labor:
+            query[Mongofier.mongofy_key_name(columns.LABOR_CAT)] = labor
+        if institution:
+            query[Mongofier.mongofy_key_name(columns.INSTITUTION)] = institution
+        return query
+
+    def _matches_query(self, record: uut.DBRecord, query: dict[str, Any]) -> bool:
+        """Return whether the record matches a `_live_records_query()` query."""
+        if record.get(self.data_adaptor.IS_DELETED):
+            return False
+        return all(
+            record.get(k) == v
+            for k, v in query.items()
+            if k != self.data_adaptor.IS_DELETED
+        )
+
+    def _snapshot_coll_obj(self, wbs_db: str, snap_coll: str) -> Any:
+        """Get the snapshot collection, for reading with the snapshot read preference."""
+        db_obj = self._mongo[wbs_db]  # type: ignore[index]
+        if self._snapshot_read_preference == ReadPreference.PRIMARY:
+            return db_obj[snap_coll]
+        try:
+            if time.time() - float(snap_coll) < SNAPSHOT_REPLICATION_GRACE_SECS:
+                return db_obj[snap_coll]
+        except ValueError:
+            return db_obj[snap_coll]  # not a timestamp, so can't tell its age
+        return db_obj.get_collection(
+            snap_coll, read_preference=self._snapshot_read_preference
+        )
+
+    async def _is_stored_whole(self, wbs_db: str, snap_coll: str) -> bool:
+        """Return whether the snapshot can be queried in MongoDB as-is.
+
+        That's a full-format, non-archived snapshot that isn't already cached
+        (a cached one is quicker filtered in memory).
+        """
+        if (wbs_db, snap_coll) in self._snapshot_cache:
+            return False
+        try:
+            supplemental_doc = await self._get_supplemental_doc(wbs_db, snap_coll)
+        except DocumentNotFoundError:
+            return True
+        return (
+            not supplemental_doc.archived
+            and supplemental_doc.snapshot_format != snapshot_deltas.DELTA
+        )
+
+    async def _get_snapshot_docs(
+        self, wbs_db: str, snap_coll: str
+    ) -> snapshot_deltas.SnapshotDocs:
+        """Get the snapshot's (mongofied) non-deleted records, by id.
+
+        A delta snapshot is reconstructed from its base snapshot(s).
+        """
+        key = (wbs_db, snap_coll)
+        try:
+            docs = self._snapshot_cache[key]
+            metrics.record_cache("snapshot", hit=True)
+            return docs
+        except KeyError:
+            metrics.record_cache("snapshot", hit=False)
+
+        try:
+            supplemental_doc = await self._get_supplemental_doc(wbs_db, snap_coll)
+        except DocumentNotFoundError:
+            supplemental_doc = None
+
+        if supplemental_doc and supplemental_doc.archived:
+            stored = await self._read_archived_snapshot(wbs_db, snap_coll)
+        else:
+            coll_obj = self._snapshot_coll_obj(wbs_db, snap_coll)
+            if (
+                supplemental_doc
+                and supplemental_doc.snapshot_format == snapshot_deltas.DELTA
+            ):
+                stored = [d async for d in coll_obj.find()]  # w/ the deletions
+            else:
+                query = self._live_records_query("", "")
+                stored = [d async for d in coll_obj.find(query)]
+
+        if (
+            supplemental_doc
+            and supplemental_doc.snapshot_format == snapshot_deltas.DELTA
+        ):
+            base = await self._get_snapshot_docs(wbs_db, supplemental_doc.delta_base)
+            docs = snapshot_deltas.apply_delta(base, stored)
+        else:
+            docs = snapshot_deltas.by_id(
+                r for r in stored if not r.get(self.data_adaptor.IS_DELETED)
+            )
+
+        self._snapshot_cache[key] = docs
+        return docs
+
+    def _as_from_table(self, doc: uut.DBRecord) -> uut.DBRecord:
+        """Get the (mongofied) record as it'd be stored from a demongofied table.
+
+        Ex: its `None`s are ''s then -- see `Mongofier.demongofy_document()`.
+        """
+        return self.data_adaptor.mongofy_record(
+            "", self.data_adaptor.demongofy_record(doc), assert_data=False
+        )
+
+    async def _make_snapshot_delta(
+        self, wbs_db: str, current: snapshot_deltas.SnapshotDocs
+    ) -> snapshot_deltas.Delta | None:
+        """Diff the records against the latest snapshot.
+
+        Return None if a keyframe (full snapshot) should be stored instead.
+        """
+        snapshots = await self.list_snapshot_timestamps(wbs_db, False)
+        if not snapshots:
+            return None
+        base = snapshots[0]  # the latest
+
+        try:
+            base_doc = await self._get_supplemental_doc(wbs_db, base)
+        except DocumentNotFoundError:
+            return None
+        depth = base_doc.delta_depth + 1
+        if depth > ENV.MOU_SNAPSHOT_KEYFRAME_INTERVAL:
+            return None
+
+        # `current` comes from the (demongofied) table, so compare it likewise
+        base_docs = snapshot_deltas.by_id(
+            self._as_from_table(d)
+            for d in (await self._get_snapshot_docs(wbs_db, base)).values()
+        )
+        docs = snapshot_deltas.compute_delta(base_docs, current)
+        if not snapshot_deltas.is_worth_it(len(docs), len(current)):
+            return None
+        return snapshot_deltas.Delta(base, depth, docs)
+
+    async def log_index_advice(self) -> list[str]:
+        """Explain the common queries, log & return those doing collection scans.
+
+        Only the live collections are checked.
+        """
+        inst = Mongofier.mongofy_key_name(columns.INSTITUTION)
+        queries: dict[str, dict[str, Any]] = {
+            "table": self._live_records_query("", ""),
+            "table by institution": self._live_records_query("", "_"),
+            "table by labor": self._live_records_query("_", ""),
+            "deleted records by institution": {
+                self.data_adaptor.IS_DELETED: True,
+                inst: "_",
+            },
+        }
+
+        collscans = []
+        for wbs_db in await self._list_database_names():
+            if wbs_db not in wbs.WORK_BREAKDOWN_STRUCTURES:
+                continue
+            coll_obj = self._mongo[wbs_db][uuc.LIVE_COLLECTION]  # type: ignore[index]
+            for desc, query in queries.items():
+                plan = (await coll_obj.find(query).explain())["queryPlanner"]
+                if "COLLSCAN" in str(plan["winningPlan"]):
+                    collscans.append(f"{wbs_db}: {desc} {query}")
+
+        if collscans:
+            logging.warning(
+                "Index advisor -- queries doing collection scans:\n"
+                + "\n".join(collscans)
+            )
+        else:
+            logging.info("Index advisor -- all common queries use indexes.")
+        return collscans
+
     async def upsert_record(
         self, wbs_db: str, record: uut.DBRecord, editor: str
     ) -> tuple[uut.DBRecord, uut.InstitutionValues | None]:
@@ -557,40 +1127,60 @@ class MOUDatabaseClient:
         record = self.data_adaptor.mongofy_record(wbs_db, record)
         coll_obj = self._mongo[wbs_db][uuc.LIVE_COLLECTION]  # type: ignore[index]
 
+        # a rebuild of the totals waits for this write (see `rebuild_totals()`)
+        totals_token = await self._begin_totals_write(wbs_db)
+
         # if record has an ID -- replace it
-        if record.get(columns.ID):
-            res = await coll_obj.replace_one({columns.ID: record[columns.ID]}, record)
-            logging.info(f"Updated {record} ({wbs_db=}) -> {res}.")
-        # otherwise -- create it
-        else:
-            record.pop(columns.ID)
-            res = await coll_obj.insert_one(record)
-            record[columns.ID] = res.inserted_id
-            logging.info(f"Inserted {record} ({wbs_db=}) -> {res}.")
+        changed_insts = {record[columns.INSTITUTION]}
+        before = None
+        try:
+            if replaced := bool(record.get(columns.ID)):
+                before = await coll_obj.find_one_and_replace(
+                    {columns.ID: record[columns.ID]},
+                    record,
+                    projection=self._TOTALS_PROJECTION,
+                )
+                logging.info(f"Updated {record} ({wbs_db=}) -> {before}.")
+                if before:  # the record may have moved from another institution
+                    changed_insts.add(before.get(columns.INSTITUTION))
+            # otherwise -- create it
+            else:
+                record.pop(columns.ID)
+                res = await coll_obj.insert_one(record)
+                record[columns.ID] = res.inserted_id
+                logging.info(f"Inserted {record} ({wbs_db=}) -> {res}.")
+        except Exception:
+            await self._apply_totals_deltas(wbs_db, totals_token, None, None)
+            raise
+        demongofied = self.data_adaptor.demongofy_record(record)
+        if self._live_cache:
+            if before or not replaced:
+                self._live_cache.put(
+                    wbs_db,
+                    dict(demongofied),
+                    bool(record.get(self.data_adaptor.IS_DELETED)),
+                )
+            else:  # there was nothing to replace, so nothing was written
+                self._live_cache.invalidate(wbs_db)
+        await self._apply_totals_deltas(wbs_db, totals_token, before, record)
 
-        # update table's last edit in institution values
+        # update table's last edit in institution values -- written behind,
+        # so a burst of edits is one write (see `_write_last_edits()`)
         instvals = None
         if record[columns.INSTITUTION]:
+            institution = cast(str, record[columns.INSTITUTION])
+            self._last_edits.bump(wbs_db, institution, int(now))
+            if not self._last_edits.window:
+                await self._last_edits.flush(wbs_db)
             instvals = await self.get_institution_values(
-                wbs_db,
-                uuc.LIVE_COLLECTION,
-                record[columns.INSTITUTION],  # type: ignore[arg-type]
-            )
-            instvals = dc.replace(
-                instvals,
-                table_metadata=dc.replace(
-                    instvals.table_metadata, last_edit_ts=int(now)
-                ),
-            )
-            # put in DB
-            instvals = await self._update_institution_values(
-                wbs_db,
-                record[columns.INSTITUTION],  # type: ignore[arg-type]
-                instvals,
-                uuc.LIVE_COLLECTION,
+                wbs_db, uuc.LIVE_COLLECTION, institution
             )
 
-        return self.data_adaptor.demongofy_record(record), instvals
+        for inst in changed_insts:  # a blank institution means "everything"
+            await self._publish_change(
+                wbs_db, invalidation_bus.LIVE, institution=cast(str, inst or "")
+            )
+        return demongofied, instvals
 
     async def _set_is_deleted_status(
         self, wbs_db: str, record_id: str, is_deleted: bool, editor: str
@@ -631,10 +1221,18 @@ class MOUDatabaseClient:
         logging.debug(f"Snapshotting ({wbs_db=}, {creator=})...")
 
         await self._check_database_state(wbs_db)
+        await self._last_edits.flush(wbs_db)  # the snapshot needs them
 
         table = await self.get_table(wbs_db, uuc.LIVE_COLLECTION, "", "")
         supplemental_doc = await self._get_supplemental_doc(wbs_db, uuc.LIVE_COLLECTION)
 
+        delta, current = None, None
+        if ENV.MOU_SNAPSHOT_FORMAT == snapshot_deltas.DELTA:
+            current = snapshot_deltas.by_id(
+                self.data_adaptor.mongofy_record(wbs_db, r) for r in table
+            )
+            delta = await self._make_snapshot_delta(wbs_db, current)
+
         snap_coll = str(time.time())
         await self._ingest_new_collection(
             wbs_db,
@@ -645,9 +1243,17 @@ class MOUDatabaseClient:
             supplemental_doc.snapshot_institution_values,
             admin_only,
             confirmation_touchstone_ts=supplemental_doc.confirmation_touchstone_ts,
+            delta=delta,
         )
+        await self._publish_change(wbs_db, invalidation_bus.SNAPSHOTS, snap_coll)
+        if current is not None:  # the next delta will be relative to this one
+            self._snapshot_cache[(wbs_db, snap_coll)] = current
 
-        logging.info(f"Snapshotted {snap_coll} ({wbs_db=}, {creator=}).")
+        logging.info(
+            f"Snapshotted {snap_coll} ({wbs_db=}, {creator=}, "
+            f"{'delta' if delta else 'full'}: "
+            f"{len(delta.docs) if delta else len(table)} documents)."
+        )
         return snap_coll
 
     async def _is_snapshot_admin_only(self, wbs_db: str, name: str) -> bool:
@@ -670,7 +1276,11 @@ class MOUDatabaseClient:
             for c in await self._list_collection_names(wbs_db)
             if c != uuc.LIVE_COLLECTION
         ]
-        snapshots.sort(reverse=True)
+        # a snapshot may be in both, if it was interrupted while being archived
+        snapshots = sorted(
+            set(snapshots) | set(await self._list_archived_snapshots(wbs_db)),
+            reverse=True,
+        )
 
         if exclude_admin_snaps:
             snapshots = [
@@ -682,6 +1292,351 @@ class MOUDatabaseClient:
         logging.debug(f"Snapshot Timestamps {snapshots} ({wbs_db=}).")
         return snapshots
 
+    async def convert_snapshots(
+        self, wbs_db: str, snapshot_format: str, dry_run: bool = False
+    ) -> dict[str, tuple[str, int]]:
+        """Re-store all the snapshots in `snapshot_format`, oldest first.
+
+        The snapshots' records don't change, only how they're stored. With
+        "delta", a keyframe is still stored where a delta is not worth it.
+        Archived snapshots are left as they are. Return the format & number
+        of stored documents, by snapshot.
+        """
+        if snapshot_format not in snapshot_deltas.FORMATS:
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+        logging.info(f"Converting snapshots to {snapshot_format} ({wbs_db=})...")
+
+        converted: dict[str, tuple[str, int]] = {}
+        prev: tuple[str, int, snapshot_deltas.SnapshotDocs] | None = None
+        for snap_coll in sorted(await self.list_snapshot_timestamps(wbs_db, False)):
+            docs = await self._get_snapshot_docs(wbs_db, snap_coll)
+            supplemental_doc = await self._get_supplemental_doc(wbs_db, snap_coll)
+
+            if supplemental_doc.archived:  # leave it be, it's still decodable
+                converted[snap_coll] = (
+                    supplemental_doc.snapshot_format,
+                    len(await self._read_archived_snapshot(wbs_db, snap_coll)),
+                )
+                prev = (snap_coll, supplemental_doc.delta_depth, docs)
+                continue
+
+            delta = None
+            if snapshot_format == snapshot_deltas.DELTA and prev:
+                prev_coll, prev_depth, prev_docs = prev
+                delta_docs = snapshot_deltas.compute_delta(prev_docs, docs)
+                if prev_depth < ENV.MOU_SNAPSHOT_KEYFRAME_INTERVAL and (
+                    snapshot_deltas.is_worth_it(len(delta_docs), len(docs))
+                ):
+                    delta = snapshot_deltas.Delta(prev_coll, prev_depth + 1, delta_docs)
+
+            stored = delta.docs if delta else list(docs.values())
+            new_format = snapshot_deltas.DELTA if delta else snapshot_deltas.FULL
+            converted[snap_coll] = (new_format, len(stored))
+
+            if not dry_run and (
+                supplemental_doc.snapshot_format,
+                supplemental_doc.delta_base,
+                supplemental_doc.delta_depth,
+            ) != (new_format, delta.base if delta else "", delta.depth if delta else 0):
+                await self._rewrite_snapshot(wbs_db, snap_coll, stored, delta)
+
+            prev = (snap_coll, delta.depth if delta else 0, docs)
+
+        logging.info(
+            f"Converted snapshots to {snapshot_format} ({wbs_db=}, {dry_run=}): "
+            f"{converted}."
+        )
+        return converted
+
+    async def _rewrite_snapshot(
+        self,
+        wbs_db: str,
+        snap_coll: str,
+        stored: list[uut.DBRecord],
+        delta: snapshot_deltas.Delta | None,
+    ) -> None:
+        """Replace the snapshot collection's documents & update its manifest."""
+        db_obj = self._mongo[wbs_db]  # type: ignore[index]
+
+        # write a new collection, then swap it in
+        tmp_coll = f"{snap_coll}-rewriting"
+        await db_obj.drop_collection(tmp_coll)
+        tmp_obj = await db_obj.create_collection(tmp_coll)
+        if stored:
+            await tmp_obj.insert_many(stored)
+        await tmp_obj.rename(snap_coll, dropTarget=True)
+        await self._ensure_collection_indexes(wbs_db, snap_coll)
+
+        doc = await self._get_supplemental_doc(wbs_db, snap_coll)
+        doc = dc.replace(
+            doc,
+            snapshot_format=snapshot_deltas.DELTA if delta else snapshot_deltas.FULL,
+            delta_base=delta.base if delta else "",
+            delta_depth=delta.depth if delta else 0,
+        )
+        await self._set_supplemental_doc(wbs_db, snap_coll, doc)
+        await self._publish_change(wbs_db, invalidation_bus.SNAPSHOTS, snap_coll)
+
+    # the fields `_apply_totals_deltas()` needs from a replaced record
+    _TOTALS_PROJECTION = {
+        Mongofier.mongofy_key_name(c): True
+        for c in materialized_totals.BUCKET_COLUMNS
+        + (columns.FTE, columns.TOTAL_COL, utils.MOUDataAdaptor.IS_DELETED)
+    }
+
+    def _totals_coll_obj(self, wbs_db: str) -> Any:
+        return self._mongo[materialized_totals.totals_db(wbs_db)][  # type: ignore[index]
+            materialized_totals.TOTALS_COLLECTION
+        ]
+
+    def _counted_record(self, record: uut.DBRecord | None) -> uut.DBRecord | None:
+        """Get the (mongofied) record as human-friendly, if it isn't deleted."""
+        if not record or record.get(self.data_adaptor.IS_DELETED):
+            return None
+        return Mongofier.demongofy_document(record, str_id=False)
+
+    async def _begin_totals_write(self, wbs_db: str) -> str:
+        """Mark a record write as pending for the live totals; return its token.
+
+        Pass the token to `_apply_totals_deltas()` once the record is written.
+        """
+        token = uuid.uuid4().hex
+        await self._totals_coll_obj(wbs_db).update_one(
+            {"_id": materialized_totals.DOC_ID},
+            {
+                "$set": {f"{materialized_totals.PENDING}.{token}": time.time()},
+                "$inc": {materialized_totals.VERSION: 1},
+            },
+            upsert=True,
+        )
+        return token
+
+    async def _apply_totals_deltas(
+        self,
+        wbs_db: str,
+        token: str,
+        before: uut.DBRecord | None,
+        after: uut.DBRecord | None,
+    ) -> None:
+        """Increment the live totals' buckets by the record's change.
+
+        Also, the write (see `_begin_totals_write()`) is no longer pending.
+        A bucket (or the document) is created if needed, but the totals are
+        not read until they're built (see `rebuild_totals()`).
+        """
+        changes = materialized_totals.deltas(
+            self._counted_record(before), self._counted_record(after)
+        )
+        await self._totals_coll_obj(wbs_db).update_one(
+            {"_id": materialized_totals.DOC_ID},
+            {
+                "$inc": {
+                    f"{materialized_totals.BUCKETS}."
+                    f"{materialized_totals.encode_bucket(bucket)}": Decimal128(delta)
+                    for bucket, delta in changes.items()
+                }
+                | {materialized_totals.VERSION: 1},
+                "$unset": {f"{materialized_totals.PENDING}.{token}": ""},
+            },
+            upsert=True,
+        )
+
+    async def _read_totals(self, wbs_db: str) -> materialized_totals.Buckets | None:
+        """Get the stored live totals, if they've been built."""
+        doc = await self._totals_coll_obj(wbs_db).find_one(
+            {"_id": materialized_totals.DOC_ID}
+        )
+        if not doc or not doc.get(materialized_totals.BUILT):
+            return None
+        return {
+            materialized_totals.decode_bucket(field): fte.to_decimal()
+            for field, fte in doc.get(materialized_totals.BUCKETS, {}).items()
+        }
+
+    async def _compute_totals(
+        self, wbs_db: str, snap_coll: str
+    ) -> materialized_totals.Buckets:
+        """Sum the collection's FTEs from scratch."""
+        table = await self.get_table(wbs_db, snap_coll, labor="", institution="")
+        return await self.offload.for_table(
+            len(table), materialized_totals.compute, table
+        )
+
+    async def rebuild_totals(self, wbs_db: str) -> materialized_totals.Buckets:
+        """Recompute the live totals from scratch, and store them.
+
+        They're only stored if no record write was pending, nor started or
+        finished, while they were computed (its version didn't change) --
+        otherwise, they're recomputed. So no write's `$inc` is lost, nor
+        counted twice.
+        """
+        coll_obj = self._totals_coll_obj(wbs_db)
+
+        async def compute() -> materialized_totals.Buckets:
+            # from MongoDB -- the live cache may lag other processes' writes
+            table = await self._read_live_table(wbs_db, "", "")
+            return await self.offload.for_table(
+                len(table), materialized_totals.compute, table
+            )
+
+        for attempt in range(TOTALS_REBUILD_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(TOTALS_REBUILD_BACKOFF_SECS * attempt)
+
+            doc = await coll_obj.find_one({"_id": materialized_totals.DOC_ID}) or {}
+            version = doc.get(materialized_totals.VERSION)
+            if materialized_totals.pending_writes(doc):
+                continue
+            buckets = await compute()
+
+            try:
+                res = await coll_obj.replace_one(
+                    # a missing doc is upserted; an existing one must be unchanged
+                    {
+                        "_id": materialized_totals.DOC_ID,
+                        materialized_totals.VERSION: version,
+                    },
+                    {
+                        materialized_totals.BUILT: True,
+                        materialized_totals.VERSION: (version or 0) + 1,
+                        materialized_totals.BUCKETS: {
+                            materialized_totals.encode_bucket(bucket): Decimal128(fte)
+                            for bucket, fte in buckets.items()
+                        },
+                    },
+                    upsert=True,
+                )
+            except pymongo.errors.DuplicateKeyError:  # a write created the doc
+                continue
+            if res.matched_count or res.upserted_id:
+                logging.info(
+                    f"Rebuilt live totals ({wbs_db=}): {len(buckets)} buckets."
+                )
+                return buckets
+
+        logging.warning(
+            f"Could not rebuild live totals, writes kept racing ({wbs_db=})"
+        )
+        return await compute()
+
+    async def get_fte_totals(
+        self, wbs_db: str, snap_coll: str
+    ) -> materialized_totals.Buckets:
+        """Get the collection's FTEs summed per bucket.
+
+        The live collection's are read from one document (built if needed).
+        """
+        await self._check_database_state(wbs_db)
+
+        if snap_coll != uuc.LIVE_COLLECTION:
+            return await self._compute_totals(wbs_db, snap_coll)
+        if (buckets := await self._read_totals(wbs_db)) is None:
+            buckets = await self.rebuild_totals(wbs_db)
+        return buckets
+
+    async def check_totals(self, wbs_db: str) -> bool:
+        """Compare the live totals to ones summed from scratch, and fix them.
+
+        Return whether they were consistent.
+        """
+        stored = await self._read_totals(wbs_db)
+        computed = await self._compute_totals(wbs_db, uuc.LIVE_COLLECTION)
+
+        def nonzero(buckets: materialized_totals.Buckets) -> dict[Any, Any]:
+            return {b: fte for b, fte in buckets.items() if fte}
+
+        if stored is not None and nonzero(stored) == nonzero(computed):
+            return True
+        logging.warning(f"Live totals are inconsistent ({wbs_db=}), rebuilding...")
+        await self.rebuild_totals(wbs_db)
+        await self._publish_change(wbs_db, invalidation_bus.LIVE)  # cached totals
+        return False
+
+    def _archive_coll_obj(self, wbs_db: str) -> Any:
+        return self._mongo[snapshot_archive.archive_db(wbs_db)][  # type: ignore[index]
+            snapshot_archive.ARCHIVE_COLLECTION
+        ]
+
+    async def _list_archived_snapshots(self, wbs_db: str) -> list[str]:
+        return cast(
+            list[str], await self._archive_coll_obj(wbs_db).distinct("timestamp")
+        )
+
+    async def _read_archived_snapshot(
+        self, wbs_db: str, snap_coll: str
+    ) -> list[uut.DBRecord]:
+        """Get the snapshot collection's documents, as they were stored."""
+        chunks = [
+            c["blob"]
+            async for c in self._archive_coll_obj(wbs_db)
+            .find({"timestamp": snap_coll})
+            .sort("chunk", pymongo.ASCENDING)
+        ]
+        if not chunks:
+            raise DocumentNotFoundError(f"No archived snapshot found for {snap_coll=}.")
+        logging.info(f"Rehydrating archived snapshot ({wbs_db=}, {snap_coll=})...")
+        return snapshot_archive.decode(chunks)
+
+    async def archive_snapshots(self, wbs_db: str, min_age: float) -> list[str]:
+        """Move the snapshots older than `min_age` seconds into the archive.
+
+        Each snapshot collection is packed into compressed blobs, then
+        dropped. Its supplemental document is kept (and marked). The latest
+        snapshot is never archived, since the next delta is relative to it.
+        Return the archived snapshots.
+        """
+        logging.debug(f"Archiving snapshots ({wbs_db=}, {min_age=})...")
+
+        snapshots = sorted(
+            (
+                c
+                for c in await self._list_collection_names(wbs_db)
+                if c != uuc.LIVE_COLLECTION
+            ),
+            reverse=True,
+        )
+        cutoff = time.time() - min_age
+        archive_coll = self._archive_coll_obj(wbs_db)
+        await archive_coll.create_index(
+            [("timestamp", pymongo.ASCENDING), ("chunk", pymongo.ASCENDING)],
+            name="timestamp_chunk_index",
+            unique=True,
+        )
+
+        archived = []
+        for snap_coll in snapshots[1:]:
+            try:
+                if float(snap_coll) > cutoff:
+                    continue
+            except ValueError:
+                continue  # not a snapshot
+            doc = await self._get_supplemental_doc(wbs_db, snap_coll)
+            if not doc.archived:  # else: interrupted last time, just drop it
+                stored = [d async for d in self._mongo[wbs_db][snap_coll].find()]  # type: ignore[index]
+                chunks = snapshot_archive.encode(stored)
+                await archive_coll.delete_many({"timestamp": snap_coll})
+                await archive_coll.insert_many(
+                    [
+                        {
+                            "timestamp": snap_coll,
+                            "chunk": i,
+                            "n_chunks": len(chunks),
+                            "encoding": snapshot_archive.ENCODING,
+                            "blob": Binary(c),
+                        }
+                        for i, c in enumerate(chunks)
+                    ]
+                )
+                await self._set_supplemental_doc(
+                    wbs_db, snap_coll, dc.replace(doc, archived=True)
+                )
+            await self._mongo[wbs_db].drop_collection(snap_coll)  # type: ignore[index]
+            await self._publish_change(wbs_db, invalidation_bus.SNAPSHOTS, snap_coll)
+            archived.append(snap_coll)
+
+        logging.info(f"Archived {len(archived)} snapshots ({wbs_db=}): {archived}.")
+        return archived
+
     async def restore_record(self, wbs_db: str, record_id: str) -> None:
         """Mark the record as not deleted."""
         logging.debug(f"Restoring {record_id} ({wbs_db=})...")
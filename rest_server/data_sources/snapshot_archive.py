@@ -0,0 +1,48 @@
+"""Pack a snapshot collection's documents into compressed blobs, and back.
+
+An archived snapshot is stored as one or more "chunk" documents in
+`{wbs_db}-archive`'s `ARCHIVE_COLLECTION`, each holding zlib-compressed,
+concatenated BSON. Its supplemental document stays where it was.
+"""
+
+
+import zlib
+from typing import Final, Iterable
+
+import bson
+import universal_utils.types as uut
+
+from ..config import ARCHIVE_DB_SUFFIX
+
+ARCHIVE_COLLECTION: Final[str] = "snapshots"
+ENCODING: Final[str] = "bson+zlib"
+
+# stay well under MongoDB's 16MB document limit, even if incompressible
+MAX_CHUNK_BYTES: Final[int] = 8 * 1024**2
+
+
+def archive_db(wbs_db: str) -> str:
+    """Get the name of the WBS's archive database."""
+    return f"{wbs_db}{ARCHIVE_DB_SUFFIX}"
+
+
+def encode(docs: Iterable[uut.DBRecord]) -> list[bytes]:
+    """Pack the documents into compressed chunks."""
+    chunks: list[bytes] = []
+    buf: list[bytes] = []
+    size = 0
+    for doc in docs:
+        raw = bson.encode(doc)
+        if buf and size + len(raw) > MAX_CHUNK_BYTES:
+            chunks.append(zlib.compress(b"".join(buf)))
+            buf, size = [], 0
+        buf.append(raw)
+        size += len(raw)
+    if buf or not chunks:  # an empty snapshot is one empty chunk
+        chunks.append(zlib.compress(b"".join(buf)))
+    return chunks
+
+
+def decode(chunks: Iterable[bytes]) -> list[uut.DBRecord]:
+    """Unpack the documents from compressed chunks (in order)."""
+    return [doc for c in chunks for doc in bson.decode_all(zlib.decompress(c))]
@@ -0,0 +1,67 @@
+"""Delta encoding for snapshot collections.
+
+A "delta" snapshot stores only the records that were added/changed since
+its base snapshot, plus a tombstone for each removed record. A "full"
+snapshot (a keyframe) stores every record. Either way, the snapshot's
+supplemental document is its manifest: see `types.SupplementalDoc`.
+
+All records here are mongofied & keyed by their `_id`.
+"""
+
+
+import dataclasses as dc
+from typing import Any, Final, Iterable
+
+import universal_utils.types as uut
+
+from . import columns
+
+FULL: Final[str] = "full"
+DELTA: Final[str] = "delta"
+FORMATS: Final[tuple[str, ...]] = (FULL, DELTA)
+
+# a tombstone: `{"_id": <id>, REMOVED: True}`
+REMOVED: Final[str] = "_delta_removed"
+
+# store a keyframe instead if the delta would have more than this many
+# documents per record (ex: after an xlsx import, every record is new)
+MAX_DELTA_RATIO: Final[float] = 0.5
+
+SnapshotDocs = dict[Any, uut.DBRecord]  # by `_id`
+
+
+@dc.dataclass(frozen=True)
+class Delta:
+    """The documents to store for a delta snapshot."""
+
+    base: str  # the snapshot this is relative to
+    depth: int  # number of deltas back to the keyframe, including this one
+    docs: list[uut.DBRecord]
+
+
+def by_id(records: Iterable[uut.DBRecord]) -> SnapshotDocs:
+    """Key the records by their `_id`."""
+    return {r[columns.ID]: r for r in records}
+
+
+def compute_delta(base: SnapshotDocs, current: SnapshotDocs) -> list[uut.DBRecord]:
+    """Get the added/changed records, plus tombstones for the removed ones."""
+    docs = [r for i, r in current.items() if base.get(i) != r]
+    docs += [{columns.ID: i, REMOVED: True} for i in base if i not in current]
+    return docs
+
+
+def apply_delta(base: SnapshotDocs, docs: Iterable[uut.DBRecord]) -> SnapshotDocs:
+    """Get the records after applying the delta, AS A COPY (`base` is unchanged)."""
+    result = dict(base)
+    for doc in docs:
+        if doc.get(REMOVED):
+            result.pop(doc[columns.ID], None)
+        else:
+            result[doc[columns.ID]] = doc
+    return result
+
+
+def is_worth_it(n_delta_docs: int, n_records: int) -> bool:
+    """Return whether a delta is smaller enough than a keyframe to store."""
+    return n_delta_docs <= n_records * MAX_DELTA_RATIO
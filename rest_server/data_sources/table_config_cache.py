@@ -4,10 +4,12 @@
 import dataclasses as dc
 import logging
 import time
-from typing import Final
+from typing import Any, Final
 
 import universal_utils.types as uut
+from universal_utils.validation import RecordValidator
 
+from ..utils import metrics
 from . import columns, todays_institutions, wbs
 
 US = "US"
@@ -78,13 +80,22 @@ class TableConfigCache:
     ) -> None:
         self.column_configs, self.institutions = _column_configs, _institutions
         self._timestamp = int(time.time())
+        self._validators: dict[str, RecordValidator] = {}
+
+    @property
+    def version(self) -> int:
+        """Get a number that changes whenever the table config is rebuilt."""
+        return self._timestamp
 
     async def refresh(self) -> None:
         """Get/Create the most recent table-config doc."""
         if int(time.time()) - self._timestamp < MAX_CACHE_AGE:
+            metrics.record_cache("table_config", hit=True)
             return
+        metrics.record_cache("table_config", hit=False)
         self.column_configs, self.institutions = await self._build()
         self._timestamp = int(time.time())
+        self._validators = {}
 
     @staticmethod
     async def _build() -> tuple[dict[str, _ColumnConfig], list[uut.Institution]]:
@@ -302,6 +313,15 @@ class TableConfigCache:
         ret[columns.WBS_L3] = (columns.WBS_L2, wbs.WORK_BREAKDOWN_STRUCTURES[l1])
         return ret
 
+    def get_record_validator(self, l1: str) -> RecordValidator:
+        """Get the record validator, compiled once per table config."""
+        if l1 not in self._validators:
+            self._validators[l1] = RecordValidator(
+                self.get_simple_dropdown_menus(l1),
+                self.get_conditional_dropdown_menus(l1),
+            )
+        return self._validators[l1]
+
     def get_dropdowns(self, l1: str) -> list[str]:
         """Get the columns that are dropdowns."""
         return list(self.get_simple_dropdown_menus(l1).keys()) + list(
@@ -352,6 +372,24 @@ class TableConfigCache:
         """Get names of fields created on-the-fly, data not stored."""
         return [col for col, config in self.column_configs.items() if config.on_the_fly]
 
+    def get_table_config(self, l1: str) -> dict[str, Any]:
+        """Get the full table config for `l1`, as served at '/table/config'."""
+        return {
+            "columns": self.get_columns(),
+            "simple_dropdown_menus": self.get_simple_dropdown_menus(l1),
+            "labor_categories": self.get_labor_categories_and_abbrevs(),
+            "conditional_dropdown_menus": self.get_conditional_dropdown_menus(l1),
+            "dropdowns": self.get_dropdowns(l1),
+            "numerics": self.get_numerics(),
+            "non_editables": self.get_non_editables(),
+            "hiddens": self.get_hiddens(),
+            "mandatories": self.get_mandatory_columns(),
+            "tooltips": self.get_tooltips(),
+            "widths": self.get_widths(),
+            "border_left_columns": self.get_border_left_columns(),
+            "page_size": self.get_page_size(),
+        }
+
     def sort_key(self, k: dict[str, uut.DataEntry]) -> tuple[uut.DataEntry, ...]:
         """Sort key for the table."""
         sort_keys: list[uut.DataEntry] = []
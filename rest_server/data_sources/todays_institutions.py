@@ -1,12 +1,15 @@
 """Tools for getting info on the state of today's institutions."""
 
 import logging
+import time
 
 import universal_utils.types as uut
 from krs import institutions as krs_institutions  # type: ignore[import]
 from krs import token
 from wipac_dev_tools import strtobool
 
+from ..utils import metrics
+
 
 def convert_krs_institution(
     group: str,
@@ -39,11 +42,16 @@ async def request_krs_institutions() -> list[uut.Institution]:
 
     all_insts: dict[str, uut.Institution] = {}
 
-    krs_experiment_insts = await krs_institutions.list_insts(
-        experiment="IceCube",
-        filter_func=None,
-        rest_client=rc,
-    )
+    start, status = time.monotonic(), "error"
+    try:
+        krs_experiment_insts = await krs_institutions.list_insts(
+            experiment="IceCube",
+            filter_func=None,
+            rest_client=rc,
+        )
+        status = "ok"
+    finally:
+        metrics.KRS_REQUEST_DURATION.observe(time.monotonic() - start, status=status)
     for group, attrs in krs_experiment_insts.items():
         if not attrs:
             continue
@@ -0,0 +1,71 @@
+"""Convert existing snapshot collections to another storage format.
+
+    python -m rest_server.migrate_snapshots --to delta [--wbs mo] [--dry-run]
+
+Uses the same environment variables as the REST server. Stop the REST
+server(s) first: each snapshot collection is swapped out in turn.
+"""
+
+
+import argparse
+import asyncio
+import logging
+
+import coloredlogs  # type: ignore[import]
+from motor.motor_tornado import MotorClient
+
+from .config import mongodb_client_kwargs, mongodb_url
+from .data_sources import mou_db, snapshot_deltas, table_config_cache, wbs
+from .utils import utils
+
+
+async def migrate(snapshot_format: str, wbs_dbs: list[str], dry_run: bool) -> None:
+    """Convert each WBS's snapshots, then print a summary."""
+    mou_db_client = mou_db.MOUDatabaseClient(
+        MotorClient(mongodb_url(), **mongodb_client_kwargs()),
+        utils.MOUDataAdaptor(await table_config_cache.TableConfigCache.create()),
+    )
+
+    for wbs_db in wbs_dbs:
+        converted = await mou_db_client.convert_snapshots(
+            wbs_db, snapshot_format, dry_run
+        )
+        n_stored = sum(n for _, n in converted.values())
+        n_deltas = sum(1 for f, _ in converted.values() if f == snapshot_deltas.DELTA)
+        print(
+            f"{wbs_db}: {len(converted)} snapshots ({n_deltas} deltas), "
+            f"{n_stored} stored documents{' (dry run)' if dry_run else ''}"
+        )
+
+
+def main() -> None:
+    """Parse args & migrate."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--to", required=True, choices=snapshot_deltas.FORMATS)
+    parser.add_argument(
+        "--wbs",
+        action="append",
+        choices=list(wbs.WORK_BREAKDOWN_STRUCTURES.keys()),
+        help="the WBS L1(s) to migrate (default: all)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report what would be stored",
+    )
+    parser.add_argument("-l", "--log", default="INFO", help="the output logging level")
+    args = parser.parse_args()
+
+    coloredlogs.install(level=getattr(logging, args.log.upper()))
+
+    asyncio.run(
+        migrate(
+            args.to,
+            args.wbs or list(wbs.WORK_BREAKDOWN_STRUCTURES.keys()),
+            args.dry_run,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,26 @@
 """Routes handlers for the MOU REST API server interface."""
 
 
+import contextlib
 import dataclasses as dc
 import json
 import logging
-from typing import Any
+import pathlib
+import tempfile
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 import universal_utils.constants as uuc
 import universal_utils.types as uut
 from rest_tools import server
+from tornado import http1connection, web
+from universal_utils import columnar
+from universal_utils.profiling import RequestProfiler
 from wipac_dev_tools import strtobool
 
-from .config import AUTH_SERVICE_ACCOUNT, is_testing
-from .data_sources import mou_db, todays_institutions, wbs
-from .utils import utils
+from .config import AUTH_SERVICE_ACCOUNT, ENV, PROFILE_HEADER, is_testing
+from .data_sources import columns, materialized_totals, mou_db, todays_institutions, wbs
+from .utils import admission, change_feed, fast_json, jobs, metrics, utils
+from .utils.response_cache import ResponseCache
 
 _WBS_L1_REGEX_VALUES = "|".join(wbs.WORK_BREAKDOWN_STRUCTURES.keys())
 
@@ -47,36 +54,161 @@ class BaseMOUHandler(server.RestHandler):  # pylint: disable=W0223
         self,
         mou_db_client: mou_db.MOUDatabaseClient,
         *args: Any,
+        response_cache: ResponseCache | None = None,
+        gates: dict[str, admission.Gate] | None = None,
         **kwargs: Any,
     ) -> None:
         """Initialize a BaseMOUHandler object."""
         super().initialize(*args, **kwargs)  # type: ignore[no-untyped-call]
         # pylint: disable=W0201
         self.mou_db_client = mou_db_client
+        self.response_cache = response_cache
+        self.gates = gates or {}
+        self._retry_after = 0
         self.tc_cache = self.mou_db_client.data_adaptor.tc_cache
         self.tc_data_adaptor = utils.TableConfigDataAdaptor(self.tc_cache)
+        self._response_size = 0
+        self._profiler: RequestProfiler | None = None
+
+    def _may_profile(self) -> bool:
+        """Return whether the requestor is authorized to profile requests.
+
+        That's an authenticated token with the service account's role (like
+        the web app's, which is admin-only) -- in testing, auth is disabled.
+        """
+        if is_testing():
+            return True
+        if not self.current_user:  # validates the token, if any
+            return False
+        roles = self.auth_data.get("realm_access", {}).get("roles", [])
+        return AUTH_SERVICE_ACCOUNT in roles
+
+    def prepare(self) -> None:
+        """Start profiling, if enabled, requested & authorized."""
+        super().prepare()  # type: ignore[no-untyped-call]
+        if (
+            ENV.MOU_PROFILE_DIR
+            and "true"
+            in (
+                self.request.headers.get(PROFILE_HEADER, "").lower(),
+                (self.get_query_argument("profile", "") or "").lower(),
+            )
+            and self._may_profile()
+        ):
+            self._profiler = RequestProfiler(
+                ENV.MOU_PROFILE_DIR,
+                f"{self.request.method}_{type(self).__name__}_{self.request.path}",
+            )
+            self._profiler.start()
+
+    def on_connection_close(self) -> None:
+        """Stop profiling, if the client left early."""
+        super().on_connection_close()
+        if self._profiler:
+            self._profiler.stop()
+
+    def _wants_columnar(self) -> bool:
+        return columnar.MEDIA_TYPE in self.request.headers.get("Accept", "")
+
+    def _set_content_headers(self) -> None:
+        self.set_header("Vary", "Accept")
+        media_type = (
+            columnar.MEDIA_TYPE if self._wants_columnar() else "application/json"
+        )
+        self.set_header("Content-Type", f"{media_type}; charset=UTF-8")
+
+    def _encode(self, body: dict[str, Any]) -> bytes:
+        """Encode the body as requested, & set the headers to match.
+
+        Plain JSON is the default. See `universal_utils.columnar`.
+        """
+        self._set_content_headers()
+        if self._wants_columnar():
+            body = columnar.encode_tables(body)
+        return fast_json.dumps(body)
+
+    def write(self, chunk: str | bytes | dict[str, Any]) -> None:
+        """Write the chunk, encoding a dict (see `_encode()`)."""
+        if isinstance(chunk, dict):
+            chunk = self._encode(chunk)
+        super().write(chunk)
+
+    async def _enter_gate(self, name: str) -> admission.Gate | None:
+        """Take a slot of the named gate, if there's such a gate.
+
+        If it's saturated, respond 503 with `Retry-After`.
+        """
+        if not (gate := self.gates.get(name)):
+            return None
+        try:
+            await gate.acquire()
+        except admission.SaturatedError as e:
+            self._retry_after = ENV.MOU_ADMIT_RETRY_AFTER_SECS
+            raise web.HTTPError(503, reason=str(e))
+        return gate
+
+    @contextlib.asynccontextmanager
+    async def admit(self, name: str) -> AsyncIterator[None]:
+        """Hold a slot of the named gate (see `admission`) for the block."""
+        gate = await self._enter_gate(name)
+        try:
+            yield
+        finally:
+            if gate:
+                gate.release()
+
+    def write_error(self, status_code: int = 500, **kwargs: Any) -> None:
+        """Write the error, with `Retry-After` if turned away by a gate.
+
+        A `jobs.DetailedHTTPError`'s details are in the body's `details`.
+        """
+        if self._retry_after:
+            self.set_header("Retry-After", str(self._retry_after))
+        _, exc, _ = kwargs.get("exc_info", (None, None, None))
+        if isinstance(exc, jobs.DetailedHTTPError):
+            self.write(
+                {"code": status_code, "error": self._reason, "details": exc.details}
+            )
+            self.finish()
+            return
+        super().write_error(status_code, **kwargs)
 
-
-# -----------------------------------------------------------------------------
-
-
-class MainHandler(BaseMOUHandler):  # pylint: disable=W0223
-    """MainHandler is a BaseMOUHandler that handles the root route."""
-
-    ROUTE = r"/$"
-
-    def get(self) -> None:
-        """Handle GET."""
-        self.write({})
-
-
-# -----------------------------------------------------------------------------
-
-
-class TableHandler(BaseMOUHandler):  # pylint: disable=W0223
-    """Handle requests for a table."""
-
-    ROUTE = rf"/table/data/(?P<wbs_l1>{_WBS_L1_REGEX_VALUES})$"
+    async def write_cached(
+        self,
+        wbs_db: str,
+        build: Callable[[], Awaitable[dict[str, Any]]],
+        gate: str = "",
+    ) -> None:
+        """Write an idempotent GET's body, re-using the encoded bytes if current.
+
+        The key is the request (path, query & body), its encoding, and the
+        versions of the table config & the WBS's data (unless `wbs_db` is
+        '') -- any change, in any process (see the invalidation bus), makes
+        a new key. Only building a body needs a slot of the `gate`.
+        """
+
+        async def admitted_build() -> dict[str, Any]:
+            async with self.admit(gate):
+                return await build()
+
+        if not self.response_cache:
+            self.write(await admitted_build())
+            return
+
+        key = (
+            self.request.path,
+            self.request.query,
+            self.request.body,
+            self._wants_columnar(),
+            self.tc_cache.version,
+            self.mou_db_client.data_version(wbs_db) if wbs_db else None,
+        )
+        if (encoded := self.response_cache.get(key)) is None:
+            encoded = self._encode(await admitted_build())
+            self.response_cache.put(key, encoded)
+        else:
+            self._set_content_headers()
+        super().write(encoded)
 
     async def _get_clientbound_snapshot_info(
         self,
@@ -119,6 +251,111 @@ class TableHandler(BaseMOUHandler):  # pylint: disable=W0223
                 "current_snapshot": dc.asdict(curr_snap_info),
             }
 
+    async def run_job(
+        self,
+        kind: str,
+        wbs_db: str,
+        work: jobs.WorkFunc,
+        gate: str = "",
+        on_submit: Callable[[], None] | None = None,
+    ) -> None:
+        """Run the work as a job -- one of the kind per WBS at a time (else 409).
+
+        With the `as_job` argument, respond right away (202) with the job's
+        ID (see `JobHandler`); otherwise, wait & respond with its result.
+        The job holds a slot of the `gate` until it's done. `on_submit` is
+        called once the job is submitted (so, the work will run).
+        """
+        as_job = self.get_argument(
+            "as_job",
+            type=bool,
+            default=False,
+        )
+
+        slot = await self._enter_gate(gate)
+
+        async def admitted_work(progress: jobs.ProgressFunc) -> dict[str, Any]:
+            try:
+                return await work(progress)
+            finally:
+                if slot:
+                    slot.release()
+
+        try:
+            job_id = await self.mou_db_client.jobs.submit(kind, wbs_db, admitted_work)
+        except Exception as e:
+            if slot:
+                slot.release()
+            if isinstance(e, jobs.JobConflictError):
+                raise web.HTTPError(409, reason=str(e))
+            raise
+        if on_submit:
+            on_submit()
+
+        if as_job:
+            self.set_status(202)
+            self.write({"job_id": job_id})
+        else:
+            self.write(await self.mou_db_client.jobs.wait(job_id))
+
+    def flush(self, *args: Any, **kwargs: Any) -> Any:
+        """Tally the response body's size, then flush."""
+        self._response_size += sum(len(c) for c in self._write_buffer)
+        return super().flush(*args, **kwargs)
+
+    def on_finish(self) -> None:
+        """Record the request's metrics."""
+        super().on_finish()  # type: ignore[no-untyped-call]
+        if self._profiler:
+            self._profiler.stop()
+        handler, method = type(self).__name__, self.request.method or ""
+        metrics.HTTP_REQUEST_DURATION.observe(
+            self.request.request_time(),
+            handler=handler,
+            method=method,
+            code=str(self.get_status()),
+        )
+        metrics.HTTP_RESPONSE_SIZE.observe(
+            self._response_size, handler=handler, method=method
+        )
+
+
+# -----------------------------------------------------------------------------
+
+
+class MainHandler(BaseMOUHandler):  # pylint: disable=W0223
+    """MainHandler is a BaseMOUHandler that handles the root route."""
+
+    ROUTE = r"/$"
+
+    def get(self) -> None:
+        """Handle GET."""
+        self.write({})
+
+
+# -----------------------------------------------------------------------------
+
+
+class MetricsHandler(BaseMOUHandler):  # pylint: disable=W0223
+    """Handle requests for the server's metrics (Prometheus text format)."""
+
+    ROUTE = r"/metrics$"
+
+    @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
+    async def get(self) -> None:
+        """Handle GET."""
+        self.set_header("Content-Type", metrics.CONTENT_TYPE)
+        self.write(metrics.REGISTRY.render())
+
+
+# -----------------------------------------------------------------------------
+
+
+class TableHandler(BaseMOUHandler):  # pylint: disable=W0223
+    """Handle requests for a table."""
+
+    ROUTE = rf"/table/data/(?P<wbs_l1>{_WBS_L1_REGEX_VALUES})$"
+
     @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
     async def get(self, wbs_l1: str) -> None:
         """Handle GET."""
@@ -176,37 +413,55 @@ class TableHandler(BaseMOUHandler):  # pylint: disable=W0223
         if restore_id:
             await self.mou_db_client.restore_record(wbs_l1, restore_id)
 
-        table = await self.mou_db_client.get_table(
-            wbs_l1, collection, labor=labor, institution=institution
-        )
+        async def build() -> dict[str, Any]:
+            table = await self.mou_db_client.get_table(
+                wbs_l1, collection, labor=labor, institution=institution
+            )
 
-        # On-the-fly fields/rows
-        for record in table:
-            self.tc_data_adaptor.add_on_the_fly_fields(record)
-        if total_rows:
-            table.extend(
-                self.tc_data_adaptor.get_total_rows(
-                    wbs_l1,
-                    table,
-                    only_totals_w_data=bool(labor or institution),
-                    with_us_non_us=not institution,
+            # On-the-fly fields/rows
+            for record in table:
+                self.tc_data_adaptor.add_on_the_fly_fields(record)
+            if total_rows:
+                # sum the pre-summed buckets, unless filtering by what they lack
+                summands = table
+                if not labor:
+                    buckets = await self.mou_db_client.get_fte_totals(
+                        wbs_l1, collection
+                    )
+                    summands = [
+                        self.tc_data_adaptor.add_on_the_fly_fields(r)
+                        for r in materialized_totals.to_records(buckets, institution)
+                    ]
+                table.extend(
+                    await self.mou_db_client.offload.for_table(
+                        len(summands),
+                        self.tc_data_adaptor.get_total_rows,
+                        wbs_l1,
+                        summands,
+                        only_totals_w_data=bool(labor or institution),
+                        with_us_non_us=not institution,
+                    )
                 )
+
+            # sort
+            await self.mou_db_client.offload.for_table(
+                len(table), table.sort, key=self.tc_cache.sort_key
             )
 
-        # sort
-        table.sort(key=self.tc_cache.sort_key)
+            # finish up
+            if include_snapshot_info:
+                clientbound_snapshot_info = await self._get_clientbound_snapshot_info(
+                    wbs_l1,
+                    collection,
+                    len(table),
+                    is_admin,
+                )
+                return clientbound_snapshot_info | {"table": table}
+            return {"table": table}
 
-        # finish up
-        if include_snapshot_info:
-            clientbound_snapshot_info = await self._get_clientbound_snapshot_info(
-                wbs_l1,
-                collection,
-                len(table),
-                is_admin,
-            )
-            self.write(clientbound_snapshot_info | {"table": table})
-        else:
-            self.write({"table": table})
+        await self.write_cached(
+            wbs_l1, build, gate=admission.TOTALS if total_rows else ""
+        )
 
     @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
     async def post(self, wbs_l1: str) -> None:
@@ -228,21 +483,148 @@ class TableHandler(BaseMOUHandler):  # pylint: disable=W0223
             type=bool,
         )
 
-        # ingest
-        prev_snap, curr_snap = await self.mou_db_client.ingest_xlsx(
-            wbs_l1, base64_file, filename, creator
+        async def work(progress: jobs.ProgressFunc) -> dict[str, Any]:
+            # ingest
+            prev_snap, curr_snap = await self.mou_db_client.ingest_xlsx(
+                wbs_l1, base64_file, filename, creator, progress
+            )
+            # get info for snapshot(s)
+            return await self._get_clientbound_snapshot_info(
+                wbs_l1,
+                curr_snap,
+                await self.mou_db_client.count_records(wbs_l1, curr_snap),
+                is_admin,
+                prev_snap_override=prev_snap,  # optimization & race condition protection
+            )
+
+        await self.run_job(jobs.IMPORT, wbs_l1, work, gate=admission.IMPORTS)
+
+
+# -----------------------------------------------------------------------------
+
+
+@web.stream_request_body
+class TableXlsxHandler(BaseMOUHandler):  # pylint: disable=W0223
+    """Handle uploads of an xlsx file's raw bytes, to become a table.
+
+    Unlike POSTing a base64-encoded file to `TableHandler`, the body is
+    streamed to a temporary file as it arrives, so it's never held in
+    memory (nor decoded) here. The other arguments are in the query.
+    """
+
+    ROUTE = rf"/table/xlsx/(?P<wbs_l1>{_WBS_L1_REGEX_VALUES})$"
+
+    @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
+    async def prepare(self) -> None:  # type: ignore[override]
+        """Authenticate before any of the body is received."""
+        super().prepare()
+        assert isinstance(self.request.connection, http1connection.HTTP1Connection)
+        self.request.connection.set_max_body_size(
+            int(ENV.MOU_XLSX_MAX_MB * 1024 * 1024)
+        )
+        # pylint: disable=W0201,R1732
+        self._xlsx = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+        self._xlsx_path: pathlib.Path | None = pathlib.Path(self._xlsx.name)
+
+    def data_received(self, chunk: bytes) -> None:
+        """Write the chunk to the temporary file."""
+        self._xlsx.write(chunk)
+
+    @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
+    async def post(self, wbs_l1: str) -> None:
+        """Handle POST."""
+        filename = self.get_argument(
+            "filename",
+            type=str,
+        )
+        creator = self.get_argument(
+            "creator",
+            type=str,
+        )
+        is_admin = self.get_argument(
+            "is_admin",
+            type=bool,
+        )
+        self._xlsx.close()
+        path = pathlib.Path(self._xlsx.name)
+
+        def hand_over() -> None:
+            # the job removes it -- it may outlive this request
+            self._xlsx_path = None  # pylint: disable=W0201
+
+        async def work(progress: jobs.ProgressFunc) -> dict[str, Any]:
+            try:
+                # ingest
+                prev_snap, curr_snap = await self.mou_db_client.ingest_xlsx_file(
+                    wbs_l1, str(path), filename, creator, progress
+                )
+            finally:
+                path.unlink(missing_ok=True)
+            # get info for snapshot(s)
+            return await self._get_clientbound_snapshot_info(
+                wbs_l1,
+                curr_snap,
+                await self.mou_db_client.count_records(wbs_l1, curr_snap),
+                is_admin,
+                prev_snap_override=prev_snap,  # optimization & race condition protection
+            )
+
+        # if it's turned away (409, 503, ...), `on_finish()` removes the file
+        await self.run_job(
+            jobs.IMPORT, wbs_l1, work, gate=admission.IMPORTS, on_submit=hand_over
         )
 
-        # get info for snapshot(s)
-        clientbound_snapshot_info = await self._get_clientbound_snapshot_info(
-            wbs_l1,
-            curr_snap,
-            len(await self.mou_db_client.get_table(wbs_l1, curr_snap, "", "")),
-            is_admin,
-            prev_snap_override=prev_snap,  # optimization & race condition protection
+    def _remove_xlsx(self) -> None:
+        if xlsx := getattr(self, "_xlsx", None):
+            xlsx.close()
+        if path := getattr(self, "_xlsx_path", None):
+            path.unlink(missing_ok=True)
+
+    def on_connection_close(self) -> None:
+        """Remove the temporary file, if the client left early."""
+        super().on_connection_close()
+        self._remove_xlsx()
+
+    def on_finish(self) -> None:
+        """Remove the temporary file."""
+        super().on_finish()
+        self._remove_xlsx()
+
+
+# -----------------------------------------------------------------------------
+
+
+class TableTotalsHandler(BaseMOUHandler):  # pylint: disable=W0223
+    """Handle requests for a table's FTEs, summed per institution, L2, L3 &
+    source of funds."""
+
+    ROUTE = rf"/table/totals/(?P<wbs_l1>{_WBS_L1_REGEX_VALUES})$"
+
+    @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
+    async def get(self, wbs_l1: str) -> None:
+        """Handle GET."""
+        collection = self.get_argument(
+            "snapshot",
+            default=uuc.LIVE_COLLECTION,
+            type=str,
+            forbiddens=[""],
+        )
+        institution = self.get_argument(
+            "institution",
+            default="",
+            type=str,
         )
 
-        self.write(clientbound_snapshot_info)
+        async def build() -> dict[str, Any]:
+            buckets = await self.mou_db_client.get_fte_totals(wbs_l1, collection)
+            return {
+                "totals": [
+                    r | {columns.FTE: float(str(r[columns.FTE]))}  # JSON number
+                    for r in materialized_totals.to_records(buckets, institution)
+                ]
+            }
+
+        await self.write_cached(wbs_l1, build)
 
 
 # -----------------------------------------------------------------------------
@@ -309,33 +691,21 @@ class TableConfigHandler(BaseMOUHandler):  # pylint: disable=W0223
     async def get(self) -> None:
         """Handle GET."""
         await self.tc_cache.refresh()
-        table_config = {
-            l1: {
-                "columns": self.tc_cache.get_columns(),
-                "simple_dropdown_menus": self.tc_cache.get_simple_dropdown_menus(l1),
-                "labor_categories": self.tc_cache.get_labor_categories_and_abbrevs(),
-                "conditional_dropdown_menus": self.tc_cache.get_conditional_dropdown_menus(
-                    l1
-                ),
-                "dropdowns": self.tc_cache.get_dropdowns(l1),
-                "numerics": self.tc_cache.get_numerics(),
-                "non_editables": self.tc_cache.get_non_editables(),
-                "hiddens": self.tc_cache.get_hiddens(),
-                "mandatories": self.tc_cache.get_mandatory_columns(),
-                "tooltips": self.tc_cache.get_tooltips(),
-                "widths": self.tc_cache.get_widths(),
-                "border_left_columns": self.tc_cache.get_border_left_columns(),
-                "page_size": self.tc_cache.get_page_size(),
-            }
-            for l1 in wbs.WORK_BREAKDOWN_STRUCTURES.keys()  # pylint:disable=C0201
-        }
 
-        logging.debug(
-            "Table Config Keys:\n%s",
-            json.dumps({k: list(v.keys()) for k, v in table_config.items()}, indent=4),
-        )
+        async def build() -> dict[str, Any]:
+            table_config = {
+                l1: self.tc_cache.get_table_config(l1)
+                for l1 in wbs.WORK_BREAKDOWN_STRUCTURES.keys()  # pylint:disable=C0201
+            }
+            logging.debug(
+                "Table Config Keys:\n%s",
+                json.dumps(
+                    {k: list(v.keys()) for k, v in table_config.items()}, indent=4
+                ),
+            )
+            return table_config
 
-        self.write(table_config)
+        await self.write_cached("", build)  # only changes when the cache refreshes
 
 
 # -----------------------------------------------------------------------------
@@ -354,17 +724,57 @@ class SnapshotsHandler(BaseMOUHandler):  # pylint: disable=W0223
             type=bool,
         )
 
-        # db calls: O(1)
-        timestamps = await self.mou_db_client.list_snapshot_timestamps(
-            wbs_l1, exclude_admin_snaps=not is_admin
+        async def build() -> dict[str, Any]:
+            # db calls: O(1)
+            timestamps = await self.mou_db_client.list_snapshot_timestamps(
+                wbs_l1, exclude_admin_snaps=not is_admin
+            )
+
+            # db calls: O(n)
+            snapshots = [
+                await self.mou_db_client.get_snapshot_info(wbs_l1, ts)
+                for ts in timestamps
+            ]
+
+            return {"snapshots": [dc.asdict(si) for si in snapshots]}
+
+        await self.write_cached(wbs_l1, build, gate=admission.SNAPSHOT_LISTS)
+
+
+# -----------------------------------------------------------------------------
+
+
+class ChangesHandler(BaseMOUHandler):  # pylint: disable=W0223
+    """Handle requests for what changed, waiting for the next change if asked."""
+
+    ROUTE = rf"/changes/(?P<wbs_l1>{_WBS_L1_REGEX_VALUES})$"
+
+    @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
+    async def get(self, wbs_l1: str) -> None:
+        """Handle GET.
+
+        Without `since`, only get the current version (to start from).
+        """
+        since = self.get_argument(
+            "since",
+            default=0.0,
+            type=float,
+        )
+        wait = self.get_argument(
+            "wait",
+            default=0.0,
+            type=float,
         )
 
-        # db calls: O(n)
-        snapshots = [
-            await self.mou_db_client.get_snapshot_info(wbs_l1, ts) for ts in timestamps
-        ]
+        feed = self.mou_db_client.changes
+        if not since:
+            changes = change_feed.Changes(feed.version(wbs_l1))
+        else:
+            changes = await feed.wait(
+                wbs_l1, since, min(wait, ENV.MOU_CHANGES_MAX_WAIT_SECS)
+            )
 
-        self.write({"snapshots": [dc.asdict(si) for si in snapshots]})
+        self.write(dc.asdict(changes))
 
 
 # -----------------------------------------------------------------------------
@@ -387,12 +797,31 @@ class MakeSnapshotHandler(BaseMOUHandler):  # pylint: disable=W0223
             type=str,
         )
 
-        snap_ts = await self.mou_db_client.snapshot_live_collection(
-            wbs_l1, name, creator, False
-        )
-        snap_info = await self.mou_db_client.get_snapshot_info(wbs_l1, snap_ts)
+        async def work(progress: jobs.ProgressFunc) -> dict[str, Any]:
+            await progress(stage="snapshotting")
+            snap_ts = await self.mou_db_client.snapshot_live_collection(
+                wbs_l1, name, creator, False
+            )
+            snap_info = await self.mou_db_client.get_snapshot_info(wbs_l1, snap_ts)
+            return dc.asdict(snap_info)
 
-        self.write(dc.asdict(snap_info))
+        await self.run_job(jobs.SNAPSHOT, wbs_l1, work, gate=admission.SNAPSHOTS)
+
+
+# -----------------------------------------------------------------------------
+
+
+class JobHandler(BaseMOUHandler):  # pylint: disable=W0223
+    """Handle requests for a background job's state (see `run_job()`)."""
+
+    ROUTE = r"/jobs/(?P<job_id>\w+)$"
+
+    @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
+    async def get(self, job_id: str) -> None:
+        """Handle GET."""
+        if not (job := await self.mou_db_client.jobs.get(job_id)):
+            raise web.HTTPError(404, reason=f"Job not found ({job_id=})")
+        self.write(dc.asdict(job))
 
 
 # -----------------------------------------------------------------------------
@@ -416,9 +845,12 @@ class InstitutionValuesConfirmationTouchstoneHandler(
     @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
     async def get(self, wbs_l1: str) -> None:
         """Handle POST."""
-        timestamp = await self.mou_db_client.get_touchstone(wbs_l1)
 
-        self.write({"touchstone_timestamp": timestamp})
+        async def build() -> dict[str, Any]:
+            timestamp = await self.mou_db_client.get_touchstone(wbs_l1)
+            return {"touchstone_timestamp": timestamp}
+
+        await self.write_cached(wbs_l1, build)
 
 
 # -----------------------------------------------------------------------------
@@ -481,11 +913,13 @@ class InstitutionValuesHandler(BaseMOUHandler):  # pylint: disable=W0223
             type=str,
         )
 
-        vals = await self.mou_db_client.get_institution_values(
-            wbs_l1, snapshot_timestamp, institution
-        )
+        async def build() -> dict[str, Any]:
+            vals = await self.mou_db_client.get_institution_values(
+                wbs_l1, snapshot_timestamp, institution
+            )
+            return dc.asdict(vals)
 
-        self.write(dc.asdict(vals))
+        await self.write_cached(wbs_l1, build)
 
     @keycloak_role_auth(roles=[AUTH_SERVICE_ACCOUNT])  # type: ignore
     async def post(self, wbs_l1: str) -> None:
@@ -0,0 +1,84 @@
+"""Limit how many expensive requests run at once, per route.
+
+A `Gate` lets `limit` requests in at a time; up to `queue` more wait
+their turn (first come, first served), and any more are turned away --
+the handler responds 503 with `Retry-After`. So, a burst of heavy
+requests (ex: totals, imports, snapshots) can't take the whole event
+loop & MongoDB pool from the cheap ones (ex: record edits). The limits
+are per process.
+"""
+
+
+import asyncio
+import collections
+import time
+from typing import Final
+
+from . import metrics
+
+# gates
+TOTALS: Final[str] = "totals"  # tables with total rows
+IMPORTS: Final[str] = "imports"
+SNAPSHOTS: Final[str] = "snapshots"  # making them
+SNAPSHOT_LISTS: Final[str] = "snapshot_lists"
+
+
+class SaturatedError(Exception):
+    """Raised when a gate has no free slot, nor room to wait for one."""
+
+
+class Gate:
+    """A semaphore with a bounded (FIFO) queue, & metrics."""
+
+    def __init__(self, name: str, limit: int, queue: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self._running = 0
+        self._waiters: collections.deque[asyncio.Future[None]] = collections.deque()
+        self._report()
+
+    def _report(self) -> None:
+        metrics.ADMISSION_RUNNING.set(self._running, gate=self.name)
+        metrics.ADMISSION_QUEUED.set(len(self._waiters), gate=self.name)
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting for one if needed.
+
+        Raise `SaturatedError` if the queue is full.
+        """
+        if self._running < self.limit:
+            self._running += 1
+            self._report()
+            return
+
+        if len(self._waiters) >= self.queue:
+            metrics.ADMISSION_REJECTED.inc(gate=self.name)
+            raise SaturatedError(f"Too many {self.name} requests, try again later")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._report()
+        start = time.monotonic()
+        try:
+            await waiter  # `release()` hands over its slot
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                self._waiters.remove(waiter)
+            else:  # got the slot anyway, so pass it on
+                self.release()
+            raise
+        finally:
+            metrics.ADMISSION_WAIT.observe(time.monotonic() - start, gate=self.name)
+            self._report()
+
+    def release(self) -> None:
+        """Give the slot to the next waiter, else free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._report()
+                return
+        self._running -= 1
+        self._report()
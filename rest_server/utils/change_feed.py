@@ -0,0 +1,82 @@
+"""Remember each WBS's recent changes, for clients that wait for the next.
+
+A change's timestamp is its version. With the invalidation bus, every
+process hears about every change, so a client can resume from whichever
+process it reaches next.
+"""
+
+
+import asyncio
+import collections
+import dataclasses as dc
+import time
+
+from . import invalidation_bus
+
+
+@dc.dataclass(frozen=True)
+class Changes:
+    """What changed in a WBS since some version."""
+
+    version: float  # the latest change's timestamp -- pass it back as `since`
+    institutions: list[str] = dc.field(default_factory=list)  # live data changed
+    everything: bool = False  # ex: a table override, or `since` is too old
+    snapshots: bool = False  # a snapshot was made/re-stored/archived
+
+    def __bool__(self) -> bool:
+        return bool(self.institutions or self.everything or self.snapshots)
+
+
+class ChangeFeed:
+    """Keep the last `max_changes` changes per WBS, and wake up waiters."""
+
+    def __init__(self, max_changes: int = 1000) -> None:
+        self._changes: dict[
+            str, collections.deque[invalidation_bus.Message]
+        ] = collections.defaultdict(lambda: collections.deque(maxlen=max_changes))
+        self._latest: dict[str, float] = {}
+        self._started = time.time()
+        self._events: dict[str, asyncio.Event] = collections.defaultdict(asyncio.Event)
+
+    def version(self, wbs_db: str) -> float:
+        """Get the WBS's latest version (the start time, if nothing changed)."""
+        return self._latest.get(wbs_db, self._started)
+
+    def record(self, msg: invalidation_bus.Message) -> None:
+        """Remember the change & wake up everyone waiting on the WBS."""
+        if not msg.ts:
+            msg = dc.replace(msg, ts=time.time())
+        self._changes[msg.wbs_db].append(msg)
+        self._latest[msg.wbs_db] = max(msg.ts, self.version(msg.wbs_db))
+        if event := self._events.pop(msg.wbs_db, None):
+            event.set()
+
+    def changes_since(self, wbs_db: str, since: float) -> Changes:
+        """Get what changed after `since` (a version)."""
+        changes = self._changes.get(wbs_db, collections.deque())
+        oldest = changes[0].ts if len(changes) == changes.maxlen else self._started
+        if since < oldest:
+            # either the client is new to this process, or history was trimmed
+            return Changes(self.version(wbs_db), everything=True)
+
+        newer = [m for m in changes if m.ts > since]
+        live = [m for m in newer if m.kind == invalidation_bus.LIVE]
+        return Changes(
+            self.version(wbs_db),
+            institutions=sorted({m.institution for m in live if m.institution}),
+            everything=any(not m.institution for m in live),
+            snapshots=any(m.kind == invalidation_bus.SNAPSHOTS for m in newer),
+        )
+
+    async def wait(self, wbs_db: str, since: float, timeout: float) -> Changes:
+        """Get what changed after `since`, waiting up to `timeout` secs for it."""
+        deadline = time.monotonic() + timeout
+        while not (changes := self.changes_since(wbs_db, since)):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._events[wbs_db].wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return changes
@@ -0,0 +1,39 @@
+"""Encode response bodies to JSON bytes, quickly.
+
+Uses `orjson` if it's installed, otherwise the standard library. Either
+way, `ObjectId`s become strings & `Decimal`s become floats.
+"""
+
+
+import json
+from decimal import Decimal
+from typing import Any
+
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+
+try:
+    import orjson  # type: ignore[import]
+
+    _HAS_ORJSON = True
+except ImportError:  # optional
+    _HAS_ORJSON = False
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return float(obj.to_decimal())
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode the object as (compact) JSON."""
+    if _HAS_ORJSON:
+        return orjson.dumps(  # type: ignore[no-any-return]
+            obj, default=_default, option=orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
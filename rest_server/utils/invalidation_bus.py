@@ -0,0 +1,120 @@
+"""Tell every REST server process when data has changed.
+
+Each message is inserted into a capped collection, which every process
+tails. Handlers are called for every message, including the process's own.
+"""
+
+
+import asyncio
+import dataclasses as dc
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Callable, Final
+
+import pymongo
+import pymongo.errors
+from motor.motor_tornado import MotorClient
+
+from ..config import BUS_DB
+
+BUS_COLLECTION: Final[str] = "messages"
+
+# what changed
+LIVE: Final[str] = "live"  # a live collection (or its supplemental doc)
+SNAPSHOTS: Final[str] = "snapshots"  # a snapshot was added/re-stored/archived
+
+
+@dc.dataclass(frozen=True)
+class Message:
+    """An invalidation message."""
+
+    wbs_db: str
+    kind: str
+    snapshot: str = ""  # for `SNAPSHOTS`
+    origin: str = ""  # the publishing process
+    ts: float = 0.0
+    institution: str = ""  # for `LIVE`, if only one institution's data changed
+
+
+Handler = Callable[[Message], None]
+
+
+class InvalidationBus:
+    """Publish & receive invalidation messages, via a capped collection."""
+
+    def __init__(
+        self,
+        motor_client: MotorClient,  # type: ignore[valid-type]
+        size_bytes: int = 1024**2,
+        max_messages: int = 10_000,
+    ) -> None:
+        self._mongo = motor_client
+        self.size_bytes = size_bytes
+        self.max_messages = max_messages
+        self.origin = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: list[Handler] = []
+
+    def _coll_obj(self) -> Any:
+        return self._mongo[BUS_DB][BUS_COLLECTION]  # type: ignore[index]
+
+    def subscribe(self, handler: Handler) -> None:
+        """Call `handler` for every message (handlers must not block)."""
+        self._handlers.append(handler)
+
+    def _dispatch(self, msg: Message) -> None:
+        for handler in self._handlers:
+            try:
+                handler(msg)
+            except Exception:  # pylint:disable=broad-except
+                logging.exception(f"Invalidation handler failed: {msg}")
+
+    async def ensure_collection(self) -> None:
+        """Create the capped collection, if needed."""
+        try:
+            await self._mongo[BUS_DB].create_collection(  # type: ignore[index]
+                BUS_COLLECTION,
+                capped=True,
+                size=self.size_bytes,
+                max=self.max_messages,
+            )
+        except pymongo.errors.CollectionInvalid:
+            pass  # already exists
+
+    async def publish(
+        self, wbs_db: str, kind: str, snapshot: str = "", institution: str = ""
+    ) -> None:
+        """Tell every process (including this one) what changed."""
+        msg = Message(wbs_db, kind, snapshot, self.origin, time.time(), institution)
+        self._dispatch(msg)  # don't wait for the round trip
+        await self._coll_obj().insert_one(dc.asdict(msg))
+
+    async def listen(self, retry_secs: float = 1.0) -> None:
+        """Tail the collection forever, dispatching others' messages.
+
+        Messages published before this is called are skipped. Clocks are
+        assumed to be synced, give or take a few seconds: a message seen
+        twice (re-invalidating) is harmless.
+        """
+        since = time.time()
+        while True:
+            try:
+                cursor = self._coll_obj().find(
+                    {"ts": {"$gte": since}},
+                    cursor_type=pymongo.CursorType.TAILABLE_AWAIT,
+                )
+                while cursor.alive:
+                    async for doc in cursor:
+                        doc.pop("_id", None)
+                        msg = Message(**doc)
+                        since = max(since, msg.ts)
+                        if msg.origin != self.origin:
+                            self._dispatch(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # pylint:disable=broad-except
+                logging.exception("Invalidation bus listener failed, retrying...")
+            # the cursor died (ex: the collection was empty), start another
+            await asyncio.sleep(retry_secs)
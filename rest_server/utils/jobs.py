@@ -0,0 +1,235 @@
+"""Run long requests (xlsx imports, snapshots) as background jobs.
+
+A submitted job starts right away on this process's event loop. Its
+state & progress are kept in MongoDB, so any process can report on it --
+also after a restart: a running job whose heartbeat stops (ex: its
+process died) is reported as failed. At most one job of a kind runs per
+WBS at a time (a unique index on the `active` key).
+"""
+
+
+import asyncio
+import datetime as dt
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Final
+
+import dacite
+import pymongo
+import pymongo.errors
+import universal_utils.types as uut
+from motor.motor_tornado import MotorClient
+from tornado import web
+
+from ..config import JOBS_DB
+
+JOBS_COLLECTION: Final[str] = "jobs"
+
+# kinds
+IMPORT: Final[str] = "import"
+SNAPSHOT: Final[str] = "snapshot"
+
+ProgressFunc = Callable[..., Awaitable[None]]  # called with stage & counts
+WorkFunc = Callable[[ProgressFunc], Awaitable[dict[str, Any]]]
+
+
+async def no_progress(**_: Any) -> None:
+    """Ignore the progress (when not in a job)."""
+
+
+class DetailedHTTPError(web.HTTPError):
+    """An HTTP error with details too long for its (short) reason.
+
+    The reason goes in the status line; the details go in the error's JSON
+    body, and in a failed job's `error` (after the reason, one per line).
+    """
+
+    def __init__(self, status_code: int, reason: str, details: list[str]) -> None:
+        super().__init__(status_code, reason=reason)
+        self.details = details
+
+
+class JobConflictError(Exception):
+    """Raised when a job of the kind is already running for the WBS."""
+
+    def __init__(self, job_id: str) -> None:
+        super().__init__(f"A job is already running ({job_id=})")
+        self.job_id = job_id
+
+
+class JobManager:
+    """Submit jobs, & keep their state in MongoDB."""
+
+    def __init__(
+        self,
+        motor_client: MotorClient,  # type: ignore[valid-type]
+        heartbeat_secs: float,
+        keep_days: float,
+    ) -> None:
+        self._mongo = motor_client
+        self.heartbeat_secs = heartbeat_secs
+        self.keep_days = keep_days
+        self._tasks: dict[str, asyncio.Task[dict[str, Any]]] = {}  # running here
+
+    def _coll_obj(self) -> Any:
+        return self._mongo[JOBS_DB][JOBS_COLLECTION]  # type: ignore[index]
+
+    async def ensure_indexes(self) -> None:
+        """Create the indexes, if needed."""
+        await self._coll_obj().create_indexes(
+            [
+                # one running job per (WBS, kind) -- finished jobs unset `active`
+                pymongo.IndexModel(
+                    [("active", pymongo.ASCENDING)],
+                    name="active_index",
+                    unique=True,
+                    sparse=True,
+                ),
+                # finished jobs are removed after a while
+                pymongo.IndexModel(
+                    [("finished", pymongo.ASCENDING)],
+                    name="finished_ttl_index",
+                    expireAfterSeconds=int(self.keep_days * 24 * 60 * 60),
+                ),
+            ]
+        )
+
+    def _is_stale(self, doc: dict[str, Any]) -> bool:
+        return bool(
+            doc.get("active")
+            and doc["updated"] < time.time() - 3 * self.heartbeat_secs
+            and doc["_id"] not in self._tasks
+        )
+
+    async def _finish(self, job_id: str, **fields: Any) -> None:
+        await self._coll_obj().update_one(
+            {"_id": job_id},
+            {
+                "$set": fields
+                | {
+                    "updated": time.time(),
+                    "finished": dt.datetime.now(dt.timezone.utc),
+                },
+                "$unset": {"active": ""},
+            },
+        )
+
+    async def _fail_if_stale(self, doc: dict[str, Any]) -> bool:
+        """Fail the job if its process stopped running it; return whether it did."""
+        if not self._is_stale(doc):
+            return False
+        logging.warning(f"Job was abandoned: {doc}")
+        await self._finish(
+            doc["_id"],
+            status=uut.JOB_FAILED,
+            code=500,
+            error="The job was abandoned (ex: the server restarted)",
+        )
+        return True
+
+    async def submit(self, kind: str, wbs_db: str, work: WorkFunc) -> str:
+        """Start the work as a job, return its ID.
+
+        Raise `JobConflictError` if a job of the kind is running for the WBS.
+        """
+        active = f"{wbs_db}/{kind}"
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        doc: dict[str, Any] = {
+            "_id": job_id,
+            "active": active,
+            "kind": kind,
+            "wbs_db": wbs_db,
+            "status": uut.JOB_RUNNING,
+            "progress": {},
+            "result": None,
+            "code": 0,
+            "error": "",
+            "created": now,
+            "updated": now,
+        }
+
+        for _ in range(2):  # a stale job is failed, then the insert is retried
+            try:
+                await self._coll_obj().insert_one(doc)
+                break
+            except pymongo.errors.DuplicateKeyError:
+                running = await self._coll_obj().find_one({"active": active})
+                if running and not await self._fail_if_stale(running):
+                    raise JobConflictError(running["_id"])
+        else:
+            raise JobConflictError("")
+
+        logging.info(f"Submitted job {job_id} ({kind=}, {wbs_db=})")
+        task = asyncio.create_task(self._run(job_id, work))
+        self._tasks[job_id] = task
+        task.add_done_callback(self._forget)
+        return job_id
+
+    def _forget(self, task: asyncio.Task[dict[str, Any]]) -> None:
+        self._tasks = {k: t for k, t in self._tasks.items() if t is not task}
+        if not task.cancelled():
+            task.exception()  # it's in the job's doc, so don't log it again
+
+    async def _run(self, job_id: str, work: WorkFunc) -> dict[str, Any]:
+        """Do the work, record the outcome, & return the result.
+
+        Raise `web.HTTPError` (with the job's code) if it failed.
+        """
+
+        async def progress(**counts: Any) -> None:
+            await self._coll_obj().update_one(
+                {"_id": job_id},
+                {
+                    "$set": {f"progress.{k}": v for k, v in counts.items()}
+                    | {"updated": time.time()}
+                },
+            )
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(self.heartbeat_secs)
+                try:
+                    await progress()
+                except pymongo.errors.PyMongoError:
+                    logging.exception(f"Job {job_id}'s heartbeat failed")
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            result = await work(progress)
+        except web.HTTPError as e:
+            logging.warning(f"Job {job_id} failed: {e}")
+            error = e.reason or str(e)
+            if isinstance(e, DetailedHTTPError):
+                error = "\n".join([error] + e.details)
+            await self._finish(
+                job_id, status=uut.JOB_FAILED, code=e.status_code, error=error
+            )
+            raise
+        except Exception as e:  # pylint:disable=broad-except
+            logging.exception(f"Job {job_id} failed")
+            await self._finish(job_id, status=uut.JOB_FAILED, code=500, error=str(e))
+            raise web.HTTPError(500, reason=str(e))
+        finally:
+            beat.cancel()
+
+        logging.info(f"Job {job_id} succeeded")
+        await self._finish(job_id, status=uut.JOB_SUCCEEDED, result=result)
+        return result
+
+    async def get(self, job_id: str) -> uut.JobInfo | None:
+        """Get the job's info, if there is such a job."""
+        doc = await self._coll_obj().find_one({"_id": job_id})
+        if doc and await self._fail_if_stale(doc):
+            doc = await self._coll_obj().find_one({"_id": job_id})
+        if not doc:
+            return None
+        return dacite.from_dict(uut.JobInfo, doc | {"job_id": doc["_id"]})
+
+    async def wait(self, job_id: str) -> dict[str, Any]:
+        """Wait for this process's job to finish, then return its result.
+
+        Raise `web.HTTPError` (with the job's code) if it failed.
+        """
+        return await asyncio.shield(self._tasks[job_id])
@@ -0,0 +1,385 @@
+"""In-process metrics, exposed in the Prometheus text exposition format."""
+
+
+import bisect
+import math
+import threading
+import time
+from typing import Any, Final, Iterator
+
+from pymongo import monitoring
+
+# seconds
+DEFAULT_BUCKETS: Final[tuple[float, ...]] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# bytes
+SIZE_BUCKETS: Final[tuple[float, ...]] = tuple(float(4**i) for i in range(3, 13))
+
+LabelValues = tuple[str, ...]
+
+
+def _fmt_labels(names: tuple[str, ...], values: LabelValues, **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class for a metric family, keyed by label values."""
+
+    TYPE = ""
+
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(
+                f"{self.name}: expected labels {self.labels}, not {labels}"
+            )
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError()
+
+    def render(self) -> str:
+        """Get the metric family in the text format."""
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.TYPE}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A monotonically increasing value."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, doc, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increment the counter."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        """Get the current value."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_fmt_labels(self.labels, key)} {_fmt_value(value)}"
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets."""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label-set: ([count per bucket, ..., +Inf], sum)
+        self._values: dict[LabelValues, tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation."""
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        """Get the number of observations."""
+        with self._lock:
+            return sum(self._values.get(self._key(labels), ([], 0.0))[0])
+
+    def _samples(self) -> Iterator[str]:
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                labels = _fmt_labels(self.labels, key, le=_fmt_value(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(total)}"
+            yield f"{self.name}_count{_fmt_labels(self.labels, key)} {cumulative}"
+
+
+class Registry:
+    """A collection of metric families."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: Any) -> Any:
+        """Add the metric, return it."""
+        if metric.name in self._metrics:
+            raise ValueError(f"metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Get all the metrics in the text format."""
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY: Final = Registry()
+
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+
+#
+# The metrics
+#
+
+HTTP_REQUEST_DURATION: Final[Histogram] = REGISTRY.register(
+    Histogram(
+        "mou_http_request_duration_seconds",
+        "REST request latency, by route handler.",
+        ("handler", "method", "code"),
+    )
+)
+HTTP_RESPONSE_SIZE: Final[Histogram] = REGISTRY.register(
+    Histogram(
+        "mou_http_response_size_bytes",
+        "REST response body size, by route handler.",
+        ("handler", "method"),
+        buckets=SIZE_BUCKETS,
+    )
+)
+MONGO_COMMAND_DURATION: Final[Histogram] = REGISTRY.register(
+    Histogram(
+        "mou_mongo_command_duration_seconds",
+        "MongoDB command latency, by command & outcome.",
+        ("command", "status"),
+    )
+)
+KRS_REQUEST_DURATION: Final[Histogram] = REGISTRY.register(
+    Histogram(
+        "mou_krs_request_duration_seconds",
+        "Keycloak REST Service (KRS) request latency.",
+        ("status",),
+    )
+)
+CACHE_REQUESTS: Final[Counter] = REGISTRY.register(
+    Counter(
+        "mou_cache_requests_total",
+        "Cache lookups, by cache & result (hit/miss).",
+        ("cache", "result"),
+    )
+)
+MONGO_POOL_CONNECTIONS: Final[Gauge] = REGISTRY.register(
+    Gauge(
+        "mou_mongo_pool_connections",
+        "Open MongoDB connections, by server.",
+        ("address",),
+    )
+)
+MONGO_POOL_CHECKED_OUT: Final[Gauge] = REGISTRY.register(
+    Gauge(
+        "mou_mongo_pool_checked_out_connections",
+        "MongoDB connections in use, by server.",
+        ("address",),
+    )
+)
+MONGO_POOL_CHECKOUT_WAIT: Final[Histogram] = REGISTRY.register(
+    Histogram(
+        "mou_mongo_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled MongoDB connection, by server & outcome.",
+        ("address", "status"),
+    )
+)
+MONGO_POOL_CLEARED: Final[Counter] = REGISTRY.register(
+    Counter(
+        "mou_mongo_pool_cleared_total",
+        "MongoDB connection pool clears (ex: after a network error), by server.",
+        ("address",),
+    )
+)
+
+EVENT_LOOP_LAG: Final[Histogram] = REGISTRY.register(
+    Histogram(
+        "mou_event_loop_lag_seconds",
+        "How late the event loop woke up (time it was blocked).",
+    )
+)
+OFFLOADED_DURATION: Final[Histogram] = REGISTRY.register(
+    Histogram(
+        "mou_offloaded_duration_seconds",
+        "CPU-heavy work run off of the event loop, by pool & function.",
+        ("pool", "func"),
+    )
+)
+
+ADMISSION_RUNNING: Final[Gauge] = REGISTRY.register(
+    Gauge(
+        "mou_admission_running",
+        "Expensive requests running, by gate (see `admission`).",
+        ("gate",),
+    )
+)
+ADMISSION_QUEUED: Final[Gauge] = REGISTRY.register(
+    Gauge(
+        "mou_admission_queued",
+        "Expensive requests waiting for a slot, by gate.",
+        ("gate",),
+    )
+)
+ADMISSION_WAIT: Final[Histogram] = REGISTRY.register(
+    Histogram(
+        "mou_admission_wait_seconds",
+        "Time queued requests waited for a slot, by gate.",
+        ("gate",),
+    )
+)
+ADMISSION_REJECTED: Final[Counter] = REGISTRY.register(
+    Counter(
+        "mou_admission_rejected_total",
+        "Requests turned away (503) since their gate's queue was full, by gate.",
+        ("gate",),
+    )
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Record every MongoDB command's latency.
+
+    Pass to the client: `MotorClient(..., event_listeners=[MongoCommandListener()])`.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_COMMAND_DURATION.observe(
+            event.duration_micros / 1e6, command=event.command_name, status="ok"
+        )
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_COMMAND_DURATION.observe(
+            event.duration_micros / 1e6, command=event.command_name, status="error"
+        )
+
+
+def _address(event: Any) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Record MongoDB connection-pool statistics.
+
+    Pass to the client: `MotorClient(..., event_listeners=[MongoPoolListener()])`.
+    """
+
+    def __init__(self) -> None:
+        # a checkout's events are published on the thread doing the checkout
+        self._checkout_start = threading.local()
+
+    def _add(self, gauge: Gauge, event: Any, amount: float) -> None:
+        gauge.inc(amount, address=_address(event))
+
+    def _observe_wait(self, event: Any, status: str) -> None:
+        start = getattr(self._checkout_start, "value", None)
+        if start is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(
+                time.monotonic() - start, address=_address(event), status=status
+            )
+            self._checkout_start.value = None
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        MONGO_POOL_CLEARED.inc(address=_address(event))
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        MONGO_POOL_CONNECTIONS.set(0, address=_address(event))
+        MONGO_POOL_CHECKED_OUT.set(0, address=_address(event))
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        self._add(MONGO_POOL_CONNECTIONS, event, 1)
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        self._add(MONGO_POOL_CONNECTIONS, event, -1)
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        self._checkout_start.value = time.monotonic()
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        self._observe_wait(event, "error")
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        self._observe_wait(event, "ok")
+        self._add(MONGO_POOL_CHECKED_OUT, event, 1)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        self._add(MONGO_POOL_CHECKED_OUT, event, -1)
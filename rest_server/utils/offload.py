@@ -0,0 +1,127 @@
+"""Run CPU-heavy work off of the event loop, & watch the loop's lag.
+
+Parsing (ex: an xlsx upload) runs in a process pool, so it doesn't hold
+the GIL; lighter work (ex: sorting or totaling a big table) runs in a
+thread pool, so the loop can still switch to other requests. Each pool
+is created on first use -- after any pre-forking.
+"""
+
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import time
+from typing import Any, Callable, TypeVar
+
+from . import metrics
+
+T = TypeVar("T")
+
+
+class Offloader:
+    """Executors for CPU-bound work, by weight.
+
+    `processes=0` runs "process" work in the thread pool instead, &
+    `threads=0` runs "thread" work inline (on the event loop). Work on a
+    table of fewer than `min_rows` rows isn't worth the hand-off.
+    """
+
+    def __init__(self, processes: int, threads: int, min_rows: int = 0) -> None:
+        self.processes = processes
+        self.threads = threads
+        self.min_rows = min_rows
+        self._process_pool: concurrent.futures.ProcessPoolExecutor | None = None
+        self._thread_pool: concurrent.futures.ThreadPoolExecutor | None = None
+
+    def _get_process_pool(self) -> concurrent.futures.Executor | None:
+        if not self.processes:
+            return self._get_thread_pool()
+        if not self._process_pool:
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(self.processes)
+        return self._process_pool
+
+    def _get_thread_pool(self) -> concurrent.futures.Executor | None:
+        if not self.threads:
+            return None
+        if not self._thread_pool:
+            self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+                self.threads, thread_name_prefix="mou-offload"
+            )
+        return self._thread_pool
+
+    async def _run(
+        self,
+        pool_name: str,
+        pool: concurrent.futures.Executor | None,
+        func: Callable[..., T],
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        start = time.monotonic()
+        try:
+            if not pool:
+                return func(*args, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, functools.partial(func, *args, **kwargs)
+            )
+        except concurrent.futures.BrokenExecutor:
+            # ex: a worker process was killed -- start a new pool next time
+            if pool is self._process_pool:
+                self._process_pool = None
+            raise
+        finally:
+            metrics.OFFLOADED_DURATION.observe(
+                time.monotonic() - start,
+                pool=pool_name if pool else "inline",
+                func=getattr(func, "__name__", "?"),
+            )
+
+    async def in_process(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run heavy work in the process pool.
+
+        The function & arguments must be picklable (ex: module-level).
+        """
+        return await self._run(
+            "process" if self.processes else "thread",
+            self._get_process_pool(),
+            func,
+            *args,
+            **kwargs,
+        )
+
+    async def in_thread(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run lighter work in the thread pool.
+
+        The function mustn't mutate anything the event loop is using.
+        """
+        return await self._run("thread", self._get_thread_pool(), func, *args, **kwargs)
+
+    async def for_table(
+        self, n_rows: int, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Run work on a table in the thread pool, or inline if it's small."""
+        if n_rows < self.min_rows:
+            return func(*args, **kwargs)
+        return await self.in_thread(func, *args, **kwargs)
+
+    def shutdown(self) -> None:
+        """Shut down the pools (without waiting on running work)."""
+        for pool in [self._process_pool, self._thread_pool]:
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._process_pool, self._thread_pool = None, None
+
+
+async def monitor_loop_lag(interval: float, warn_after: float) -> None:
+    """Measure how late the event loop wakes up from a sleep, forever.
+
+    A late wake-up means something blocked the loop (every request waited).
+    """
+    while True:
+        start = time.monotonic()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.monotonic() - start - interval)
+        metrics.EVENT_LOOP_LAG.observe(lag)
+        if lag >= warn_after:
+            logging.warning(f"Event loop was blocked for ~{lag:.3f}s")
@@ -0,0 +1,32 @@
+"""Keep encoded responses of idempotent GETs, while they're still current.
+
+Keys include the versions of whatever the response was built from, so a
+change makes new keys -- old entries are never served again, and age out.
+"""
+
+
+from typing import Hashable
+
+import cachetools
+
+from . import metrics
+
+
+class ResponseCache:
+    """An LRU cache of encoded response bodies, bounded by their total size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._cache: cachetools.LRUCache[Hashable, bytes] = cachetools.LRUCache(
+            max_bytes, getsizeof=len
+        )
+
+    def get(self, key: Hashable) -> bytes | None:
+        """Get the encoded body, if it's cached."""
+        body = self._cache.get(key)
+        metrics.record_cache("response", hit=body is not None)
+        return body
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        """Cache the encoded body (unless it's too big to ever fit)."""
+        if len(body) <= self._cache.maxsize:
+            self._cache[key] = body
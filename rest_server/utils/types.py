@@ -6,6 +6,8 @@ import universal_utils.types as uut
 from bson.objectid import ObjectId
 from typeguard import typechecked
 
+from ..data_sources import snapshot_deltas
+
 
 @typechecked
 @dc.dataclass(frozen=True)
@@ -19,6 +21,11 @@ class SupplementalDoc:
     admin_only: bool
     _id: ObjectId | None = None
     confirmation_touchstone_ts: int = 0  # zero for legacy data
+    # how the snapshot's records are stored (see `snapshot_deltas`)
+    snapshot_format: str = snapshot_deltas.FULL  # full for legacy data
+    delta_base: str = ""  # the snapshot a delta is relative to
+    delta_depth: int = 0  # number of deltas back to the keyframe
+    archived: bool = False  # records are in the archive (see `snapshot_archive`)
 
     def override_all_institutions_touchstones(self) -> None:
         """Override all institutions touchstones with internal value."""
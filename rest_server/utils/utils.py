@@ -209,43 +209,14 @@ class MOUDataAdaptor:
 
         If not, raise Exception.
         """
-        for col_raw, value in record.items():
-            col = Mongofier.demongofy_key_name(col_raw)
-
-            # Blanks are okay
-            if not value:
-                continue
-
-            # Validate a simple dropdown column
-            if col in self.tc_cache.get_simple_dropdown_menus(wbs_db):
-                if value in self.tc_cache.get_simple_dropdown_menus(wbs_db)[col]:
-                    continue
-                raise Exception(f"Invalid Simple-Dropdown Data: {col=} {record=}")
-
-            # Validate a conditional dropdown column
-            if col in self.tc_cache.get_conditional_dropdown_menus(wbs_db):
-                parent_col, menus = self.tc_cache.get_conditional_dropdown_menus(
-                    wbs_db
-                )[col]
-
-                # Get parent value
-                if parent_col in record:
-                    parent_value = record[parent_col]
-                # Check mongofied version  # pylint: disable=C0325
-                elif (mpc := Mongofier.mongofy_key_name(parent_col)) in record:
-                    parent_value = record[mpc]
-                # Parent column is missing (*NOT* '' value)
-                else:  # validate with any/all parents
-                    if value in [v for _, vals in menus.items() for v in vals]:
-                        continue
-                    raise Exception(
-                        f"{menus} Invalid Conditional-Dropdown (Orphan) Data: {col=} {record=}"
-                    )
+        if errors := self.get_record_errors(wbs_db, record):
+            raise Exception(f"{'; '.join(errors)} ({record=})")
 
-                # validate with parent value
-                if parent_value and (value in menus[parent_value]):  # type: ignore[index]
-                    continue
-                raise Exception(f"Invalid Conditional-Dropdown Data: {col=} {record=}")
+    def get_record_errors(self, wbs_db: str, record: uut.DBRecord) -> list[str]:
+        """Get a message for each invalid dropdown-type value (if any)."""
+        return self.tc_cache.get_record_validator(wbs_db).errors(
+            {Mongofier.demongofy_key_name(k): v for k, v in record.items()}
+        )
 
     def mongofy_record(
         self,
@@ -0,0 +1,76 @@
+"""Coalesce frequent timestamp updates & write them behind, in batches."""
+
+
+import asyncio
+import collections
+import logging
+from typing import Awaitable, Callable
+
+# called with (wbs_db, {key: timestamp})
+FlushFunc = Callable[[str, dict[str, int]], Awaitable[None]]
+
+
+class TimestampCoalescer:
+    """Keep the latest timestamp per (wbs_db, key), write them `window` secs later.
+
+    Every bump within the window is written in one call to `flush_func`.
+    `get()` includes not-yet-written timestamps (read-your-writes).
+    """
+
+    def __init__(self, flush_func: FlushFunc, window: float) -> None:
+        self._flush_func = flush_func
+        self.window = window
+        self._pending: dict[str, dict[str, int]] = collections.defaultdict(dict)
+        self._inflight: dict[str, dict[str, int]] = {}
+        self._timers: dict[str, asyncio.Task[None]] = {}
+        self._locks: dict[str, asyncio.Lock] = collections.defaultdict(asyncio.Lock)
+
+    def bump(self, wbs_db: str, key: str, timestamp: int) -> None:
+        """Record the timestamp (if it's the latest), & schedule a flush."""
+        pending = self._pending[wbs_db]
+        pending[key] = max(pending.get(key, 0), timestamp)
+        if wbs_db not in self._timers:
+            self._timers[wbs_db] = asyncio.create_task(self._flush_later(wbs_db))
+
+    def get(self, wbs_db: str, key: str) -> int | None:
+        """Get the not-yet-written timestamp, if there is one."""
+        stamps = [
+            d[key]
+            for d in (self._pending.get(wbs_db, {}), self._inflight.get(wbs_db, {}))
+            if key in d
+        ]
+        return max(stamps) if stamps else None
+
+    async def _flush_later(self, wbs_db: str) -> None:
+        await asyncio.sleep(self.window)
+        self._timers.pop(wbs_db, None)
+        try:
+            await self.flush(wbs_db)
+        except Exception:  # pylint:disable=broad-except
+            logging.exception(f"Write-behind flush failed ({wbs_db=}), will retry")
+            if wbs_db not in self._timers:
+                self._timers[wbs_db] = asyncio.create_task(self._flush_later(wbs_db))
+
+    async def flush(self, wbs_db: str | None = None) -> None:
+        """Write out the pending timestamps now, for one or all WBSs.
+
+        Also waits for an in-progress flush, so afterwards everything
+        bumped beforehand is written.
+        """
+        for wbs in [wbs_db] if wbs_db else set(self._pending) | set(self._inflight):
+            async with self._locks[wbs]:
+                pending = self._pending.pop(wbs, {})
+                if not pending:
+                    continue
+                self._inflight[wbs] = pending
+                try:
+                    await self._flush_func(wbs, pending)
+                except Exception:
+                    # put them back (w/o clobbering newer bumps)
+                    for key, ts in pending.items():
+                        self._pending[wbs][key] = max(
+                            self._pending[wbs].get(key, 0), ts
+                        )
+                    raise
+                finally:
+                    self._inflight.pop(wbs, None)
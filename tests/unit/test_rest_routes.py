@@ -4,7 +4,16 @@
 # pylint: disable=W0212,W0621
 
 
+import inspect
+import pathlib
+import tempfile
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
 from rest_server import routes
+from rest_server.utils import admission
+from tornado import web
 
 
 class TestNoArgumentRoutes:
@@ -36,12 +45,42 @@ class TestNoArgumentRoutes:
 
         # NOTE: reserve testing POST for test_snapshots()
 
+    @staticmethod
+    def test_changes_get() -> None:
+        """Test `GET` @ `/changes`."""
+        assert (
+            routes.ChangesHandler.ROUTE
+            == rf"/changes/(?P<wbs_l1>{routes._WBS_L1_REGEX_VALUES})$"
+        )
+        assert "get" in dir(routes.ChangesHandler)
+
+    @staticmethod
+    def test_job_get() -> None:
+        """Test `GET` @ `/jobs`."""
+        assert routes.JobHandler.ROUTE == r"/jobs/(?P<job_id>\w+)$"
+        assert "get" in dir(routes.JobHandler)
+
+    @staticmethod
+    def test_table_totals_get() -> None:
+        """Test `GET` @ `/table/totals`."""
+        assert (
+            routes.TableTotalsHandler.ROUTE
+            == rf"/table/totals/(?P<wbs_l1>{routes._WBS_L1_REGEX_VALUES})$"
+        )
+        assert "get" in dir(routes.TableTotalsHandler)
+
     @staticmethod
     def test_table_config_get() -> None:
         """Test `GET` @ `/table/config`."""
         assert routes.TableConfigHandler.ROUTE == r"/table/config$"
         assert "get" in dir(routes.TableConfigHandler)
 
+    @staticmethod
+    def test_metrics_get() -> None:
+        """Test `GET` @ `/metrics`."""
+        assert routes.MetricsHandler.ROUTE == r"/metrics$"
+        assert "get" in dir(routes.MetricsHandler)
+
     @staticmethod
     def test_institution_static_get() -> None:
         """Test `GET` @ `/institution/today`."""
@@ -62,6 +101,64 @@ class TestTableHandler:
         assert "get" in dir(routes.TableHandler)
 
 
+class TestTableXlsxHandler:
+    """Test `/table/xlsx`."""
+
+    @staticmethod
+    def test_sanity() -> None:
+        """Check routes and methods are there."""
+        assert (
+            routes.TableXlsxHandler.ROUTE
+            == rf"/table/xlsx/(?P<wbs_l1>{routes._WBS_L1_REGEX_VALUES})$"
+        )
+        assert "post" in dir(routes.TableXlsxHandler)
+        assert "data_received" in dir(routes.TableXlsxHandler)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_post_removes_turned_away_file() -> None:
+        """Test that a POST turned away before its job starts leaves no file."""
+        post = inspect.unwrap(routes.TableXlsxHandler.post)  # w/o auth
+
+        def make_handler(gate: admission.Gate) -> Any:
+            handler: Any = object.__new__(routes.TableXlsxHandler)
+            handler.gates = {admission.IMPORTS: gate}
+            handler.mou_db_client = Mock(jobs=Mock(submit=AsyncMock(return_value="id")))
+            handler._xlsx = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+            handler._xlsx_path = pathlib.Path(handler._xlsx.name)
+            args = {
+                "filename": "a.xlsx",
+                "creator": "me",
+                "is_admin": True,
+                "as_job": True,
+            }
+            handler.get_argument = lambda name, **_: args[name]
+            handler.set_status = Mock()
+            handler.write = Mock()
+            return handler
+
+        # the imports gate is full -> 503, then the file's removed
+        gate = admission.Gate(admission.IMPORTS, limit=1, queue=0)
+        await gate.acquire()
+        handler = make_handler(gate)
+        path = handler._xlsx_path
+        with pytest.raises(web.HTTPError) as e:
+            await post(handler, "mo")
+        assert e.value.status_code == 503
+        handler._remove_xlsx()  # by `on_finish()`
+        assert not path.exists()
+
+        # submitted -> the job owns the file
+        gate.release()
+        handler = make_handler(gate)
+        path = handler._xlsx_path
+        await post(handler, "mo")
+        handler.set_status.assert_called_with(202)
+        handler._remove_xlsx()
+        assert path.exists()
+        path.unlink()
+
+
 class TestRecordHandler:
     """Test `/record`."""
 
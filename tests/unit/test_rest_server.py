@@ -3,21 +3,53 @@
 # pylint: disable=W0212,redefined-outer-name
 
 
+import asyncio
 import copy
 import pprint
+import signal
+import subprocess
+import sys
+import textwrap
 import time
 from decimal import Decimal
 from typing import Any, Final
 from unittest.mock import ANY, AsyncMock, Mock, patch, sentinel
 
 import nest_asyncio  # type: ignore[import]
+import pymongo.errors
 import pytest
+import universal_utils.constants as uuc
 import universal_utils.types as uut
+from bson.decimal128 import Decimal128
 from bson.objectid import ObjectId
-from rest_server import config
-from rest_server.data_sources import columns, mou_db
+from tornado import web
+from universal_utils import columnar
+from universal_utils.profiling import RequestProfiler
+from universal_utils.validation import RecordValidator
+from rest_server import config, routes
+from rest_server.data_sources import (
+    columns,
+    live_cache,
+    materialized_totals,
+    mou_db,
+    snapshot_archive,
+    snapshot_deltas,
+)
 from rest_server.data_sources import table_config_cache as tcc
-from rest_server.utils import mongo_tools, utils
+from rest_server.utils import (
+    admission,
+    change_feed,
+    fast_json,
+    invalidation_bus,
+    jobs,
+    metrics,
+    mongo_tools,
+    offload,
+    response_cache,
+    types,
+    utils,
+    write_behind,
+)
 
 from .. import institution_list
 from . import data
@@ -90,6 +122,7 @@ class TestMOUDB:  # pylint: disable=R0904
         """Test _list_database_names()."""
         # Setup & Mock
         dbs = ["foo", "bar", "baz"] + config.EXCLUDE_DBS[:3]
+        dbs += [f"foo{suffix}" for suffix in config.EXCLUDE_DB_SUFFIXES]
         mou_db_client = mou_db.MOUDatabaseClient(
             mock_mongo,
             utils.MOUDataAdaptor(await tcc.TableConfigCache.create()),
@@ -103,9 +136,979 @@ class TestMOUDB:  # pylint: disable=R0904
         assert ret == dbs[:3]
         assert mock_mongo.list_database_names.side_effect.await_count == 1
 
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_live_records_query(_: Any, __: Any) -> None:
+        """Test _live_records_query()."""
+        mou_db_client = mou_db.MOUDatabaseClient(
+            sentinel.mongo,
+            utils.MOUDataAdaptor(await tcc.TableConfigCache.create()),
+        )
+
+        assert mou_db_client._live_records_query("", "") == {"deleted": {"$ne": True}}
+        assert mou_db_client._live_records_query("KE", "UW-Madison") == {
+            "deleted": {"$ne": True},
+            "Labor Cat;": "KE",
+            "Institution": "UW-Madison",
+        }
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_ensure_collection_indexes(_: Any, __: Any) -> None:
+        """Test _ensure_collection_indexes() only creates the missing indexes."""
+        # Setup & Mock
+        coll = Mock()
+        coll.index_information = AsyncMock(
+            return_value={"_id_": {}, "Institution_index": {}}
+        )
+        coll.create_indexes = AsyncMock()
+        mou_db_client = mou_db.MOUDatabaseClient(
+            {"mo": {"LIVE_COLLECTION": coll}},  # type: ignore[arg-type]
+            utils.MOUDataAdaptor(await tcc.TableConfigCache.create()),
+        )
+
+        # Call
+        n_created = await mou_db_client._ensure_collection_indexes(
+            "mo", "LIVE_COLLECTION"
+        )
+
+        # Assert
+        assert n_created == len(mou_db_client._desired_indexes()) - 1
+        created = [m.document["name"] for m in coll.create_indexes.await_args.args[0]]
+        assert "Institution_index" not in created
+        assert "Labor Cat;_index" in created
+
+        # --- all there already -> nothing created
+        coll.index_information.return_value = {
+            m.document["name"]: {} for m in mou_db_client._desired_indexes()
+        }
+        coll.create_indexes.reset_mock()
+        assert not await mou_db_client._ensure_collection_indexes(
+            "mo", "LIVE_COLLECTION"
+        )
+        coll.create_indexes.assert_not_awaited()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_get_snapshot_docs_delta(_: Any, __: Any) -> None:
+        """Test _get_snapshot_docs() reconstructs (and caches) a delta snapshot."""
+
+        class FakeColl:  # pylint:disable=too-few-public-methods
+            def __init__(self, docs: list[dict[str, Any]]) -> None:
+                self.docs = docs
+                self.queries: list[Any] = []
+
+            async def find(self, query: Any = None) -> Any:
+                self.queries.append(query)
+                for doc in self.docs:
+                    yield doc
+
+        a, b, c = ObjectId(), ObjectId(), ObjectId()
+        colls = {
+            "100": FakeColl([{"_id": a, "x": 1}, {"_id": b, "x": 2}]),
+            "200": FakeColl(
+                [
+                    {"_id": b, "x": 3},
+                    {"_id": c, "x": 4},
+                    {"_id": a, snapshot_deltas.REMOVED: True},
+                ]
+            ),
+        }
+        manifests = {
+            "100": types.SupplementalDoc("s1", "100", "me", {}, False),
+            "200": types.SupplementalDoc(
+                "s2",
+                "200",
+                "me",
+                {},
+                False,
+                snapshot_format=snapshot_deltas.DELTA,
+                delta_base="100",
+                delta_depth=1,
+            ),
+        }
+        mou_db_client = mou_db.MOUDatabaseClient(
+            {"mo": colls},  # type: ignore[arg-type]
+            utils.MOUDataAdaptor(await tcc.TableConfigCache.create()),
+        )
+
+        with patch.object(
+            mou_db_client,
+            "_get_supplemental_doc",
+            side_effect=AsyncMock(side_effect=lambda _, s: manifests[s]),
+        ):
+            # a full snapshot can be queried in MongoDB, a delta can't
+            assert await mou_db_client._is_stored_whole("mo", "100")
+            assert not await mou_db_client._is_stored_whole("mo", "200")
+
+            docs = await mou_db_client._get_snapshot_docs("mo", "200")
+            assert docs == {b: {"_id": b, "x": 3}, c: {"_id": c, "x": 4}}
+            # the full base's deleted records were filtered out by MongoDB
+            assert colls["100"].queries == [mou_db_client._live_records_query("", "")]
+            assert colls["200"].queries == [None]
+
+            # again -> cached (so, filtered in memory from now on)
+            assert await mou_db_client._get_snapshot_docs("mo", "200") is docs
+            assert len(colls["100"].queries) == len(colls["200"].queries) == 1
+            assert not await mou_db_client._is_stored_whole("mo", "100")
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_make_snapshot_delta(_: Any, __: Any) -> None:
+        """Test _make_snapshot_delta() only stores the records that changed."""
+        mou_db_client = mou_db.MOUDatabaseClient(
+            Mock(), utils.MOUDataAdaptor(await tcc.TableConfigCache.create())
+        )
+        # as stored in MongoDB -- w/ `None`s, unlike a (demongofied) table's
+        stored: list[dict[str, Any]] = [
+            {"_id": ObjectId(), "Name": f"P{i}", "Notes": None, "FTE": 0.5}
+            for i in range(10)
+        ]
+        table = [mou_db_client.data_adaptor.demongofy_record(d) for d in stored]
+        table[0]["FTE"] = 1.0  # changed
+        current = snapshot_deltas.by_id(
+            mou_db_client.data_adaptor.mongofy_record("mo", r, assert_data=False)
+            for r in table
+        )
+
+        with patch.object(
+            mou_db_client,
+            "list_snapshot_timestamps",
+            side_effect=AsyncMock(return_value=["100"]),
+        ), patch.object(
+            mou_db_client,
+            "_get_supplemental_doc",
+            side_effect=AsyncMock(
+                return_value=types.SupplementalDoc("s1", "100", "me", {}, False)
+            ),
+        ), patch.object(
+            mou_db_client,
+            "_get_snapshot_docs",
+            side_effect=AsyncMock(return_value=snapshot_deltas.by_id(stored)),
+        ):
+            delta = await mou_db_client._make_snapshot_delta("mo", current)
+
+        assert delta and delta.base == "100" and delta.depth == 1
+        assert delta.docs == [current[stored[0]["_id"]]]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_publish_change(_: Any, __: Any) -> None:
+        """Test _publish_change() w/ & w/o an invalidation bus."""
+        tc_cache = await tcc.TableConfigCache.create()
+
+        # w/o a bus
+        mou_db_client = mou_db.MOUDatabaseClient(
+            sentinel.mongo, utils.MOUDataAdaptor(tc_cache)
+        )
+        mou_db_client._snapshot_cache[("mo", "123.4")] = {}
+        await mou_db_client._publish_change("mo", invalidation_bus.LIVE)
+        assert mou_db_client.data_version("mo") == 1
+        assert mou_db_client.data_version("upgrade") == 0
+        assert mou_db_client._last_edits.window == config.ENV.MOU_LAST_EDIT_FLUSH_SECS
+        await mou_db_client._publish_change("mo", invalidation_bus.SNAPSHOTS, "123.4")
+        assert mou_db_client.data_version("mo") == 2
+        assert ("mo", "123.4") not in mou_db_client._snapshot_cache
+
+        # w/ a bus
+        motor = Mock()
+        motor.__getitem__ = Mock(return_value=motor)  # db & collection
+        motor.insert_one = AsyncMock()
+        bus = invalidation_bus.InvalidationBus(motor)
+        mou_db_client = mou_db.MOUDatabaseClient(
+            motor, utils.MOUDataAdaptor(tc_cache), bus
+        )
+        await mou_db_client._publish_change("mo", invalidation_bus.LIVE)
+        assert mou_db_client.data_version("mo") == 1  # w/o waiting for the bus
+        assert mou_db_client._last_edits.window == 0  # other processes read them
+        doc = motor.insert_one.await_args.args[0]
+        assert doc["wbs_db"] == "mo" and doc["origin"] == bus.origin
+
+        # a message from another process
+        bus._dispatch(invalidation_bus.Message("mo", invalidation_bus.LIVE))
+        assert mou_db_client.data_version("mo") == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_get_live_table(_: Any, __: Any) -> None:
+        """Test _get_live_table() & check_live_cache() w/ the live cache."""
+
+        class FakeColl:  # pylint:disable=too-few-public-methods
+            def __init__(self, docs: list[dict[str, Any]]) -> None:
+                self.docs = docs
+                self.n_finds = 0
+
+            async def find(self, query: dict[str, Any], projection: Any = None) -> Any:
+                self.n_finds += 1
+                for doc in self.docs:
+                    if all(
+                        doc.get(k) == v
+                        for k, v in query.items()
+                        if k != utils.MOUDataAdaptor.IS_DELETED
+                    ):
+                        yield dict(doc)
+
+        a, b = ObjectId(), ObjectId()
+        coll = FakeColl(
+            [
+                {"_id": a, columns.INSTITUTION: "UW", columns.TIMESTAMP: 1.0},
+                {"_id": b, columns.INSTITUTION: "MSU", columns.TIMESTAMP: 2.0},
+            ]
+        )
+        mou_db_client = mou_db.MOUDatabaseClient(
+            {"mo": {uuc.LIVE_COLLECTION: coll}},  # type: ignore[arg-type]
+            utils.MOUDataAdaptor(await tcc.TableConfigCache.create()),
+        )
+
+        # miss -> loaded, then hits
+        table = await mou_db_client._get_live_table("mo", "", "")
+        assert [r[columns.ID] for r in table] == [str(a), str(b)]
+        table[0]["x"] = 1  # a copy
+        assert await mou_db_client._get_live_table("mo", "", "UW") == [
+            {columns.ID: str(a), columns.INSTITUTION: "UW", columns.TIMESTAMP: 1.0}
+        ]
+        assert coll.n_finds == 1
+
+        # another process's edit -> only that institution is reloaded
+        coll.docs[1][columns.TIMESTAMP] = 3.0
+        mou_db_client._invalidate(
+            invalidation_bus.Message(
+                "mo", invalidation_bus.LIVE, origin="other", institution="MSU"
+            )
+        )
+        assert len(await mou_db_client._get_live_table("mo", "", "UW")) == 1
+        assert coll.n_finds == 1
+        table = await mou_db_client._get_live_table("mo", "", "MSU")
+        assert table[0][columns.TIMESTAMP] == 3.0
+        assert coll.n_finds == 2
+
+        # a change made around the server -> detected & dropped
+        assert await mou_db_client.check_live_cache("mo")
+        coll.docs.append({"_id": ObjectId(), columns.INSTITUTION: "UW"})
+        assert not await mou_db_client.check_live_cache("mo")
+        assert len(await mou_db_client._get_live_table("mo", "", "")) == 3
+
     # NOTE: public methods are tested in integration tests
 
 
+class TestSnapshotDeltas:
+    """Test snapshot_deltas.py."""
+
+    @staticmethod
+    def test_round_trip() -> None:
+        """Test compute_delta() & apply_delta()."""
+        base = snapshot_deltas.by_id(
+            [{"_id": i, "FTE": 0.5, "Name": f"P{i}"} for i in range(10)]
+        )
+        current = {i: dict(r) for i, r in base.items() if i != 3}  # removed
+        current[5]["FTE"] = 1.0  # changed
+        current[10] = {"_id": 10, "FTE": 0.1, "Name": "New"}  # added
+
+        delta = snapshot_deltas.compute_delta(base, current)
+
+        assert len(delta) == 3
+        assert {"_id": 3, snapshot_deltas.REMOVED: True} in delta
+        assert snapshot_deltas.apply_delta(base, delta) == current
+        assert 3 in base  # unchanged
+        assert not snapshot_deltas.compute_delta(current, current)
+
+    @staticmethod
+    def test_is_worth_it() -> None:
+        """Test is_worth_it()."""
+        assert snapshot_deltas.is_worth_it(0, 0)
+        assert snapshot_deltas.is_worth_it(5, 100)
+        assert not snapshot_deltas.is_worth_it(200, 100)  # ex: after xlsx import
+
+
+class TestLiveCache:
+    """Test live_cache.py."""
+
+    @staticmethod
+    def test_write_through() -> None:
+        """Test load(), put(), & invalidate()."""
+        cache = live_cache.LiveCache()
+        rec: uut.DBRecord = {
+            columns.ID: "1",
+            columns.INSTITUTION: "UW",
+            columns.LABOR_CAT: "SC",
+        }
+        assert cache.get("mo", "", "") is None
+
+        # a load that raced a change isn't kept
+        generation = cache.generation("mo")
+        cache.put("mo", rec, False)
+        assert not cache.load("mo", [rec], generation)
+        assert cache.load("mo", [rec], cache.generation("mo"))
+        assert cache.get("mo", "SC", "UW") == [rec]
+        assert cache.count("mo", "KE", "") == 0
+
+        # moved to another institution, then deleted
+        moved: uut.DBRecord = rec | {columns.INSTITUTION: "MSU"}
+        cache.put("mo", moved, False)
+        assert cache.get("mo", "", "") == [moved]
+        cache.put("mo", moved, True)
+        assert cache.count("mo", "", "") == 0
+
+        # an invalidated institution is reloaded before it's read
+        cache.put("mo", rec, False)
+        cache.invalidate("mo", "UW")
+        assert cache.to_load("mo", "") == {"UW"}
+        assert cache.get("mo", "", "UW") is None
+        assert cache.get("mo", "", "MSU") == []
+        assert cache.load("mo", [rec], cache.generation("mo"), "UW")
+        assert cache.fingerprint("mo") == {"1": ("UW", "")}
+
+        # keyed like the fingerprint, even if the ID isn't a str
+        oid = ObjectId()
+        cache.put("mo", rec | {columns.ID: oid}, False)
+        cache.put("mo", rec | {columns.ID: str(oid)}, True)  # same record
+        assert cache.count("mo", "", "UW") == 1
+
+        cache.invalidate("mo")
+        assert not cache.is_loaded("mo")
+
+
+class TestMaterializedTotals:
+    """Test materialized_totals.py."""
+
+    @staticmethod
+    def test_deltas() -> None:
+        """Test deltas() & friends."""
+        rec: uut.DBRecord = {
+            columns.INSTITUTION: "UW",
+            columns.WBS_L2: "2.1 Program Coordination",
+            columns.WBS_L3: "2.1.0 Program Coordination",
+            columns.SOURCE_OF_FUNDS_US_ONLY: "NSF M&O Core",
+            columns.FTE: 0.1,
+        }
+        bucket = materialized_totals.bucket_of(rec)[0]  # type: ignore[index]
+        field = materialized_totals.encode_bucket(bucket)
+        assert "." not in field
+        assert materialized_totals.decode_bucket(field) == bucket
+
+        # new, edited, moved, & deleted records
+        assert materialized_totals.deltas(None, rec) == {bucket: Decimal("0.1")}
+        edited = rec | {columns.FTE: 0.3}
+        assert materialized_totals.deltas(rec, edited) == {bucket: Decimal("0.2")}
+        assert not materialized_totals.deltas(rec, copy.deepcopy(rec))
+        moved = rec | {columns.INSTITUTION: "UMD"}
+        moved_bucket = ("UMD",) + bucket[1:]
+        assert materialized_totals.deltas(rec, moved) == {
+            bucket: Decimal("-0.1"),
+            moved_bucket: Decimal("0.1"),
+        }
+        assert materialized_totals.deltas(rec, None) == {bucket: Decimal("-0.1")}
+
+        # blanks & total rows don't count
+        assert not materialized_totals.deltas(None, rec | {columns.FTE: ""})
+        assert not materialized_totals.deltas(None, rec | {columns.TOTAL_COL: "x"})
+
+        buckets = materialized_totals.compute([rec, edited, moved])
+        assert buckets == {bucket: Decimal("0.4"), moved_bucket: Decimal("0.1")}
+        assert materialized_totals.to_records(buckets, "UMD") == [
+            dict(moved) | {columns.FTE: "0.1"}
+        ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_total_rows_from_buckets(_: Any, __: Any) -> None:
+        """Test that totals summed from buckets match those from the records."""
+        tc_cache = await tcc.TableConfigCache.create()
+        tc_data_adaptor = utils.TableConfigDataAdaptor(tc_cache)
+        us_inst = next(i.short_name for i in tc_cache.institutions if i.is_us)
+        non_us_inst = next(i.short_name for i in tc_cache.institutions if not i.is_us)
+
+        table = [
+            tc_data_adaptor.add_on_the_fly_fields(
+                copy.deepcopy(r)
+                | {columns.INSTITUTION: us_inst if i % 3 else non_us_inst}
+            )
+            for i, r in enumerate(data.FTE_ROWS)
+        ]
+        pseudo_table = [
+            tc_data_adaptor.add_on_the_fly_fields(r)
+            for r in materialized_totals.to_records(materialized_totals.compute(table))
+        ]
+        assert len(pseudo_table) < len(table)
+        assert tc_data_adaptor.get_total_rows(
+            WBS, pseudo_table
+        ) == tc_data_adaptor.get_total_rows(WBS, table)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_apply_totals_deltas(_: Any, __: Any) -> None:
+        """Test _apply_totals_deltas()."""
+        mou_db_client = mou_db.MOUDatabaseClient(
+            sentinel.mongo, utils.MOUDataAdaptor(await tcc.TableConfigCache.create())
+        )
+        coll = Mock(update_one=AsyncMock())
+        mongofied: uut.DBRecord = {
+            mongo_tools.Mongofier.mongofy_key_name(columns.SOURCE_OF_FUNDS_US_ONLY): "",
+            columns.INSTITUTION: "UW",
+            columns.WBS_L2: "2.1",
+            columns.WBS_L3: "2.1.0",
+            columns.FTE: 0.5,
+        }
+        with patch.object(mou_db_client, "_totals_coll_obj", return_value=coll):
+            # no change -> only the write is no longer pending
+            await mou_db_client._apply_totals_deltas("mo", "t1", mongofied, mongofied)
+            coll.update_one.assert_awaited_once_with(
+                {"_id": materialized_totals.DOC_ID},
+                {"$inc": {"version": 1}, "$unset": {"pending.t1": ""}},
+                upsert=True,
+            )
+
+            # deleting -> decrement
+            coll.update_one.reset_mock()
+            deleted = mongofied | {utils.MOUDataAdaptor.IS_DELETED: True}
+            await mou_db_client._apply_totals_deltas("mo", "t2", mongofied, deleted)
+            field = materialized_totals.encode_bucket(("UW", "2.1", "2.1.0", ""))
+            coll.update_one.assert_awaited_once_with(
+                {"_id": materialized_totals.DOC_ID},
+                {
+                    "$inc": {
+                        f"buckets.{field}": Decimal128(Decimal("-0.5")),
+                        "version": 1,
+                    },
+                    "$unset": {"pending.t2": ""},
+                },
+                upsert=True,
+            )
+
+    class FakeTotalsColl:
+        """Just enough of a motor collection for the live totals' document."""
+
+        def __init__(self) -> None:
+            self.doc: dict[str, Any] | None = None
+
+        async def find_one(self, _: dict[str, Any]) -> dict[str, Any] | None:
+            return copy.deepcopy(self.doc)
+
+        async def update_one(
+            self, _: dict[str, Any], update: dict[str, Any], upsert: bool
+        ) -> None:
+            assert upsert
+            doc = self.doc = self.doc or {"_id": materialized_totals.DOC_ID}
+            for op, fields in update.items():
+                for key, val in fields.items():
+                    *parents, name = key.split(".", 1)  # bucket fields have no '.'
+                    sub = doc.setdefault(parents[0], {}) if parents else doc
+                    if op == "$set":
+                        sub[name] = val
+                    elif op == "$unset":
+                        sub.pop(name, None)
+                    elif isinstance(val, Decimal128):  # $inc
+                        old = sub.get(name, Decimal128("0")).to_decimal()
+                        sub[name] = Decimal128(old + val.to_decimal())
+                    else:
+                        sub[name] = sub.get(name, 0) + val
+
+        async def replace_one(
+            self, query: dict[str, Any], doc: dict[str, Any], upsert: bool
+        ) -> Any:
+            assert upsert
+            if self.doc is None:
+                self.doc = doc | {"_id": query["_id"]}
+                return Mock(matched_count=0, upserted_id=query["_id"])
+            if self.doc.get("version") != query["version"]:
+                raise pymongo.errors.DuplicateKeyError("_id")  # the upsert's insert
+            self.doc = doc | {"_id": query["_id"]}
+            return Mock(matched_count=1, upserted_id=None)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @patch(KRS_INSTS, side_effect=AsyncMock(return_value=institution_list.INSTITUTIONS))
+    @patch(KRS_TOKEN, return_value=Mock())
+    async def test_rebuild_totals_race(_: Any, __: Any) -> None:
+        """Test that a record write racing rebuild_totals() isn't lost."""
+        mou_db_client = mou_db.MOUDatabaseClient(
+            sentinel.mongo, utils.MOUDataAdaptor(await tcc.TableConfigCache.create())
+        )
+        coll = TestMaterializedTotals.FakeTotalsColl()
+        mongofied: uut.DBRecord = {
+            mongo_tools.Mongofier.mongofy_key_name(columns.SOURCE_OF_FUNDS_US_ONLY): "",
+            columns.INSTITUTION: "UW",
+            columns.WBS_L2: "2.1",
+            columns.WBS_L3: "2.1.0",
+            columns.FTE: 0.5,
+        }
+        bucket = ("UW", "2.1", "2.1.0", "")
+        live: uut.DBTable = [
+            mongo_tools.Mongofier.demongofy_document(mongofied, str_id=False)
+        ]
+
+        async def upsert() -> None:  # like upsert_record()
+            token = await mou_db_client._begin_totals_write("mo")
+            live.append(
+                mongo_tools.Mongofier.demongofy_document(mongofied, str_id=False)
+            )
+            await mou_db_client._apply_totals_deltas("mo", token, None, mongofied)
+
+        async def read_live_table(*_: Any) -> uut.DBTable:
+            table = copy.deepcopy(live)
+            if len(live) == 1:  # the upsert lands mid-rebuild, after the read
+                await upsert()
+            return table
+
+        with patch.object(
+            mou_db_client, "_totals_coll_obj", return_value=coll
+        ), patch.object(mou_db_client, "_read_live_table", new=read_live_table):
+            # deltas before the totals are built are kept, but not read
+            await upsert()
+            assert coll.doc and coll.doc["buckets"]
+            assert await mou_db_client._read_totals("mo") is None
+            live.pop()
+
+            # the raced rebuild is retried, so the upsert is counted once
+            assert await mou_db_client.rebuild_totals("mo") == {bucket: Decimal("1.0")}
+            assert await mou_db_client._read_totals("mo") == {bucket: Decimal("1.0")}
+            assert not coll.doc.get("pending")
+
+            # & a write pending from before then is waited out
+            token = await mou_db_client._begin_totals_write("mo")
+            rebuild = asyncio.create_task(mou_db_client.rebuild_totals("mo"))
+            await asyncio.sleep(0.05)
+            assert not rebuild.done()
+            live.append(
+                mongo_tools.Mongofier.demongofy_document(mongofied, str_id=False)
+            )
+            await mou_db_client._apply_totals_deltas("mo", token, None, mongofied)
+            assert await rebuild == {bucket: Decimal("1.5")}
+            assert await mou_db_client._read_totals("mo") == {bucket: Decimal("1.5")}
+
+
+class TestSnapshotArchive:
+    """Test snapshot_archive.py."""
+
+    @staticmethod
+    def test_round_trip() -> None:
+        """Test encode() & decode()."""
+        docs: uut.DBTable = [
+            {"_id": ObjectId(), "FTE": 0.5, "Name": f"P{i}", "deleted": False}
+            for i in range(100)
+        ]
+
+        assert snapshot_archive.decode(snapshot_archive.encode(docs)) == docs
+        assert snapshot_archive.decode(snapshot_archive.encode([])) == []
+
+        # multiple chunks, in order
+        with patch.object(snapshot_archive, "MAX_CHUNK_BYTES", 500):
+            chunks = snapshot_archive.encode(docs)
+        assert len(chunks) > 1
+        assert snapshot_archive.decode(chunks) == docs
+
+
+class TestWriteBehind:
+    """Test write_behind.py."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_timestamp_coalescer() -> None:
+        """Test TimestampCoalescer."""
+        flush_func = AsyncMock()
+        coalescer = write_behind.TimestampCoalescer(flush_func, window=0.05)
+
+        for ts in [10, 30, 20]:
+            coalescer.bump("mo", "UW", ts)
+        coalescer.bump("mo", "UMD", 5)
+        coalescer.bump("upgrade", "UW", 7)
+        assert coalescer.get("mo", "UW") == 30  # read-your-writes
+        assert coalescer.get("mo", "Other") is None
+        flush_func.assert_not_awaited()
+
+        # after the window -> one write per wbs
+        await asyncio.sleep(0.1)
+        assert flush_func.await_count == 2
+        flush_func.assert_any_await("mo", {"UW": 30, "UMD": 5})
+        flush_func.assert_any_await("upgrade", {"UW": 7})
+        assert coalescer.get("mo", "UW") is None
+
+        # a failed write is retried, w/ the newer bumps
+        flush_func.reset_mock()
+        flush_func.side_effect = [Exception("db down"), None]
+        coalescer.bump("mo", "UW", 40)
+        with pytest.raises(Exception):
+            await coalescer.flush()
+        coalescer.bump("mo", "UW", 35)
+        assert coalescer.get("mo", "UW") == 40
+        await coalescer.flush("mo")
+        flush_func.assert_awaited_with("mo", {"UW": 40})
+
+
+class TestChangeFeed:
+    """Test change_feed.py."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_change_feed() -> None:
+        """Test ChangeFeed."""
+        feed = change_feed.ChangeFeed(max_changes=3)
+        start = feed.version("mo")
+        assert not feed.changes_since("mo", start)
+
+        def msg(kind: str, inst: str = "") -> invalidation_bus.Message:
+            return invalidation_bus.Message("mo", kind, institution=inst)
+
+        feed.record(msg(invalidation_bus.LIVE, "UW"))
+        feed.record(msg(invalidation_bus.LIVE, "UMD"))
+        changes = feed.changes_since("mo", start)
+        assert changes.institutions == ["UMD", "UW"]
+        assert not changes.everything and not changes.snapshots
+        assert changes.version == feed.version("mo") > start
+        assert not feed.changes_since("mo", changes.version)
+        assert not feed.changes_since("upgrade", start)
+
+        # wait for the next change
+        waiter = asyncio.create_task(feed.wait("mo", changes.version, timeout=5))
+        await asyncio.sleep(0)
+        feed.record(msg(invalidation_bus.SNAPSHOTS))
+        assert (await waiter).snapshots
+        # ... or not
+        version = feed.version("mo")
+        assert not await feed.wait("mo", version, timeout=0.01)
+
+        # a change w/o an institution, or trimmed history, means everything
+        feed.record(msg(invalidation_bus.LIVE))
+        assert feed.changes_since("mo", version).everything
+        assert feed.changes_since("mo", start).everything  # trimmed
+
+
+class TestColumnar:
+    """Test universal_utils/columnar.py."""
+
+    @staticmethod
+    def test_round_trip() -> None:
+        """Test encode_tables() & decode_tables()."""
+        table: list[dict[str, Any]] = [
+            {"Inst": "UW", "FTE": 1, "Name": "a"},
+            {"Inst": "UW", "FTE": 1.0, "On": True},  # 1, 1.0 & True are distinct
+            {"Inst": "UMD", "FTE": None},
+            {},
+            {"Inst": "UW", "Tags": ["x", "y"], "Meta": {"k": 1}},  # unhashable
+            {"Tags": ["x", "y"]},
+        ]
+        body = {"table": copy.deepcopy(table), "foo": 3, "bar": ["x"], "baz": []}
+
+        encoded = columnar.encode_tables(body)
+        assert encoded["foo"] == 3 and encoded["bar"] == ["x"] and encoded["baz"] == []
+        assert columnar.is_encoded(encoded["table"])
+        assert encoded["table"]["columns"]["Inst"] == [
+            ["UW", "UMD"],
+            [0, 0, 1, -1, 0, -1],
+        ]
+        assert encoded["table"]["columns"]["Tags"] == [
+            [["x", "y"], ["x", "y"]],  # each unhashable value is stored as-is
+            [-1, -1, -1, -1, 0, 1],
+        ]
+
+        decoded = columnar.decode_tables(encoded)
+        assert decoded == body
+        assert [list(r.items()) for r in decoded["table"]] == [
+            list(r.items()) for r in table
+        ]
+        assert [type(r.get("FTE")) for r in decoded["table"]] == [
+            int,
+            float,
+            type(None),
+            type(None),
+            type(None),
+            type(None),
+        ]
+
+
+class TestResponses:
+    """Test fast_json.py & response_cache.py."""
+
+    @staticmethod
+    def test_fast_json() -> None:
+        """Test fast_json.dumps()."""
+        oid = ObjectId()
+        body = {"id": oid, "fte": Decimal("0.5"), "d128": Decimal128("1.25"), 3: "x"}
+        expected = f'{{"id":"{oid}","fte":0.5,"d128":1.25,"3":"x"}}'.encode()
+        assert fast_json.dumps(body) == expected
+        with patch.object(fast_json, "_HAS_ORJSON", False):  # w/o the optional library
+            assert fast_json.dumps(body) == expected
+        with pytest.raises(TypeError):
+            fast_json.dumps({"s": {1, 2}})
+
+    @staticmethod
+    def test_response_cache() -> None:
+        """Test ResponseCache."""
+        cache = response_cache.ResponseCache(max_bytes=10)
+        assert cache.get("a") is None
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        assert cache.get("a") == b"12345"  # ...so "b" is least recently used
+        cache.put("c", b"123")
+        assert cache.get("b") is None and cache.get("c") == b"123"
+        cache.put("d", b"12345678901")  # never fits
+        assert cache.get("d") is None and cache.get("a") == b"12345"
+
+
+class TestOffload:
+    """Test offload.py."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_offloader() -> None:
+        """Test Offloader."""
+        offloader = offload.Offloader(processes=1, threads=1, min_rows=3)
+        try:
+            assert await offloader.in_process(pow, 2, 10) == 1024
+            assert await offloader.in_thread(sorted, [3, 1, 2]) == [1, 2, 3]
+            assert metrics.OFFLOADED_DURATION.count(pool="process", func="pow")
+
+            # small tables are done inline, big ones in a thread
+            for table in [[2, 1], [3, 2, 1]]:
+                await offloader.for_table(len(table), table.sort, key=lambda x: -x)
+                assert table == sorted(table, reverse=True)
+            assert metrics.OFFLOADED_DURATION.count(pool="thread", func="sort")
+        finally:
+            offloader.shutdown()
+
+        # no pools -- everything inline
+        offloader = offload.Offloader(processes=0, threads=0)
+        assert await offloader.in_process(pow, 2, 3) == 8
+        assert metrics.OFFLOADED_DURATION.count(pool="inline", func="pow")
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_monitor_loop_lag() -> None:
+        """Test monitor_loop_lag()."""
+        before = metrics.EVENT_LOOP_LAG.count()
+        task = asyncio.create_task(offload.monitor_loop_lag(0.01, warn_after=0.05))
+        await asyncio.sleep(0)
+        time.sleep(0.1)  # block the loop
+        await asyncio.sleep(0.05)
+        task.cancel()
+        assert metrics.EVENT_LOOP_LAG.count() > before
+        assert metrics.EVENT_LOOP_LAG._values[()][1] >= 0.05  # sum of lags
+
+
+class TestAdmission:
+    """Test admission.py."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_gate() -> None:
+        """Test Gate."""
+        gate = admission.Gate("test", limit=1, queue=2)
+
+        def gauges() -> tuple[float, float]:
+            return (
+                metrics.ADMISSION_RUNNING.get(gate="test"),
+                metrics.ADMISSION_QUEUED.get(gate="test"),
+            )
+
+        await gate.acquire()
+        second = asyncio.create_task(gate.acquire())
+        third = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        assert gauges() == (1, 2)
+        with pytest.raises(admission.SaturatedError):  # the queue is full
+            await gate.acquire()
+        assert metrics.ADMISSION_REJECTED.get(gate="test") == 1
+
+        # a waiter that gives up leaves the queue
+        third.cancel()
+        await asyncio.sleep(0)
+        assert gauges() == (1, 1)
+
+        # slots are handed over in order
+        gate.release()
+        await second
+        assert gauges() == (1, 0)
+        gate.release()
+        assert gauges() == (0, 0)
+        assert metrics.ADMISSION_WAIT.count(gate="test") == 2
+
+
+class TestWorkers:
+    """Test the pre-fork workers, in rest_server/__main__.py."""
+
+    @staticmethod
+    def test_fork_workers(tmp_path: Any) -> None:
+        """Test that SIGTERM reaches every worker, & the parent waits for them."""
+        script = textwrap.dedent(
+            f"""
+            import os, signal, sys, time
+            from rest_server.__main__ import _fork_workers
+
+            worker_id = _fork_workers(2)
+            def stop(*_):
+                time.sleep(0.2)  # ex: flushing the pending writes
+                open(os.path.join({str(tmp_path)!r}, str(worker_id)), "w").close()
+                sys.exit(0)
+            signal.signal(signal.SIGTERM, stop)
+            open(os.path.join({str(tmp_path)!r}, "ready-" + str(worker_id)), "w").close()
+            while True:
+                time.sleep(1)
+            """
+        )
+        with subprocess.Popen([sys.executable, "-c", script]) as parent:
+            for _ in range(300):
+                if len(list(tmp_path.glob("ready-*"))) == 2:
+                    break
+                time.sleep(0.1)
+            parent.send_signal(signal.SIGTERM)
+            assert parent.wait(timeout=30) == 0
+        assert (tmp_path / "0").exists() and (tmp_path / "1").exists()
+
+
+class TestJobs:
+    """Test jobs.py."""
+
+    class FakeCollection:
+        """Just enough of a motor collection (w/ the unique `active` index)."""
+
+        def __init__(self) -> None:
+            self.docs: dict[str, dict[str, Any]] = {}
+
+        async def insert_one(self, doc: dict[str, Any]) -> None:
+            if any(d.get("active") == doc["active"] for d in self.docs.values()):
+                raise pymongo.errors.DuplicateKeyError("active")
+            self.docs[doc["_id"]] = copy.deepcopy(doc)
+
+        async def find_one(self, query: dict[str, Any]) -> dict[str, Any] | None:
+            for doc in self.docs.values():
+                if all(doc.get(k) == v for k, v in query.items()):
+                    return copy.deepcopy(doc)
+            return None
+
+        async def update_one(self, query: dict[str, Any], update: Any) -> None:
+            doc = self.docs[query["_id"]]
+            for key, val in update["$set"].items():
+                if key.startswith("progress."):
+                    doc["progress"][key.split(".", 1)[1]] = val
+                else:
+                    doc[key] = val
+            for key in update.get("$unset", {}):
+                doc.pop(key, None)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_job_manager() -> None:
+        """Test JobManager."""
+        coll = TestJobs.FakeCollection()
+        manager = jobs.JobManager(Mock(), heartbeat_secs=0.01, keep_days=1)
+        manager._coll_obj = lambda: coll  # type: ignore[method-assign]
+        release = asyncio.Event()
+
+        async def work(progress: jobs.ProgressFunc) -> dict[str, Any]:
+            await progress(stage="parsing", rows_parsed=5)
+            await release.wait()
+            return {"n_records": 5}
+
+        # one job of a kind per WBS at a time
+        job_id = await manager.submit(jobs.IMPORT, WBS, work)
+        with pytest.raises(jobs.JobConflictError) as e:
+            await manager.submit(jobs.IMPORT, WBS, work)
+        assert e.value.job_id == job_id
+        await asyncio.sleep(0.05)  # heartbeats
+        info = await manager.get(job_id)
+        assert info and not info.is_done()
+        assert info.progress == {"stage": "parsing", "rows_parsed": 5}
+
+        release.set()
+        assert await manager.wait(job_id) == {"n_records": 5}
+        info = await manager.get(job_id)
+        assert info and info.status == uut.JOB_SUCCEEDED
+        assert info.result == {"n_records": 5}
+        assert "active" not in coll.docs[job_id]  # so, another can run
+
+        # a failed job keeps its code
+        async def bad_work(_: jobs.ProgressFunc) -> dict[str, Any]:
+            raise web.HTTPError(422, reason="Invalid Data")
+
+        job_id = await manager.submit(jobs.IMPORT, WBS, bad_work)
+        with pytest.raises(web.HTTPError) as e2:
+            await manager.wait(job_id)
+        assert e2.value.status_code == 422
+        info = await manager.get(job_id)
+        assert info and (info.status, info.code, info.error) == (
+            uut.JOB_FAILED,
+            422,
+            "Invalid Data",
+        )
+
+        # a detailed error's reason stays short, its details are in the job's error
+        async def bad_rows_work(_: jobs.ProgressFunc) -> dict[str, Any]:
+            raise jobs.DetailedHTTPError(
+                422, "2 invalid rows", ["Row 2: a", "Row 5: b"]
+            )
+
+        job_id = await manager.submit(jobs.IMPORT, WBS, bad_rows_work)
+        with pytest.raises(jobs.DetailedHTTPError) as e3:
+            await manager.wait(job_id)
+        assert e3.value.reason == "2 invalid rows"
+        info = await manager.get(job_id)
+        assert info and info.error == "2 invalid rows\nRow 2: a\nRow 5: b"
+
+        # a job whose heartbeat stopped (ex: its server restarted) was abandoned
+        coll.docs["old"] = dict(
+            coll.docs[job_id],
+            _id="old",
+            status=uut.JOB_RUNNING,
+            active=f"{WBS}/{jobs.IMPORT}",
+            updated=time.time() - 60,
+        )
+        job_id = await manager.submit(jobs.IMPORT, WBS, work)
+        info = await manager.get("old")
+        assert info and info.status == uut.JOB_FAILED and "abandoned" in info.error
+        assert await manager.wait(job_id) == {"n_records": 5}
+        assert await manager.get("nope") is None
+
+
+class TestRecordValidator:
+    """Test universal_utils/validation.py."""
+
+    @staticmethod
+    def test_validate_table() -> None:
+        """Test RecordValidator.validate_table()."""
+        validator = RecordValidator(
+            {"Foo": ["foo-1", "foo-2"]},
+            {"Ham": ("Foo", {"foo-1": ["1A"], "foo-2": ["1B"]})},
+        )
+
+        table: uut.DBTable = [
+            {"Foo": "foo-1", "Ham": "1A"},
+            {"Foo": "pork", "Ham": "1A"},  # bad parent & so, bad child
+            {"Ham": "1B"},  # orphan, okay for any parent
+            {"Foo": "foo-1", "Ham": "1B"},  # bad child
+            {"Ham": "spam"},  # bad orphan
+            {"Foo": "", "Ham": ""},
+        ]
+        bad = validator.validate_table(table)
+        assert list(bad) == [1, 3, 4]
+        assert len(bad[1]) == 2
+        assert "Simple-Dropdown" in bad[1][0]  # parents come first
+        assert "(Orphan)" in bad[4][0]
+
+        # for the web app, missing means blank -- so orphans are removed
+        assert validator.clean({"Ham": "1B", "X": 1}, ["Foo", "Ham", "X"]) == {
+            "Foo": "",
+            "Ham": "",
+            "X": 1,
+        }
+        assert validator.clean({"Foo": "pork", "Ham": "1A"}, []) == {}
+
+
 class TestMongofier:
     """Test mongo_tools.Mongofier."""
 
@@ -676,3 +1679,124 @@ class TestTableConfig:
                 assert tc_cache.us_or_non_us(inst.short_name) == "US"
             else:
                 assert tc_cache.us_or_non_us(inst.short_name) == "Non-US"
+
+
+class TestMetrics:
+    """Test metrics.py."""
+
+    @staticmethod
+    def test_histogram() -> None:
+        """Test Histogram rendering."""
+        hist = metrics.Histogram("foo_seconds", "Foo.", ("route",), buckets=(0.1, 1))
+        for val in [0.05, 0.1, 0.5, 3]:
+            hist.observe(val, route="/a")
+        hist.observe(0.2, route='/"b"')
+
+        assert hist.count(route="/a") == 4
+        assert hist.render().split("\n") == [
+            "# HELP foo_seconds Foo.",
+            "# TYPE foo_seconds histogram",
+            'foo_seconds_bucket{route="/\\"b\\"",le="0.1"} 0',
+            'foo_seconds_bucket{route="/\\"b\\"",le="1"} 1',
+            'foo_seconds_bucket{route="/\\"b\\"",le="+Inf"} 1',
+            'foo_seconds_sum{route="/\\"b\\""} 0.2',
+            'foo_seconds_count{route="/\\"b\\""} 1',
+            'foo_seconds_bucket{route="/a",le="0.1"} 2',
+            'foo_seconds_bucket{route="/a",le="1"} 3',
+            'foo_seconds_bucket{route="/a",le="+Inf"} 4',
+            'foo_seconds_sum{route="/a"} 3.65',
+            'foo_seconds_count{route="/a"} 4',
+        ]
+
+        with pytest.raises(ValueError):
+            hist.observe(1, wrong="label")
+
+    @staticmethod
+    def test_counter() -> None:
+        """Test Counter & the cache helper."""
+        before = metrics.CACHE_REQUESTS.get(cache="foo", result="hit")
+        metrics.record_cache("foo", hit=True)
+        metrics.record_cache("foo", hit=True)
+        metrics.record_cache("foo", hit=False)
+        assert metrics.CACHE_REQUESTS.get(cache="foo", result="hit") == before + 2
+        assert 'mou_cache_requests_total{cache="foo",result="miss"}' in (
+            metrics.REGISTRY.render()
+        )
+
+    @staticmethod
+    def test_mongo_command_listener() -> None:
+        """Test MongoCommandListener."""
+        before = metrics.MONGO_COMMAND_DURATION.count(command="find", status="ok")
+        metrics.MongoCommandListener().succeeded(
+            Mock(duration_micros=1500, command_name="find")
+        )
+        assert (
+            metrics.MONGO_COMMAND_DURATION.count(command="find", status="ok")
+            == before + 1
+        )
+
+    @staticmethod
+    def test_mongo_pool_listener() -> None:
+        """Test MongoPoolListener."""
+        listener = metrics.MongoPoolListener()
+        event = Mock(address=("db-test", 27017))
+
+        listener.connection_created(event)
+        listener.connection_created(event)
+        listener.connection_check_out_started(event)
+        listener.connection_checked_out(event)
+        assert metrics.MONGO_POOL_CONNECTIONS.get(address="db-test:27017") == 2
+        assert metrics.MONGO_POOL_CHECKED_OUT.get(address="db-test:27017") == 1
+        assert (
+            metrics.MONGO_POOL_CHECKOUT_WAIT.count(address="db-test:27017", status="ok")
+            == 1
+        )
+
+        listener.connection_checked_in(event)
+        listener.connection_closed(event)
+        assert metrics.MONGO_POOL_CONNECTIONS.get(address="db-test:27017") == 1
+        assert metrics.MONGO_POOL_CHECKED_OUT.get(address="db-test:27017") == 0
+
+
+class TestProfiling:
+    """Test universal_utils/profiling.py, as used by the REST server."""
+
+    @staticmethod
+    def test_request_profiler(tmp_path: Any) -> None:
+        """Test RequestProfiler."""
+        prof = RequestProfiler(str(tmp_path), "GET_TableHandler_/table/data/mo")
+        assert prof.start()
+        # only one at a time
+        other = RequestProfiler(str(tmp_path), "other")
+        assert not other.start()
+        assert other.stop() is None
+
+        sum(range(1000))
+        fpath = prof.stop()
+        assert fpath and fpath.exists()
+        assert fpath.name.endswith("ms.prof")
+        assert "_GET-TableHandler-table-data-mo_" in fpath.name
+        assert prof.stop() is None  # idempotent
+        assert list(tmp_path.iterdir()) == [fpath]
+
+        # lock was released
+        assert other.start()
+        other.stop()
+
+    @staticmethod
+    def test_may_profile() -> None:
+        """Test that only the authenticated service account may profile."""
+        handler = object.__new__(routes.BaseMOUHandler)
+        with patch.object(routes, "is_testing", return_value=False):
+            # no (valid) token
+            handler._current_user = None
+            assert not handler._may_profile()
+            # w/o the role
+            handler._current_user = "someone"
+            handler.auth_data = {"realm_access": {"roles": ["other"]}}
+            assert not handler._may_profile()
+            # w/ the role
+            handler.auth_data["realm_access"]["roles"].append(
+                config.AUTH_SERVICE_ACCOUNT
+            )
+            assert handler._may_profile()
@@ -5,19 +5,32 @@
 
 
 import dataclasses as dc
+import functools
 import inspect
 import itertools
+import json
+import pathlib
+import shutil
+import subprocess
+import time
 from copy import deepcopy
 from enum import Enum
-from typing import Any, Final, Iterator, TypedDict
+from typing import Any, Callable, Final, Iterator, TypedDict, cast
 from unittest.mock import patch
 
+import flask
 import pytest
 import requests
 import universal_utils.types as uut
 import web_app.utils
+from dash.exceptions import PreventUpdate  # type: ignore[import]
+from universal_utils import columnar
+from web_app import config, layout
+from web_app.contents import wbs_generic_callbacks
+from web_app.utils import background, callback_metrics, change_notifications
 from web_app.data_source import connections
 from web_app.data_source import data_source as src
+from web_app.data_source import request_cache
 from web_app.data_source import table_config as tc
 
 WBS = "mo"
@@ -274,10 +287,19 @@ class TestDataSource:
 
             # Assert
             mock_rest.return_value.request_seq.assert_called_with(
-                "GET", f"/table/data/{WBS}", body
+                "GET", f"/table/data/{WBS}", body, {"Accept": columnar.MEDIA_TYPE}
             )
             assert ret == response["table"]
 
+        # a columnar-encoded response is decoded
+        table = [{"a": "a", "b": 1}, {"b": 1.0}, {"a": None, "c": True}]
+        mock_rest.return_value.request_seq.return_value = columnar.encode_tables(
+            {"table": deepcopy(table)}
+        )
+        ret = src.pull_data_table(WBS, tconfig, raw=True)
+        assert ret == table
+        assert [type(r.get("b")) for r in ret] == [int, float, type(None)]
+
     @staticmethod
     @patch("web_app.data_source.connections.CurrentUser._get_info")
     def test_push_record(
@@ -428,6 +450,77 @@ class TestDataSource:
         )
         assert ret == response
 
+    @staticmethod
+    @patch("web_app.data_source.connections.CurrentUser._get_info")
+    def test_override_table(current_user: Any, mock_rest: Any) -> None:
+        """Test override_table(), pull_job() & get_override_table_result()."""
+        current_user.return_value = web_app.data_source.connections.UserInfo(
+            "t.hanks", ["/tokens/mou-dashboard-admin"], ""
+        )
+        snap = uut.SnapshotInfo(
+            timestamp="a", name="Initial Import", creator="t.hanks", admin_only=True
+        )
+        xlsx = b"PK\x03\x04 not really a spreadsheet"
+        args = {
+            "filename": "foo.xlsx",
+            "creator": "t.hanks",
+            "is_admin": True,
+            "as_job": True,
+        }
+
+        # Call
+        rc = mock_rest.return_value
+        rc.address, rc.timeout = "http://rest/", 5.0
+        rc.token_func, rc.access_token = None, b"my-token"
+        post = rc.open.return_value.__enter__.return_value.post
+        post.return_value.json.return_value = {"job_id": "abc123"}
+        ret = src.override_table(WBS, xlsx, "foo.xlsx")
+
+        # Assert -- the bytes are sent as-is, the args are in the query
+        rc.open.assert_called_with(sync=True)
+        post.assert_called_with(
+            f"http://rest/table/xlsx/{WBS}",
+            params=args,
+            data=xlsx,
+            headers={
+                "Content-Type": src.XLSX_MEDIA_TYPE,
+                "Authorization": "Bearer my-token",
+            },
+            timeout=5.0,
+        )
+        assert ret == "abc123"
+
+        # --- a timeout, etc. -> DataSourceException
+        post.side_effect = requests.exceptions.Timeout("too slow")
+        with pytest.raises(connections.DataSourceException):
+            src.override_table(WBS, xlsx, "foo.xlsx")
+        post.side_effect = None
+
+        # --- poll the job
+        job = {
+            "job_id": "abc123",
+            "kind": "import",
+            "wbs_db": WBS,
+            "status": uut.JOB_SUCCEEDED,
+            "progress": {"stage": "snapshotting", "rows_written": 5},
+            "result": {
+                "n_records": 5,
+                "previous_snapshot": None,
+                "current_snapshot": dc.asdict(snap),
+            },
+            "code": 0,
+            "error": "",
+            "created": 1.0,
+            "updated": 2.0,
+        }
+        mock_rest.return_value.request_seq.return_value = job
+        info = src.pull_job("abc123")
+        mock_rest.return_value.request_seq.assert_called_with(
+            "GET", "/jobs/abc123", None
+        )
+        assert info.is_done()
+        assert src.get_override_table_result(info) == (5, None, snap)
+
 
 class TestTableConfig:
     """Test table_config.py."""
@@ -595,3 +688,292 @@ class TestTableConfig:
                 .default
             )
             assert table_config.get_column_width(col) == default
+
+
+class TestConnections:
+    """Test connections.py."""
+
+    @staticmethod
+    def test_gather() -> None:
+        """Test gather()."""
+        order = [0.05, 0.0, 0.02]
+
+        def _sleepy(i: int) -> int:
+            time.sleep(order[i])
+            return i
+
+        # results are in argument order, not completion order
+        assert connections.gather(
+            *[functools.partial(_sleepy, i) for i in range(3)]
+        ) == (0, 1, 2)
+        assert connections.gather() == ()
+
+        # nested fan-out runs inline (no pool starvation)
+        assert connections.gather(lambda: connections.gather(lambda: 5)) == ((5,),)
+
+    @staticmethod
+    def test_gather_errors() -> None:
+        """Test gather() with failing & slow calls."""
+
+        def _raise() -> None:
+            raise connections.DataSourceException("foo")
+
+        with pytest.raises(connections.DataSourceException, match="foo"):
+            connections.gather(lambda: 1, _raise)
+
+        with pytest.raises(connections.DataSourceException, match="timed out"):
+            connections.gather(lambda: time.sleep(1), timeout=0.05)
+
+
+class TestRequestCache:
+    """Test request_cache.py."""
+
+    @staticmethod
+    def test_request_cached() -> None:
+        """Test request_cached()."""
+        calls = []
+
+        @request_cache.request_cached()
+        def _double(x: int) -> int:
+            calls.append(x)
+            return 2 * x
+
+        # no app context -> no memoization
+        assert _double(1) == _double(1) == 2
+        assert calls == [1, 1]
+
+        name = _double.__qualname__
+        for _ in range(2):  # a new context (request) starts fresh
+            calls.clear()
+            with flask.Flask(__name__).app_context():
+                assert [_double(1), _double(2), _double(1), _double(1)] == [2, 4, 2, 2]
+            assert calls == [1, 2]
+        assert request_cache.get_stats()[name] == {"hits": 4, "misses": 4}
+
+    @staticmethod
+    def test_table_config_parser(tconfig: tc.TableConfigParser) -> None:
+        """Test that parser instances share a memo within a request."""
+        with flask.Flask(__name__).app_context():
+            menu = tconfig.get_simple_column_dropdown_menu("Alpha")
+            again = tc.TableConfigParser(WBS).get_simple_column_dropdown_menu("Alpha")
+            assert menu is again
+
+
+class TestCallbackMetrics:
+    """Test callback_metrics.py."""
+
+    @staticmethod
+    def test_callback_stats() -> None:
+        """Test CallbackStats."""
+        stats = callback_metrics.CallbackStats()
+        stats.add(0.5, [0.1, 0.2], 100, 2000)
+        stats.add(1.5, [], 50, 10)
+        assert stats == callback_metrics.CallbackStats(
+            calls=2,
+            wall_seconds=2.0,
+            max_wall_seconds=1.5,
+            rest_calls=2,
+            rest_seconds=pytest.approx(0.3),  # type: ignore[arg-type]
+            bytes_in=150,
+            bytes_out=2010,
+        )
+
+    @staticmethod
+    def test_mou_request_times(mocker: Any) -> None:
+        """Test that mou_request() records its latency for the callback."""
+        mocker.patch("web_app.data_source.connections._rest_connection")
+        with flask.Flask(__name__).app_context():
+            connections.mou_request("GET", "/foo")
+            connections.mou_request("GET", "/bar")
+            assert len(flask.g.get(connections.G_REQUEST_TIMES)) == 2
+
+
+class TestChangeNotifications:
+    """Test change_notifications.py."""
+
+    @staticmethod
+    def test_stream(mocker: Any) -> None:
+        """Test that _stream() relays only the changes, w/ their versions."""
+        changes = {"version": 2.5, "institutions": ["UW"], "everything": False}
+        pull = mocker.patch(
+            "web_app.data_source.data_source.pull_changes",
+            side_effect=[
+                {"version": 1.5},  # the starting version
+                {"version": 1.5},  # nothing changed
+                changes,
+                connections.DataSourceException("down"),  # -> browser reconnects
+            ],
+        )
+
+        events = list(change_notifications._stream(WBS, 0.0))
+        assert events[1] == "id: 1.5\n\n"
+        assert events[2].startswith(":")  # a keep-alive comment
+        assert events[3] == change_notifications._event("changes", changes, 2.5)
+        assert events[3].endswith("id: 2.5\n\n")
+        assert events[4] == f"retry: {change_notifications._ERROR_RETRY_MS}\n\n"
+        assert len(events) == 5
+        assert pull.call_args_list[1].args[:2] == (WBS, 1.5)
+        assert pull.call_args_list[3].args[:2] == (WBS, 2.5)
+
+    @staticmethod
+    def test_long_poll(mocker: Any) -> None:
+        """Test that a long-poll outlasts its wait, & a timeout isn't fatal."""
+        rest = mocker.patch("web_app.data_source.connections._rest_connection")
+        rest.return_value.timeout = 5.0
+        rest.return_value.request_seq.return_value = {"version": 1.5}
+        src.pull_changes(WBS, 1.5, 25.0)
+        assert rest.return_value.timeout > 25.0
+
+        rest.return_value.request_seq.side_effect = requests.exceptions.Timeout()
+        with pytest.raises(connections.DataSourceException):
+            src.pull_changes(WBS, 1.5, 25.0)
+
+    @staticmethod
+    def test_limited() -> None:
+        """Test that there are only so many streams at a time."""
+        streams = [
+            change_notifications._limited(iter(["a", "b"]))
+            for _ in range(config.ENV.CHANGES_MAX_STREAMS + 1)
+        ]
+        assert all(next(s) == "a" for s in streams[:-1])  # started
+        assert next(streams[-1]).startswith("retry: ")  # no room
+        assert list(streams[0]) == ["b"]  # done -> room
+        assert list(change_notifications._limited(iter(["c"]))) == ["c"]
+        for stream in streams:
+            stream.close()
+
+
+class TestBackground:
+    """Test background.py."""
+
+    @staticmethod
+    def test_gather() -> None:
+        """Test that gather() reports its progress, batch by batch."""
+        progress: list[tuple[int, int, str]] = []
+        env = dc.replace(background.ENV, REST_FANOUT_MAX_WORKERS=2)
+        with patch.object(background, "ENV", env):
+            results = background.gather(
+                progress.append, "foo", [functools.partial(int, i) for i in range(5)]
+            )
+        assert results == [0, 1, 2, 3, 4]
+        assert [p[:2] for p in progress] == [(0, 5), (2, 5), (4, 5), (5, 5)]
+        assert progress[-1][2] == "foo (5/5)"
+
+    @staticmethod
+    @patch("web_app.data_source.connections.CurrentUser.is_admin")
+    def test_cache_by(mock_admin: Any, mocker: Any) -> None:
+        """Test that only admins get a cache key, & that polls make no REST calls."""
+        background._data_version.cache_clear()
+        pull = mocker.patch(
+            "web_app.data_source.data_source.pull_changes",
+            return_value={"version": 1.5},
+        )
+        ctx = mocker.patch.object(background, "callback_context")
+        ctx.states = {background.URL_STATE: f"/{WBS}", background.SNAPSHOT_STATE: ""}
+        app = flask.Flask(__name__)
+
+        mock_admin.return_value = True
+        with app.test_request_context("/_dash-update-component"):  # a job starts
+            assert background._cache_by() == (WBS, "1.5")
+        for _ in range(10):  # its polls
+            with app.test_request_context("/_dash-update-component?cacheKey=abc"):
+                background._cache_by()
+        with app.test_request_context("/_dash-update-component"):  # another, soon
+            assert background._cache_by() == (WBS, "1.5")
+        assert pull.call_count == 1
+
+        ctx.states[background.SNAPSHOT_STATE] = "123"
+        with app.test_request_context("/_dash-update-component"):
+            assert background._cache_by() == (WBS, "")  # snapshots don't change
+        assert pull.call_count == 1
+
+        mock_admin.return_value = False
+        with app.test_request_context("/_dash-update-component?cacheKey=abc"):
+            with pytest.raises(PreventUpdate):
+                background._cache_by()
+
+    @staticmethod
+    def test_manager() -> None:
+        """Test that a cached result doesn't start a job."""
+        manager = object.__new__(background._Manager)  # w/o diskcache installed
+        manager.handle = {"cached": ["result"]}
+        with patch("dash.DiskcacheManager.call_job_fn", return_value=123) as call:
+            assert manager.call_job_fn("cached", None, [], {}) == background._NO_JOB
+            call.assert_not_called()
+            assert manager.call_job_fn("new", None, [], {}) == 123
+            call.assert_called_once()
+        with patch("dash.DiskcacheManager.terminate_job") as terminate:
+            manager.terminate_job(str(background._NO_JOB))
+            terminate.assert_not_called()
+
+
+class TestUIToggles:
+    """Test assets/ui_toggles.js against its Python oracles."""
+
+    @staticmethod
+    def _run_js(calls: list[tuple[str, list[Any]]]) -> list[Any]:
+        """Call each clientside function (in node), return the results."""
+        script = """
+            global.window = {dash_clientside: {PreventUpdate: "PreventUpdate"}};
+            require(process.argv[1]);
+            const calls = JSON.parse(process.argv[2]);
+            Promise.all(calls.map(([name, args]) => new Promise(
+                (resolve) => resolve(window.dash_clientside.ui[name](...args))
+            ).catch((e) => e)))
+                .then((results) => console.log(JSON.stringify(results)));
+        """
+        asset = pathlib.Path(web_app.__file__).parent / "assets" / "ui_toggles.js"
+        out = subprocess.run(
+            ["node", "-e", script, str(asset), json.dumps(calls)],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        return cast(list[Any], json.loads(out))
+
+    @staticmethod
+    @pytest.mark.skipif(not shutil.which("node"), reason="needs node")
+    def test_oracles() -> None:
+        """Compare the clientside callbacks' results to their Python twins'."""
+        ui_config = {
+            "is_admin": False,
+            "page_size": 25,
+            "hidden_columns": ["Alpha"],
+            "always_hidden_columns": ["Beta"],
+        }
+        admin_ui_config = ui_config | {"is_admin": True}
+        calls: list[tuple[str, list[Any]]] = []
+        for n_clicks in [None, 0, 1, 2, 3]:
+            for is_open in [False, True]:
+                calls.append(("toggle_navbar_collapse", [n_clicks, is_open]))
+            for snap_ts in ["", "123.4"]:
+                calls.append(("show_snapshot_dropdown", [n_clicks, snap_ts]))
+            for config in [None, ui_config, admin_ui_config]:
+                calls.append(("totals_button_style", [n_clicks, config]))
+            if n_clicks is not None:  # these don't run initially
+                for config in [None, ui_config]:  # None: before setup_table()
+                    calls.append(("toggle_pagination", [n_clicks, config]))
+                    calls.append(("toggle_hidden_columns", [n_clicks, config]))
+
+        oracles: dict[str, Callable[..., Any]] = {
+            "toggle_navbar_collapse": layout.toggle_navbar_collapse,
+            "show_snapshot_dropdown": wbs_generic_callbacks.show_snapshot_dropdown,
+            "totals_button_style": wbs_generic_callbacks.totals_button_style,
+            "toggle_pagination": wbs_generic_callbacks.toggle_pagination,
+            "toggle_hidden_columns": wbs_generic_callbacks.toggle_hidden_columns,
+        }
+
+        def oracle(name: str, args: list[Any]) -> Any:
+            try:
+                return list(oracles[name](*args))
+            except PreventUpdate:
+                return "PreventUpdate"  # what the JS throws (see `_run_js()`)
+
+        for (name, args), result in zip(calls, TestUIToggles._run_js(calls)):
+            assert result == oracle(name, args), (name, args)
+
+        # random, so check it's one of the oracle's choices
+        intervals = TestUIToggles._run_js([("interval_cloud_saved", [0])] * 4)
+        with patch("random.choice", side_effect=max):
+            assert max(intervals) <= wbs_generic_callbacks.interval_cloud_saved(0)
+        assert all(i % 60000 == 0 for i in intervals)
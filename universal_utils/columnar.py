@@ -0,0 +1,80 @@
+"""A compact, columnar encoding for tables (lists of records).
+
+Records repeat every column name in every row, and most columns have few
+distinct values (institutions, L2/L3s, labor categories, ...). So, each
+column is sent once with its distinct values, plus a small integer code
+per row. The result is still JSON, so any JSON parser can read it.
+
+The REST server only encodes a response when the request's `Accept`
+header asks for `MEDIA_TYPE`; otherwise, plain JSON is the default.
+"""
+
+
+from typing import Any, Final
+
+MEDIA_TYPE: Final[str] = "application/vnd.mou.columnar+json"
+MARKER: Final[str] = "columnar"  # an encoded table's version key
+VERSION: Final[int] = 1
+MISSING: Final[int] = -1  # code for a record without the column
+_ABSENT: Final = object()
+
+
+def encode_table(table: list[dict[str, Any]]) -> dict[str, Any]:
+    """Encode the records as dictionary-encoded columns."""
+    columns: dict[str, list[list[Any]]] = {}
+    for col in dict.fromkeys(k for record in table for k in record):
+        values: list[Any] = []
+        codes: list[int] = []
+        lookup = {(object, _ABSENT): MISSING}
+        for record in table:
+            value = record.get(col, _ABSENT)
+            key = (type(value), value)  # keep 1, 1.0 & True apart
+            try:
+                code = lookup.get(key)
+            except TypeError:  # unhashable (ex: a list), so stored as-is
+                codes.append(len(values))
+                values.append(value)
+                continue
+            if code is None:
+                code = lookup[key] = len(values)
+                values.append(value)
+            codes.append(code)
+        columns[col] = [values, codes]
+
+    return {MARKER: VERSION, "length": len(table), "columns": columns}
+
+
+def decode_table(encoded: dict[str, Any]) -> list[dict[str, Any]]:
+    """Decode the columns back into records (in the original column order)."""
+    if encoded.get(MARKER) != VERSION:
+        raise ValueError(f"Unknown columnar encoding: {encoded.get(MARKER)}")
+
+    table: list[dict[str, Any]] = [{} for _ in range(encoded["length"])]
+    for col, (values, codes) in encoded["columns"].items():
+        for record, code in zip(table, codes):
+            if code != MISSING:
+                record[col] = values[code]
+    return table
+
+
+def is_encoded(value: Any) -> bool:
+    """Return whether the value is an encoded table."""
+    return isinstance(value, dict) and MARKER in value and "columns" in value
+
+
+def encode_tables(body: dict[str, Any]) -> dict[str, Any]:
+    """Encode each (top-level) table in the response body."""
+    return {k: encode_table(v) if _is_table(v) else v for k, v in body.items()}
+
+
+def decode_tables(body: dict[str, Any]) -> dict[str, Any]:
+    """Decode each (top-level) encoded table in the response body."""
+    return {k: decode_table(v) if is_encoded(v) else v for k, v in body.items()}
+
+
+def _is_table(value: Any) -> bool:
+    return (
+        bool(value)
+        and isinstance(value, list)
+        and all(isinstance(v, dict) for v in value)
+    )
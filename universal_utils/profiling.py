@@ -0,0 +1,60 @@
+"""Opt-in, single-request profiling with cProfile."""
+
+
+import cProfile
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+
+_ACTIVE_LOCK = threading.Lock()  # a thread can only run one profiler at a time
+
+
+def sanitize(label: str) -> str:
+    """Make `label` filename-safe."""
+    return re.sub(r"[^A-Za-z0-9.-]+", "-", label).strip("-")[:100] or "root"
+
+
+class RequestProfiler:
+    """Profile one request, then dump stats to `{outdir}/{ts}_{label}_{ms}ms.prof`.
+
+    Only one request is profiled at a time (per process); concurrent
+    requests are not profiled. On an async server, the profile includes
+    whatever else the event loop runs in the meantime.
+
+    Open a dump with `python -m pstats FILE` or `snakeviz FILE`.
+    """
+
+    def __init__(self, outdir: str, label: str) -> None:
+        self.outdir = Path(outdir)
+        self.label = sanitize(label)
+        self._profile: cProfile.Profile | None = None
+        self._start = 0.0
+
+    def start(self) -> bool:
+        """Start profiling, return False if another profile is already running."""
+        if not _ACTIVE_LOCK.acquire(blocking=False):  # pylint:disable=R1732
+            logging.warning(f"Profiler busy, not profiling {self.label}")
+            return False
+        self._profile = cProfile.Profile()
+        self._start = time.monotonic()
+        self._profile.enable()
+        return True
+
+    def stop(self) -> Path | None:
+        """Stop profiling & write out the stats file, return its path."""
+        if not self._profile:
+            return None
+        self._profile.disable()
+        elapsed_ms = int((time.monotonic() - self._start) * 1000)
+        _ACTIVE_LOCK.release()
+
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        fpath = self.outdir / (
+            f"{time.strftime('%Y%m%dT%H%M%S')}_{self.label}_{elapsed_ms}ms.prof"
+        )
+        self._profile.dump_stats(fpath)
+        self._profile = None
+        logging.warning(f"Wrote profile: {fpath}")
+        return fpath
@@ -42,6 +42,36 @@ class SnapshotInfo:
     admin_only: bool
 
 
+# background jobs' statuses
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+@typechecked
+@dc.dataclass(frozen=True)
+class JobInfo:
+    """A background job's state & progress (ex: an xlsx import).
+
+    Not a mongo schema. For REST calls.
+    """
+
+    job_id: str
+    kind: str
+    wbs_db: str
+    status: str
+    progress: dict[str, StrNum]  # ex: stage & rows parsed/validated/written
+    result: dict | None  # the response, once succeeded
+    code: int  # HTTP status code, if failed
+    error: str
+    created: float
+    updated: float
+
+    def is_done(self) -> bool:
+        """Return whether the job has finished (succeeded or failed)."""
+        return self.status != JOB_RUNNING
+
+
 EXPIRED = "expired"
 CHANGES = "changes"
 GOOD = "good"
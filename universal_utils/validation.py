@@ -0,0 +1,103 @@
+"""Validate records' dropdown-type values against the table config.
+
+Shared by the REST server (upserts & xlsx ingests) and the web app, so
+both accept exactly the same records. A `RecordValidator` is compiled
+once per table config -- set-based options and precomputed parent/child
+maps -- then used for every record.
+"""
+
+
+from typing import Collection, Mapping
+
+from . import types as uut
+
+SimpleMenus = Mapping[str, Collection[str]]
+ConditionalMenus = Mapping[str, tuple[str, Mapping[str, Collection[str]]]]
+
+
+class RecordValidator:
+    """Check records' simple- & conditional-dropdown values."""
+
+    def __init__(
+        self, simple_menus: SimpleMenus, conditional_menus: ConditionalMenus
+    ) -> None:
+        self._simple = {col: frozenset(opts) for col, opts in simple_menus.items()}
+        self._conditional = {
+            col: (parent, {pv: frozenset(opts) for pv, opts in menus.items()})
+            for col, (parent, menus) in conditional_menus.items()
+            if col not in self._simple  # simple-dropdown takes precedence
+        }
+        # options for any parent value (for orphans)
+        self._any_parent = {
+            col: frozenset().union(*menus.values())
+            for col, (_, menus) in self._conditional.items()
+        }
+        # dropdown columns with parents ahead of their children
+        self._order: list[str] = []
+        for col in list(self._simple) + list(self._conditional):
+            self._add_in_order(col)
+
+    def _add_in_order(self, col: str) -> None:
+        if col in self._order:
+            return
+        if col in self._conditional:
+            self._order.append(col)  # placeholder, guards against cycles
+            self._add_in_order(self._conditional[col][0])
+            self._order.remove(col)
+        self._order.append(col)
+
+    def _error(self, col: str, record: uut.DBRecord, orphans_ok: bool) -> str:
+        """Get what's wrong with the column's (non-blank) value, or ''."""
+        value = record[col]
+
+        if (options := self._simple.get(col)) is not None:
+            if value in options:
+                return ""
+            return "Invalid Simple-Dropdown Data"
+
+        if col in self._conditional:
+            parent_col, menus = self._conditional[col]
+            # parent column is missing (*NOT* '' value)
+            if parent_col not in record:
+                if orphans_ok and value in self._any_parent[col]:
+                    return ""
+                return "Invalid Conditional-Dropdown (Orphan) Data"
+            # validate with parent value
+            parent_value = record[parent_col]
+            if parent_value and value in menus.get(str(parent_value), ()):
+                return ""
+            return "Invalid Conditional-Dropdown Data"
+
+        return ""  # not a dropdown
+
+    def errors(self, record: uut.DBRecord) -> list[str]:
+        """Get a message for each invalid value; blanks are okay.
+
+        A missing conditional-parent column is okay if the value is
+        valid for any parent value.
+        """
+        return [
+            f"{error}: {col=} value={record[col]!r}"
+            for col in self._order
+            if record.get(col)  # blanks are okay
+            and (error := self._error(col, record, orphans_ok=True))
+        ]
+
+    def validate_table(self, table: list[uut.DBRecord]) -> dict[int, list[str]]:
+        """Get the errors for each invalid record, by index."""
+        return {
+            i: errs for i, record in enumerate(table) if (errs := self.errors(record))
+        }
+
+    def clean(self, record: uut.WebRecord, columns: list[str]) -> uut.WebRecord:
+        """Get a copy without the invalid values, with every column.
+
+        Removed & missing values become blanks, so a child whose parent
+        is blank/removed (orphan) is removed too.
+        """
+        out = {k: v for k, v in record.items() if v not in [None, ""]}
+        for col in self._order:  # parents are decided before their children
+            if col in out and self._error(col, out, orphans_ok=False):  # type: ignore[arg-type]
+                del out[col]
+        out.update({k: "" for k in columns if k not in out})
+        return out
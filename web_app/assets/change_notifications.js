@@ -0,0 +1,44 @@
+/*
+ * Listen for what changed in this page's WBS (web_app/utils/change_notifications.py),
+ * then poke the Dash stores that refresh only that -- the table if this page's
+ * institution (or everything) changed, the snapshot list if a snapshot was made.
+ */
+(function () {
+    const pathParts = () => window.location.pathname.split("/").map(decodeURIComponent);
+
+    const wbsL1 = pathParts()[1];
+    if (!wbsL1 || !window.EventSource) {
+        return;
+    }
+
+    function setData(id, version) {
+        try {
+            window.dash_clientside.set_props(id, {data: version});
+        } catch (err) {
+            console.warn(`Could not signal '${id}' (page not loaded yet?)`, err);
+        }
+    }
+
+    const source = new EventSource(`/changes/${encodeURIComponent(wbsL1)}`);
+
+    source.addEventListener("changes", (event) => {
+        const changes = JSON.parse(event.data);
+        const institution = pathParts()[2] || "";
+        if (
+            changes.everything
+            || changes.institutions.includes(institution)
+            || (!institution && changes.institutions.length)
+        ) {
+            setData("wbs-live-data-changed", changes.version);
+        }
+        if (changes.snapshots) {
+            setData("wbs-snapshots-changed", changes.version);
+        }
+    });
+
+    // the session expired -- log in again
+    source.addEventListener("expired", () => {
+        source.close();
+        window.location.assign("/login");
+    });
+})();
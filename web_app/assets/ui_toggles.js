@@ -0,0 +1,104 @@
+/*
+ * Clientside callbacks for the pure-UI toggles -- they only compute classNames
+ * & booleans from clicks, so they don't need a round trip to the server. What
+ * they need from the server is in the "wbs-ui-config" store (see setup_table()).
+ *
+ * Each one's Python twin (its oracle, same name) is in web_app/ -- keep them in
+ * sync, tests/unit/test_web_app.py compares them.
+ */
+(function () {
+    // du.Color & du.IconClassNames
+    const DARK = "dark";
+    const SECONDARY = "secondary";
+    const CHECK = "fa-solid fa-check";
+    const LAYER_GROUP = "fa-solid fa-layer-group";
+    const TABLE_COLUMNS = "fa-solid fa-table-columns";
+    const PLUS_MINUS = "fa-solid fa-plus-minus";
+
+    // du.ButtonIconLabelTooltipFactory.build_classname()
+    function buttonClassName(outline, color) {
+        const btnClass = outline ? `btn-outline-${color}` : `btn-${color}`;
+        return `button-icon-label caps btn ${btnClass} cursor-pointer`;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        ui: {
+            // layout.py
+            toggle_navbar_collapse: function (nClicks, isOpen) {
+                if (nClicks) {
+                    return [!isOpen, "", !isOpen];
+                }
+                return [isOpen, "navbar-uncollapsed", isOpen];
+            },
+
+            // contents/wbs_generic_callbacks.py
+            totals_button_style: function (nClicks, uiConfig) {
+                if ((nClicks || 0) % 2 === 1) {
+                    return [buttonClassName(false, DARK), "click to hide the totals", CHECK];
+                }
+                const tooltip = (uiConfig || {}).is_admin
+                    ? "click to show cascading FTE totals by institution, L2, and L3 -- along with a grand total"
+                    : "click to show cascading FTE totals by L2 and L3 -- along with a grand total";
+                return [buttonClassName(true, SECONDARY), tooltip, PLUS_MINUS];
+            },
+
+            show_snapshot_dropdown: function (nClicks, snapTs) {
+                if (snapTs) {  // show "View Live"
+                    return [true, true, false];
+                }
+                if (nClicks) {  // clicked -> show dropdown
+                    return [false, true, true];
+                }
+                return [true, false, true];  // show "View Snapshots"
+            },
+
+            toggle_pagination: function (nClicks, uiConfig) {
+                if (!uiConfig) {  // clicked before setup_table() filled it
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                if (nClicks % 2 === 0) {
+                    return [
+                        buttonClassName(false, DARK),
+                        "click to show all the rows without pages",
+                        CHECK,
+                        uiConfig.page_size,
+                        "native",
+                    ];
+                }
+                return [
+                    buttonClassName(true, SECONDARY),
+                    "click to show pages",
+                    LAYER_GROUP,
+                    9999999999,
+                    "none",
+                ];
+            },
+
+            toggle_hidden_columns: function (nClicks, uiConfig) {
+                if (!uiConfig) {  // clicked before setup_table() filled it
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                if (nClicks % 2 === 0) {
+                    return [
+                        buttonClassName(true, SECONDARY),
+                        "click to show additional columns, containing funding metrics and recent edit history for each entry",
+                        TABLE_COLUMNS,
+                        uiConfig.hidden_columns,
+                    ];
+                }
+                return [
+                    buttonClassName(false, DARK),
+                    "click to show the default columns",
+                    CHECK,
+                    uiConfig.always_hidden_columns,
+                ];
+            },
+
+            // fake it 'til you make it
+            interval_cloud_saved: function () {
+                const secs = [60, 120, 180, 240][Math.floor(Math.random() * 4)];
+                return new Promise((resolve) => setTimeout(() => resolve(secs * 1000), 1000));
+            },
+        },
+    });
+})();
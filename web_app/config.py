@@ -12,7 +12,7 @@ import werkzeug
 from flask_oidc import OpenIDConnect  # type: ignore[import]
 from wipac_dev_tools import from_environment_as_dataclass
 
-AUTO_RELOAD_MINS = 15  # how often to auto-reload the page
+AUTO_RELOAD_MINS = 15  # how often to check for an expired session (& reload)
 MAX_CACHE_MINS = 5  # how often to expire a cache result
 
 REDIRECT_WBS = "mo"  # which mou to go to by default when ambiguously redirecting
@@ -40,6 +40,17 @@ class EnvConfig:
     DEBUG: bool = False
     DEBUG_AS_PI: list[str] = dc.field(default_factory=list)
     LOG_REST_CALLS: bool = True
+    REST_FANOUT_MAX_WORKERS: int = 8  # per web-app process
+    REST_FANOUT_TIMEOUT: float = 60.0  # seconds, per gather() (the whole batch)
+    REST_COLUMNAR_TABLES: bool = True  # get big tables columnar-encoded (smaller)
+    PROFILE_DIR: str = ""  # empty means admins can't profile callbacks
+    # change notifications -- each page's stream holds a thread of its web-app process
+    CHANGES_WAIT_SECS: float = 25.0  # per long-poll (its REST timeout is longer)
+    CHANGES_STREAM_MINS: float = 10.0  # then the browser reconnects (re-checks login)
+    CHANGES_MAX_STREAMS: int = 16  # per process, more pages reconnect later
+    # run heavy admin callbacks in subprocesses (needs dash[diskcache])
+    BACKGROUND_CALLBACKS: bool = True
+    BACKGROUND_CACHE_DIR: str = ""  # shared by the processes (default: in /tmp)
 
     CI_TEST: bool = False
 
@@ -367,6 +367,26 @@ def to_pull_institution_values(
             return ""
         return "inactive: "
 
+    inst = du.get_inst(state.s_urlpath)
+
+    def pull_inst_vals() -> uut.InstitutionValues | None:
+        if not inst:
+            return None
+        try:
+            return src.pull_institution_values(
+                du.get_wbs_l1(state.s_urlpath),
+                state.s_snap_ts,
+                inst,
+            )
+        except DataSourceException:
+            return uut.InstitutionValues()
+
+    # these are independent, so make the requests concurrently
+    insts_infos, inst_vals = connections.gather(
+        connections.get_todays_institutions_infos,
+        pull_inst_vals,
+    )
+
     # institution dropdown
     if CurrentUser.is_admin():
         output.ddown_inst_opts = [  # always include the abbreviations for admins
@@ -375,7 +395,7 @@ def to_pull_institution_values(
                 "value": short_name,
                 # "disabled": not info.has_mou,
             }
-            for short_name, info in connections.get_todays_institutions_infos().items()
+            for short_name, info in insts_infos.items()
         ]
     else:
         output.ddown_inst_opts = [  # only include the user's institution(s)
@@ -384,26 +404,17 @@ def to_pull_institution_values(
                 "value": short_name,
                 # "disabled": not info.has_mou,
             }
-            for short_name, info in connections.get_todays_institutions_infos().items()
+            for short_name, info in insts_infos.items()
             if short_name in CurrentUser.get_institutions()
         ]
     output.ddown_inst_opts = sorted(output.ddown_inst_opts, key=lambda d: d["label"])
 
     # are we looking at an institution?
-    if inst := du.get_inst(state.s_urlpath):
+    if inst and inst_vals:
         output.h2_table = f"{inst}'s Statements of Work"
         output.h2_textarea = f"{inst}'s Miscellaneous Notes and Descriptions"
         output.h2_computing = f"{inst}'s Computing Contributions"
-        try:
-            output.update_institution_values(
-                src.pull_institution_values(
-                    du.get_wbs_l1(state.s_urlpath),
-                    state.s_snap_ts,
-                    inst,
-                )
-            )
-        except DataSourceException:
-            output.update_institution_values(uut.InstitutionValues())
+        output.update_institution_values(inst_vals)
     else:  # we're looking at the collaboration-view
         output.h2_table = "Collaboration-Wide Statements of Work"
         output.h2_textarea = ""
@@ -1,6 +1,8 @@
 """Admin-only callbacks for a specified WBS layout."""  # lgtm [py/syntax-error]
 
+import base64
 import dataclasses as dc
+import functools
 import logging
 from collections import OrderedDict as ODict
 from decimal import Decimal
@@ -8,7 +10,7 @@ from typing import Any, Final, cast
 
 import dash_bootstrap_components as dbc  # type: ignore[import]
 import universal_utils.types as uut
-from dash import dcc, no_update  # type: ignore[import]
+from dash import dcc, html, no_update  # type: ignore[import]
 from dash.dependencies import Input, Output, State  # type: ignore[import]
 
 from ..config import app
@@ -17,7 +19,7 @@ from ..data_source import data_source as src
 from ..data_source import table_config as tc
 from ..data_source.connections import CurrentUser, DataSourceException
 from ..utils import dash_utils as du
-from ..utils import types, utils
+from ..utils import background, types, utils
 
 _CHANGES_COL: Final[str] = "Changes"
 
@@ -81,14 +83,21 @@ def refresh_for_override_success(_: int) -> str:
         Output("wbs-toast-via-upload-div", "children"),
         Output("wbs-upload-success-modal", "is_open"),
         Output("wbs-upload-success-modal-body", "children"),
+        Output("wbs-upload-xlsx-job", "data"),
+        Output("wbs-upload-xlsx-job-interval", "disabled"),
     ],
     [
         Input("wbs-upload-xlsx-launch-modal-button", "n_clicks"),  # user-only
         Input("wbs-upload-xlsx", "contents"),  # user-only
         Input("wbs-upload-xlsx-cancel", "n_clicks"),  # user-only
         Input("wbs-upload-xlsx-override-table", "n_clicks"),  # user-only
+        Input("wbs-upload-xlsx-job-interval", "n_intervals"),
+    ],
+    [
+        State("url", "pathname"),
+        State("wbs-upload-xlsx", "filename"),
+        State("wbs-upload-xlsx-job", "data"),
     ],
-    [State("url", "pathname"), State("wbs-upload-xlsx", "filename")],
     prevent_initial_call=True,
 )
 def handle_xlsx(  # pylint: disable=R0911
@@ -97,24 +106,30 @@ def handle_xlsx(  # pylint: disable=R0911
     contents: str,
     __: int,
     ___: int,
+    ____: int,
     # state(s)
     s_urlpath: str,
     s_filename: str,
-) -> tuple[bool, str, str, bool, dbc.Toast, bool, list[dcc.Markdown]]:
-    """Manage uploading a new xlsx document as the new live table."""
+    s_job_id: str | None,
+) -> tuple[bool, str | list[Any], str, bool, dbc.Toast, bool, list[dcc.Markdown], str | None, bool]:
+    """Manage uploading a new xlsx document as the new live table.
+
+    The import runs as a job on the REST server, which is polled until
+    it's done (so, long imports don't time out).
+    """
     logging.warning(f"'{du.triggered()}' -> handle_xlsx()")
 
     if not CurrentUser.is_loggedin_with_permissions() or not CurrentUser.is_admin():
         logging.error("Cannot handle xlsx since user is not admin.")
-        return False, "", "", True, None, False, []
+        return False, "", "", True, None, False, [], None, True
 
     match du.triggered():
         # Launch xlsx
         case "wbs-upload-xlsx-launch-modal-button.n_clicks":
-            return True, "", "", True, None, False, []
+            return True, "", "", True, None, False, [], no_update, no_update
         # Cancel upload xlsx
         case "wbs-upload-xlsx-cancel.n_clicks":
-            return False, "", "", True, None, False, []
+            return False, "", "", True, None, False, [], no_update, no_update
         # Upload xlsx
         case "wbs-upload-xlsx.contents":
             if not s_filename.endswith(".xlsx"):
@@ -126,6 +141,8 @@ def handle_xlsx(  # pylint: disable=R0911
                     None,
                     False,
                     [],
+                    no_update,
+                    no_update,
                 )
             return (
                 True,
@@ -135,26 +152,53 @@ def handle_xlsx(  # pylint: disable=R0911
                 None,
                 False,
                 [],
+                no_update,
+                no_update,
             )
-        # Override xlsx
+        # Override xlsx -- start the job
         case "wbs-upload-xlsx-override-table.n_clicks":
-            base64_file = contents.split(",")[1]
+            # decode once, the bytes are sent to the REST server as-is
+            xlsx = base64.b64decode(contents.split(",")[1])
             try:
-                n_records, prev_snap_info, curr_snap_info = src.override_table(
-                    du.get_wbs_l1(s_urlpath), base64_file, s_filename
-                )
-                msg = _get_upload_success_modal_body(
-                    s_filename, n_records, prev_snap_info, curr_snap_info
-                )
-                return False, "", "", True, None, True, msg
+                job_id = src.override_table(du.get_wbs_l1(s_urlpath), xlsx, s_filename)
+            except DataSourceException as e:
+                error_message = f'Error overriding "{s_filename}" ({e})'
+                return True, error_message, du.Color.DANGER, True, None, False, [], None, True
+            message = f'Importing "{s_filename}"...'
+            return True, message, du.Color.INFO, True, None, False, [], job_id, False
+        # Override xlsx -- poll the job
+        case "wbs-upload-xlsx-job-interval.n_intervals":
+            if not s_job_id:
+                return tuple(no_update for _ in range(9))  # type: ignore[return-value]
+            try:
+                job = src.pull_job(s_job_id)
             except DataSourceException as e:
                 error_message = f'Error overriding "{s_filename}" ({e})'
-                return True, error_message, du.Color.DANGER, True, None, False, []
+                return True, error_message, du.Color.DANGER, True, None, False, [], None, True
+            if not job.is_done():
+                progress = ", ".join(
+                    f"{k.replace('_', ' ')}: {v}" for k, v in job.progress.items()
+                )
+                message = f'Importing "{s_filename}"... ({progress})'
+                return True, message, du.Color.INFO, True, None, False, [], no_update, no_update
+            if job.status == uut.JOB_FAILED:
+                # the first line is the reason, any others are its details (ex: bad rows)
+                reason, *details = job.error.splitlines()
+                failure_body = [
+                    f'Error overriding "{s_filename}" ({job.code} {reason})',
+                    html.Ul([html.Li(d) for d in details]) if details else "",
+                ]
+                return True, failure_body, du.Color.DANGER, True, None, False, [], None, True
+            n_records, prev_snap_info, curr_snap_info = src.get_override_table_result(job)
+            msg = _get_upload_success_modal_body(
+                s_filename, n_records, prev_snap_info, curr_snap_info
+            )
+            return False, "", "", True, None, True, msg, None, True
 
     raise Exception(f"Unaccounted for trigger {du.triggered()}")
 
 
-@app.callback(  # type: ignore[misc]
+@background.admin_callback(  # type: ignore[misc]
     [
         Output("wbs-summary-table", "data"),
         Output("wbs-summary-table", "columns"),
@@ -165,43 +209,63 @@ def handle_xlsx(  # pylint: disable=R0911
         State("url", "pathname"),
         State("wbs-current-snapshot-ts", "value"),
     ],
+    progress=[
+        Output("wbs-summary-progress", "value"),
+        Output("wbs-summary-progress", "max"),
+        Output("wbs-summary-progress", "label"),
+    ],
+    running=[
+        (Output("wbs-summary-table-recalculate", "disabled"), True, False),
+        (Output("wbs-summary-progress-div", "hidden"), False, True),
+    ],
+    cancel=[Input("wbs-summary-cancel", "n_clicks")],  # user-only
+    cache_args_to_ignore=[0, 1],  # the WBS is in the cache key anyway
     prevent_initial_call=True,
 )  # pylint: disable=R0914
 def summarize(
+    set_progress: background.SetProgress,
     # input(s)
     _: int,
     # state(s)
     s_urlpath: str,
     s_snap_ts: types.DashVal,
 ) -> tuple[uut.WebTable, list[dict[str, str]], list[dict[str, Any]]]:
-    """Manage uploading a new xlsx document as the new live table."""
+    """Summarize each institution's FTEs (& headcounts, etc.)."""
     logging.warning(f"'{du.triggered()}' -> summarize()")
 
     wbs_l1 = du.get_wbs_l1(s_urlpath)
     tconfig = tc.TableConfigParser(wbs_l1)
 
+    set_progress((0, 1, "Totaling FTEs"))
     try:
-        data_table = src.pull_data_table(wbs_l1, tconfig, snapshot_ts=s_snap_ts)
+        fte_totals, insts_infos = connections.gather(
+            lambda: src.pull_table_totals(wbs_l1, snapshot_ts=s_snap_ts),
+            connections.get_todays_institutions_infos,
+        )
     except DataSourceException:
         return [], [], []
 
-    insts_infos = connections.get_todays_institutions_infos()
+    inst_dcs = background.gather(
+        set_progress,
+        "Getting institutions' values",
+        [
+            functools.partial(src.pull_institution_values, wbs_l1, s_snap_ts, sn)
+            for sn in insts_infos
+        ],
+    )
 
     def _sum_it(_inst: str, _l2: str = "") -> float:
         return float(
             sum(
                 Decimal(str(r["FTE"]))  # avoid floating point loss
-                for r in data_table
-                if r
-                and r["FTE"]  # skip blanks (also 0s)
-                and r["Institution"] == _inst
+                for r in fte_totals  # already summed per institution, L2, ...
+                if r["Institution"] == _inst
                 and (not _l2 or r["WBS L2"] == _l2)
             )
         )
 
     summary_table: uut.WebTable = []
-    for short_name, inst_info in insts_infos.items():
-        inst_dc = src.pull_institution_values(wbs_l1, s_snap_ts, short_name)
+    for (short_name, inst_info), inst_dc in zip(insts_infos.items(), inst_dcs):
 
         row: dict[str, uut.StrNum] = {
             "Institution": inst_info.long_name,
@@ -396,7 +460,7 @@ def _blame_style_cell_conditional(column_names: list[str]) -> types.TSCCond:
     return style_cell_conditional
 
 
-@app.callback(  # type: ignore[misc]
+@background.admin_callback(  # type: ignore[misc]
     [
         Output("wbs-blame-table", "data"),
         Output("wbs-blame-table", "columns"),
@@ -407,17 +471,29 @@ def _blame_style_cell_conditional(column_names: list[str]) -> types.TSCCond:
         State("url", "pathname"),
         State("wbs-current-snapshot-ts", "value"),
     ],
+    progress=[
+        Output("wbs-blame-progress", "value"),
+        Output("wbs-blame-progress", "max"),
+        Output("wbs-blame-progress", "label"),
+    ],
+    running=[
+        (Output("wbs-blame-table-button", "disabled"), True, False),
+        (Output("wbs-blame-progress-div", "hidden"), False, True),
+    ],
+    cancel=[Input("wbs-blame-cancel", "n_clicks")],  # user-only
+    cache_args_to_ignore=[0, 1],  # the WBS is in the cache key anyway
     prevent_initial_call=True,
 )  # pylint: disable=R0914
 def blame(
+    set_progress: background.SetProgress,
     # input(s)
     _: int,
     # state(s)
     s_urlpath: str,
     s_snap_ts: types.DashVal,
 ) -> tuple[uut.WebTable, list[dict[str, str]], types.TSCCond]:
-    """Manage uploading a new xlsx document as the new live table."""
-    logging.warning(f"'{du.triggered()}' -> summarize()")
+    """Show each record's changes across the snapshots."""
+    logging.warning(f"'{du.triggered()}' -> blame()")
 
     assert not s_snap_ts
 
@@ -425,8 +501,13 @@ def blame(
     wbs_l1 = du.get_wbs_l1(s_urlpath)
     tconfig = tc.TableConfigParser(wbs_l1)
 
+    set_progress((0, 1, "Getting the table"))
     try:
-        data_table = src.pull_data_table(wbs_l1, tconfig, raw=True)
+        data_table, snap_infos = connections.gather(
+            lambda: src.pull_data_table(wbs_l1, tconfig, raw=True),
+            # only admins get here -- see `background.admin_callback()`
+            lambda: src.list_snapshots(wbs_l1, is_admin=True),
+        )
         data_table.sort(
             key=lambda r: r[tconfig.const.TIMESTAMP],
             reverse=True,
@@ -444,17 +525,23 @@ def blame(
     ]
 
     # populate blame table
-    snap_bundles: dict[str, _SnapshotBundle] = {
-        si.timestamp: _SnapshotBundle(
-            table=src.pull_data_table(
+    snap_tables = background.gather(
+        set_progress,
+        "Getting the snapshots",
+        [
+            functools.partial(
+                src.pull_data_table,
                 wbs_l1,
                 tconfig,
                 snapshot_ts=si.timestamp,
                 raw=True,
-            ),
-            info=si,
-        )
-        for si in src.list_snapshots(wbs_l1)
+            )
+            for si in snap_infos
+        ],
+    )
+    snap_bundles: dict[str, _SnapshotBundle] = {
+        si.timestamp: _SnapshotBundle(table=table, info=si)
+        for si, table in zip(snap_infos, snap_tables)
     }
     blame_table = [
         _blame_row(r, tconfig, column_names, snap_bundles) for r in data_table
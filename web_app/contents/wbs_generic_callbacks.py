@@ -3,15 +3,21 @@
 import dataclasses as dc
 import logging
 import random
-import time
 from typing import cast
 
 import dash_bootstrap_components as dbc  # type: ignore[import]
 import universal_utils.types as uut
 from dash import html, no_update  # type: ignore[import]
-from dash.dependencies import Input, Output, State  # type: ignore[import]
+from dash.dependencies import (  # type: ignore[import]
+    ClientsideFunction,
+    Input,
+    Output,
+    State,
+)
+from dash.exceptions import PreventUpdate  # type: ignore[import]
 
 from ..config import app
+from ..data_source import connections
 from ..data_source import data_source as src
 from ..data_source import table_config as tc
 from ..data_source.connections import CurrentUser, DataSourceException
@@ -22,51 +28,77 @@ from ..utils import types, utils
 # Table Callbacks
 
 
-def _totals_button_logic(
-    n_clicks: int, all_cols: int
-) -> tuple[bool, str, bool, str, str, int]:
-    """Figure out whether to include totals, and format the button.
+def _ui_config(s_urlpath: str, tconfig: tc.TableConfigParser) -> types.UIConfig:
+    """Get what the clientside callbacks need to know (see assets/ui_toggles.js)."""
+    hiddens = list(tconfig.get_hidden_columns())
+    if du.get_inst(s_urlpath) and not CurrentUser.is_admin():
+        hiddens.append(tconfig.const.INSTITUTION)
+    return {
+        "is_admin": CurrentUser.is_admin(),
+        "page_size": tconfig.get_page_size(),
+        "hidden_columns": hiddens,
+        "always_hidden_columns": tconfig.get_always_hidden_columns(),
+    }
+
+
+def _totals_button_logic(n_clicks: int, all_cols: int) -> tuple[bool, int]:
+    """Figure out whether to include totals.
 
     Returns:
         bool -- whether to include totals
-        str  -- button label
-        str  -- button color
-        bool -- button outline
         int  -- auto n_clicks for "wbs-show-all-columns-button"
     """
     on = n_clicks % 2 == 1  # pylint: disable=C0103
-    if not on:  # off -> don't trigger "show-all-columns"
-        tooltip = "click to show cascading FTE totals by L2 and L3 -- along with a grand total"
-        if CurrentUser.is_admin():
-            tooltip = "click to show cascading FTE totals by institution, L2, and L3 -- along with a grand total"
-        return (
-            False,
-            du.Color.SECONDARY,
-            True,
-            tooltip,
-            du.IconClassNames.PLUS_MINUS,
-            all_cols,
-        )
 
     # on and triggered -> trigger "show-all-columns"
-    if du.triggered() == "wbs-show-totals-button.n_clicks":
+    if on and du.triggered() == "wbs-show-totals-button.n_clicks":
+        return True, 1
+
+    # off, or already on -> don't trigger "show-all-columns"
+    return on, all_cols
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="totals_button_style"),
+    [
+        Output("wbs-show-totals-button", "className"),
+        Output("wbs-show-totals-button-tooltip", "children"),
+        Output("wbs-show-totals-button-i", "className"),
+    ],
+    [
+        Input("wbs-show-totals-button", "n_clicks"),  # user-only
+        Input("wbs-ui-config", "data"),  # setup_table()-only
+    ],
+)
+
+
+def totals_button_style(
+    n_clicks: int, ui_config: types.UIConfig
+) -> tuple[str, str, str]:
+    """Format the "Show Totals" button.
+
+    Runs clientside (see assets/ui_toggles.js), this is its oracle.
+    """
+    if (n_clicks or 0) % 2 == 1:
         return (
-            True,
-            du.Color.DARK,
-            False,
+            du.ButtonIconLabelTooltipFactory.build_classname(
+                False, color=du.Color.DARK
+            ),
             "click to hide the totals",
             du.IconClassNames.CHECK,
-            1,
         )
 
-    # on and not triggered, AKA already on -> don't trigger "show-all-columns"
+    tooltip = (
+        "click to show cascading FTE totals by L2 and L3 -- along with a grand total"
+    )
+    if (ui_config or {}).get("is_admin"):
+        tooltip = "click to show cascading FTE totals by institution, L2, and L3 -- along with a grand total"
     return (
-        True,
-        du.Color.DARK,
-        False,
-        "click to hide the totals",
-        du.IconClassNames.CHECK,
-        all_cols,
+        du.ButtonIconLabelTooltipFactory.build_classname(
+            True, color=du.Color.SECONDARY
+        ),
+        tooltip,
+        du.IconClassNames.PLUS_MINUS,
     )
 
 
@@ -156,10 +188,6 @@ def confirm_deletion(
         Output("wbs-data-table", "data"),
         Output("wbs-data-table", "page_current"),
         Output("wbs-toast-via-exterior-control-div", "children"),
-        # TOTALS
-        Output("wbs-show-totals-button", "className"),
-        Output("wbs-show-totals-button-tooltip", "children"),
-        Output("wbs-show-totals-button-i", "className"),
         # ALL COLUMNS
         Output("wbs-show-all-columns-button", "n_clicks"),
         #
@@ -173,11 +201,13 @@ def confirm_deletion(
         Input("wbs-show-totals-button", "n_clicks"),  # user-only
         Input("wbs-new-data-button", "n_clicks"),  # user-only
         Input("wbs-undo-last-delete-hidden-button", "n_clicks"),  # confirm_deletion()
+        Input("wbs-live-data-changed", "data"),  # change_notifications.js-only
     ],
     [
         State("url", "pathname"),
         State("wbs-current-snapshot-ts", "value"),
         State("wbs-data-table", "data"),
+        State("wbs-data-table", "page_current"),
         State("wbs-show-all-columns-button", "n_clicks"),
         State("wbs-last-deleted-record", "data"),
         State("wbs-table-update-flag-exterior-control", "data"),
@@ -189,10 +219,12 @@ def table_data_exterior_controls(
     tot_n_clicks: int,
     _: int,
     __: int,
+    ___: float,
     # state(s)
     s_urlpath: str,
     s_snap_ts: types.DashVal,
     s_table: uut.WebTable,
+    s_page: int,
     s_all_cols: int,
     s_deleted_record: uut.WebRecord,
     s_flag_extctrl: bool,
@@ -200,10 +232,6 @@ def table_data_exterior_controls(
     uut.WebTable,
     int,
     dbc.Toast,
-    # TOTALS
-    str,
-    str,
-    str,
     # All Columns
     int,
     #
@@ -214,9 +242,9 @@ def table_data_exterior_controls(
 ]:
     """Exterior control signaled that the table should be updated.
 
-    This is either a filter, "add new", refresh, or "show totals". Only
-    "add new" changes MOU DS data. The others simply change what's
-    visible to the user.
+    This is either a filter, "add new", refresh, "show totals", or
+    someone else's change. Only "add new" changes MOU DS data. The others
+    simply change what's visible to the user.
     """
     logging.warning(f"'{du.triggered()}' -> table_data_exterior_controls()")
     logging.warning(
@@ -226,20 +254,14 @@ def table_data_exterior_controls(
     assert columns
 
     table: uut.WebTable = []
+    page = 0
     toast: dbc.Toast = None
     wbs_l1 = du.get_wbs_l1(s_urlpath)
     inst = du.get_inst(s_urlpath)
     tconfig = tc.TableConfigParser(wbs_l1)
 
-    # Format "Show Totals" button
-    (
-        show_totals,
-        tot_color,
-        tot_outline,
-        tot_tooltip,
-        tot_icon,
-        all_cols,
-    ) = _totals_button_logic(tot_n_clicks, s_all_cols)
+    # "Show Totals" button (it's formatted clientside)
+    show_totals, all_cols = _totals_button_logic(tot_n_clicks, s_all_cols)
 
     match du.triggered():
         # Add New Data
@@ -277,6 +299,22 @@ def table_data_exterior_controls(
                     )
                 except DataSourceException:
                     table = []
+        # OR Re-Pull uut.WebTable Since the Live Data Changed
+        case "wbs-live-data-changed.data":
+            if s_snap_ts:  # snapshots don't change
+                return tuple(no_update for _ in range(7))  # type: ignore[return-value]
+            try:
+                table = src.pull_data_table(
+                    wbs_l1,
+                    tconfig,
+                    institution=inst,
+                    with_totals=show_totals,
+                )
+            except DataSourceException:
+                table = s_table
+            if table == s_table:  # ex: the user's own edit, which is already shown
+                return tuple(no_update for _ in range(7))  # type: ignore[return-value]
+            page = s_page
         # OR Just Pull uut.WebTable (optionally filtered)
         case _:
             try:
@@ -299,12 +337,8 @@ def table_data_exterior_controls(
 
     return (
         table,
-        0,
+        page,
         toast,
-        # TOTALS
-        du.ButtonIconLabelTooltipFactory.build_classname(tot_outline, color=tot_color),
-        tot_tooltip,
-        tot_icon,
         # All Columns
         all_cols,
         #
@@ -554,6 +588,7 @@ def load_table_tooltips(
         Output("wbs-data-table", "columns"),
         Output("wbs-data-table", "dropdown"),
         Output("wbs-data-table", "dropdown_conditional"),
+        Output("wbs-ui-config", "data"),
     ],
     [Input("wbs-data-table", "editable")],  # setup_user_dependent_components()-only
     [State("url", "pathname")],
@@ -569,6 +604,7 @@ def setup_table(
     types.TColumns,
     types.TDDown,
     types.TDDownCond,
+    types.UIConfig,
 ]:
     """Set up table-related components."""
     logging.warning(f"'{du.triggered()}' -> setup_table()  ({s_urlpath=})")
@@ -586,6 +622,7 @@ def setup_table(
         columns,
         simple_dropdowns,
         conditional_dropdowns,
+        _ui_config(s_urlpath, tconfig),
     )
 
 
@@ -593,7 +630,8 @@ def setup_table(
 # Snapshot Callbacks
 
 
-@app.callback(  # type: ignore[misc]
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="show_snapshot_dropdown"),
     [
         Output("wbs-snapshot-dropdown-div", "hidden"),
         Output("wbs-view-snapshots", "hidden"),
@@ -602,12 +640,19 @@ def setup_table(
     [Input("wbs-view-snapshots", "n_clicks")],  # user
     [State("wbs-current-snapshot-ts", "value")],
 )
-def show_snapshot_dropdown(_: int, s_snap_ts: types.DashVal) -> tuple[bool, bool, bool]:
-    """Unhide the snapshot dropdown."""
+
+
+def show_snapshot_dropdown(
+    n_clicks: int, s_snap_ts: types.DashVal
+) -> tuple[bool, bool, bool]:
+    """Unhide the snapshot dropdown.
+
+    Runs clientside (see assets/ui_toggles.js), this is its oracle.
+    """
     if s_snap_ts:  # show "View Live"
         return True, True, False
 
-    if du.triggered() == "wbs-view-snapshots.n_clicks":  # show dropdown
+    if n_clicks:  # clicked -> show dropdown
         return False, True, True
 
     return True, False, True  # show "View Snapshots"
@@ -641,11 +686,15 @@ def pick_snapshot(snap_ts: types.DashVal) -> str:
         Output("wbs-snapshot-current-labels", "children"),
         Output("wbs-viewing-snapshot-alert", "is_open"),
     ],
-    [Input("dummy-input-for-setup", "hidden")],  # never triggered
+    [
+        Input("dummy-input-for-setup", "hidden"),  # never triggered
+        Input("wbs-snapshots-changed", "data"),  # change_notifications.js-only
+    ],
     [State("url", "pathname"), State("wbs-current-snapshot-ts", "value")],
 )
 def setup_snapshot_components(
     _: bool,
+    __: float,
     # state(s)
     s_urlpath: str,
     s_snap_ts: types.DashVal,
@@ -663,13 +712,20 @@ def setup_snapshot_components(
 
     snap_options: list[dict[str, str]] = []
     label_lines: list[html.Label] = []
-    snapshots: list[uut.SnapshotInfo] = []
+
+    def pull_snapshots() -> list[uut.SnapshotInfo]:
+        try:
+            return src.list_snapshots(du.get_wbs_l1(s_urlpath))
+        except DataSourceException:
+            return []
+
+    # these are independent, so make the requests concurrently
+    snapshots, is_admin = connections.gather(
+        pull_snapshots,
+        CurrentUser.is_admin,
+    )
 
     # Populate list of Snapshots
-    try:
-        snapshots = src.list_snapshots(du.get_wbs_l1(s_urlpath))
-    except DataSourceException:
-        pass
     snap_options = [
         {
             "label": f"{si.name} ({utils.get_human_time(si.timestamp, short=True)})",
@@ -691,7 +747,7 @@ def setup_snapshot_components(
             html.Label(f"{snap_info.name}"),
             html.Label(
                 f"created by {snap_info.creator} — {human_time}"
-                if CurrentUser.is_admin()  # only show creator for admins
+                if is_admin  # only show creator for admins
                 else human_time,
                 style={"font-size": "75%", "font-style": "italic"},
             ),
@@ -885,7 +941,8 @@ def _setup_user_dependent_components_dc(
     return output
 
 
-@app.callback(  # type: ignore[misc]
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_pagination"),
     [
         # All Rows
         Output("wbs-show-all-rows-button", "className"),
@@ -899,13 +956,15 @@ def _setup_user_dependent_components_dc(
         # user/table_data_exterior_controls
         Input("wbs-show-all-rows-button", "n_clicks")
     ],
-    [State("url", "pathname")],
+    [State("wbs-ui-config", "data")],
     prevent_initial_call=True,
 )
+
+
 def toggle_pagination(
     n_clicks: int,
     # state(s)
-    s_urlpath: str,
+    s_ui_config: types.UIConfig,
 ) -> tuple[
     # All Rows
     str,
@@ -915,11 +974,13 @@ def toggle_pagination(
     int,
     str,
 ]:
-    """Toggle whether the table is paginated."""
-    logging.warning(f"'{du.triggered()}' -> toggle_pagination({n_clicks=})")
+    """Toggle whether the table is paginated.
 
+    Runs clientside (see assets/ui_toggles.js), this is its oracle.
+    """
+    if not s_ui_config:  # clicked before setup_table() filled it
+        raise PreventUpdate
     if n_clicks % 2 == 0:
-        tconfig = tc.TableConfigParser(du.get_wbs_l1(s_urlpath))
         return (
             du.ButtonIconLabelTooltipFactory.build_classname(
                 False, color=du.Color.DARK
@@ -927,7 +988,7 @@ def toggle_pagination(
             "click to show all the rows without pages",
             du.IconClassNames.CHECK,
             #
-            tconfig.get_page_size(),
+            cast(int, s_ui_config["page_size"]),
             "native",
         )
     # https://community.plotly.com/t/rendering-all-rows-without-pages-in-datatable/15605/2
@@ -943,7 +1004,8 @@ def toggle_pagination(
     )
 
 
-@app.callback(  # type: ignore[misc]
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_hidden_columns"),
     [
         # All Columns
         Output("wbs-show-all-columns-button", "className"),
@@ -952,13 +1014,15 @@ def toggle_pagination(
         Output("wbs-data-table", "hidden_columns"),
     ],
     [Input("wbs-show-all-columns-button", "n_clicks")],  # user/table_data_exterior_c...
-    [State("url", "pathname")],
+    [State("wbs-ui-config", "data")],
     prevent_initial_call=True,
 )
+
+
 def toggle_hidden_columns(
     n_clicks: int,
     # state(s)
-    s_urlpath: str,
+    s_ui_config: types.UIConfig,
 ) -> tuple[
     # All Columns
     str,
@@ -967,15 +1031,13 @@ def toggle_hidden_columns(
     #
     list[str],
 ]:
-    """Toggle hiding/showing the default hidden columns."""
-    logging.warning(f"'{du.triggered()}' -> toggle_hidden_columns()")
-
-    tconfig = tc.TableConfigParser(du.get_wbs_l1(s_urlpath))
+    """Toggle hiding/showing the default hidden columns.
 
+    Runs clientside (see assets/ui_toggles.js), this is its oracle.
+    """
+    if not s_ui_config:  # clicked before setup_table() filled it
+        raise PreventUpdate
     if n_clicks % 2 == 0:
-        hiddens = tconfig.get_hidden_columns()
-        if du.get_inst(s_urlpath) and not CurrentUser.is_admin():
-            hiddens.append(tconfig.const.INSTITUTION)
         return (
             du.ButtonIconLabelTooltipFactory.build_classname(
                 True, color=du.Color.SECONDARY
@@ -983,26 +1045,29 @@ def toggle_hidden_columns(
             "click to show additional columns, containing funding metrics and recent edit history for each entry",
             du.IconClassNames.TABLE_COLUMNS,
             #
-            hiddens,
+            cast(list[str], s_ui_config["hidden_columns"]),
         )
 
-    always_hidden_columns = tconfig.get_always_hidden_columns()
     return (
         du.ButtonIconLabelTooltipFactory.build_classname(False, color=du.Color.DARK),
         "click to show the default columns",
         du.IconClassNames.CHECK,
         # All Columns
-        always_hidden_columns,
+        cast(list[str], s_ui_config["always_hidden_columns"]),
     )
 
 
-@app.callback(  # type: ignore[misc]
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="interval_cloud_saved"),
     Output("wbs-cloud-saved-interval", "interval"),
     Input("wbs-cloud-saved-interval", "n_intervals"),  # auto-triggered
     # prevent_initial_call=True,
 )
+
+
 def interval_cloud_saved(_: int) -> int:
-    """Automatically "reload" cloud-saved "button" on interval."""
-    # logging.debug(f"'{du.triggered()}' -> interval_cloud_saved()")
-    time.sleep(1)
+    """Automatically "reload" cloud-saved "button" on interval.
+
+    Runs clientside (see assets/ui_toggles.js), this is its oracle.
+    """
     return random.choice([60, 120, 180, 240]) * 1000  # fake it 'til you make it
@@ -5,9 +5,43 @@ import dash_bootstrap_components as dbc  # type: ignore[import]
 from dash import dash_table, dcc, html  # type: ignore[import]
 
 from ..config import ENV
+from ..utils import background
 from ..utils import dash_utils as du
 
 
+def _admin_job(id_prefix: str, children: list[html.Div]) -> html.Div | dcc.Loading:
+    """Wrap an admin job's components, with its progress if it runs in the background.
+
+    A foreground job only gets the full-screen spinner.
+    """
+    if not background.MANAGER:
+        return du.fullscreen_loading(children=children)
+
+    progress = html.Div(
+        id=f"{id_prefix}-progress-div",
+        hidden=True,
+        className="admin-table-button admin-zone-content",
+        children=[
+            dbc.Progress(
+                id=f"{id_prefix}-progress",
+                striped=True,
+                animated=True,
+                style={"height": "1.5rem", "margin-top": "0.5rem"},
+            ),
+            dbc.Button(
+                id=f"{id_prefix}-cancel",
+                n_clicks=0,
+                outline=True,
+                size="sm",
+                color=du.Color.SECONDARY,
+                children="Cancel",
+                style={"margin-top": "0.5rem"},
+            ),
+        ],
+    )
+    return html.Div(children=[children[0], progress] + children[1:])
+
+
 def layout() -> html.Div:
     """Construct the HTML."""
     return html.Div(
@@ -474,8 +508,9 @@ def layout() -> html.Div:
                     ),
                     #
                     # Summary Table
-                    du.fullscreen_loading(
-                        children=[
+                    _admin_job(
+                        "wbs-summary",
+                        [
                             html.Div(
                                 className="admin-table-button admin-zone-content",
                                 children=[
@@ -492,7 +527,7 @@ def layout() -> html.Div:
                                 className="admin-table admin-zone-content",
                                 children=du.simple_table("wbs-summary-table"),
                             ),
-                        ]
+                        ],
                     ),
                 ],
             ),
@@ -508,8 +543,9 @@ def layout() -> html.Div:
                     html.H2(className="section-header", children="Admin Zone"),
                     #
                     # Blame Table
-                    du.fullscreen_loading(
-                        children=[
+                    _admin_job(
+                        "wbs-blame",
+                        [
                             html.Div(
                                 className="admin-table-button admin-zone-content",
                                 children=[
@@ -601,12 +637,24 @@ def layout() -> html.Div:
                 storage_type="memory",
                 data=False,
             ),
+            # - set by assets/change_notifications.js (to the change's version)
+            dcc.Store(id="wbs-live-data-changed", storage_type="memory"),
+            dcc.Store(id="wbs-snapshots-changed", storage_type="memory"),
+            # - set by setup_table(), for the clientside callbacks
+            dcc.Store(id="wbs-ui-config", storage_type="memory"),
+            # - the running xlsx import's job id
+            dcc.Store(id="wbs-upload-xlsx-job", storage_type="memory"),
             #
             # Intervals
             dcc.Interval(
                 id="wbs-interval-trigger-confirmation-refreshes",
                 interval=10 * 1000 if ENV.DEBUG else 30 * 1000,
             ),
+            dcc.Interval(  # polls the xlsx import's job, while there is one
+                id="wbs-upload-xlsx-job-interval",
+                interval=1000,
+                disabled=True,
+            ),
             #
             # Container Divs -- for adding dynamic toasts, dialogs, etc.
             html.Div(id="wbs-toast-via-exterior-control-div"),
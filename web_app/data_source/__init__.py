@@ -1,3 +1,3 @@
 """Init."""
 
-from . import connections, data_source, table_config  # noqa: F401
+from . import connections, data_source, request_cache, table_config  # noqa: F401
@@ -1,22 +1,28 @@
 """Utilities for MoU REST interfaces."""
 
 
-import copy
+import concurrent.futures
+import contextvars
 import json
 import logging
+import os
 import re
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Final, cast
+from typing import Any, Callable, Final, TypeVar, cast, overload
 
 import cachetools.func
 import flask
 import requests
 import universal_utils.types as uut
+from universal_utils import columnar
 
 # local imports
 from rest_tools.client import ClientCredentialsAuth, RestClient
 
 from ..config import ENV, MAX_CACHE_MINS, oidc
+from .request_cache import request_cached
 
 
 class DataSourceException(Exception):
@@ -41,29 +47,42 @@ def _rest_connection() -> RestClient:
     return rc
 
 
-def _get_log_body(method: str, url: str, body: Any) -> str:
-    log_body = body
+G_REQUEST_TIMES: Final[str] = "mou_request_times"  # `flask.g` attribute
 
-    if method == "POST" and url.startswith("/table/data/"):
-        log_body = copy.deepcopy(body)
-        length: Final[int] = 10
-        b64 = log_body["base64_file"]
-        omitted = len(b64) - length
-        log_body["base64_file"] = f"{b64[:length]}... ({omitted} chars omitted)"
 
-    return str(log_body)
+def mou_request(
+    method: str,
+    url: str,
+    body: Any = None,
+    columnar_tables: bool = False,
+    timeout: float = 0.0,
+) -> dict[str, Any]:
+    """Make a request to the MoU REST server.
 
-
-def mou_request(method: str, url: str, body: Any = None) -> dict[str, Any]:
-    """Make a request to the MoU REST server."""
-    log_body = _get_log_body(method, url, body)
+    If `columnar_tables`, ask for the response's tables columnar-encoded
+    (see `universal_utils.columnar`), which are decoded here. A `timeout`
+    longer than the client's is used instead (ex: for a long-poll).
+    """
+    log_body = str(body)
     logging.info(f"REQUEST :: {method} @ {url}, body: {log_body}")
 
+    start = time.monotonic()
     try:
-        response: dict[str, Any] = _rest_connection().request_seq(method, url, body)
-    except requests.exceptions.HTTPError as e:
+        rc = _rest_connection()
+        if timeout:
+            rc.timeout = max(rc.timeout, timeout)
+        if columnar_tables and ENV.REST_COLUMNAR_TABLES:
+            response: dict[str, Any] = columnar.decode_tables(
+                rc.request_seq(method, url, body, {"Accept": columnar.MEDIA_TYPE})
+            )
+        else:
+            response = rc.request_seq(method, url, body)
+    except requests.exceptions.RequestException as e:  # also timeouts, etc.
         logging.exception(f"EXCEPTED: {e}")
         raise DataSourceException(str(e))
+    finally:
+        if flask.has_app_context():  # for per-callback instrumentation
+            flask.g.setdefault(G_REQUEST_TIMES, []).append(time.monotonic() - start)
 
     def log_it(key: str, val: Any) -> Any:
         if key == "table":
@@ -81,6 +100,152 @@ def mou_request(method: str, url: str, body: Any = None) -> dict[str, Any]:
     return response
 
 
+def mou_upload(
+    url: str, data: bytes, content_type: str, args: dict[str, Any]
+) -> dict[str, Any]:
+    """POST raw bytes (ex: a file) to the MoU REST server, with the args in the query.
+
+    The bytes are sent as-is -- not JSON-encoded, nor base64-encoded.
+    """
+    logging.info(f"REQUEST :: POST @ {url}, args: {args}, data: {len(data)} bytes")
+
+    start = time.monotonic()
+    try:
+        rc = _rest_connection()
+        headers = {"Content-Type": content_type}
+        # a new client, so (if any) a new token
+        if token := rc.token_func() if rc.token_func else rc.access_token:
+            if isinstance(token, bytes):
+                token = token.decode()
+            headers["Authorization"] = f"Bearer {token}"
+        with rc.open(sync=True) as session:  # w/ the client's retries
+            resp = session.post(
+                f"{rc.address.rstrip('/')}/{url.lstrip('/')}",
+                params=args,
+                data=data,
+                headers=headers,
+                timeout=rc.timeout,
+            )
+        resp.raise_for_status()
+        response: dict[str, Any] = resp.json()
+    except requests.exceptions.RequestException as e:  # also timeouts, etc.
+        logging.exception(f"EXCEPTED: {e}")
+        raise DataSourceException(str(e))
+    finally:
+        if flask.has_app_context():  # for per-callback instrumentation
+            flask.g.setdefault(G_REQUEST_TIMES, []).append(time.monotonic() - start)
+
+    logging.info(f"RESPONSE (POST @ {url}) :: {response.keys()}")
+    return response
+
+
+#
+# Concurrent (fan-out) requests
+#
+
+
+T = TypeVar("T")
+T1 = TypeVar("T1")
+T2 = TypeVar("T2")
+T3 = TypeVar("T3")
+T4 = TypeVar("T4")
+
+_FANOUT_THREAD_PREFIX: Final[str] = "mou-fanout"
+
+
+def _new_fanout_pool() -> concurrent.futures.ThreadPoolExecutor:
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=ENV.REST_FANOUT_MAX_WORKERS,
+        thread_name_prefix=_FANOUT_THREAD_PREFIX,
+    )
+
+
+_FANOUT_POOL = _new_fanout_pool()
+
+
+def _reset_fanout_pool() -> None:
+    # a forked process (ex: a background callback's) has none of the threads
+    global _FANOUT_POOL  # pylint:disable=global-statement
+    _FANOUT_POOL = _new_fanout_pool()
+
+
+os.register_at_fork(after_in_child=_reset_fanout_pool)
+
+
+@overload
+def gather(
+    c1: Callable[[], T1], c2: Callable[[], T2], /, *, timeout: float | None = None
+) -> tuple[T1, T2]:
+    ...
+
+
+@overload
+def gather(
+    c1: Callable[[], T1],
+    c2: Callable[[], T2],
+    c3: Callable[[], T3],
+    /,
+    *,
+    timeout: float | None = None,
+) -> tuple[T1, T2, T3]:
+    ...
+
+
+@overload
+def gather(
+    c1: Callable[[], T1],
+    c2: Callable[[], T2],
+    c3: Callable[[], T3],
+    c4: Callable[[], T4],
+    /,
+    *,
+    timeout: float | None = None,
+) -> tuple[T1, T2, T3, T4]:
+    ...
+
+
+@overload
+def gather(*calls: Callable[[], T], timeout: float | None = None) -> tuple[T, ...]:
+    ...
+
+
+def gather(*calls: Callable[[], Any], timeout: float | None = None) -> tuple[Any, ...]:
+    """Run independent blocking calls concurrently, return their results in order.
+
+    Each call runs on this process's bounded thread pool inside a copy of
+    the caller's context, so the current Flask request (and `CurrentUser`)
+    is still available. So, the total latency approaches that of the
+    slowest call, instead of the sum of all of them.
+
+    A call that raises re-raises here (the first one, by argument order).
+    A call that does not finish within `timeout` seconds (default:
+    `ENV.REST_FANOUT_TIMEOUT`) raises `DataSourceException`.
+    """
+    if timeout is None:
+        timeout = ENV.REST_FANOUT_TIMEOUT
+
+    # nested fan-out would starve the pool, so just run sequentially
+    if threading.current_thread().name.startswith(_FANOUT_THREAD_PREFIX):
+        return tuple(c() for c in calls)
+
+    futures = [_FANOUT_POOL.submit(contextvars.copy_context().run, c) for c in calls]
+    deadline = time.monotonic() + timeout
+    try:
+        results = []
+        for future in futures:
+            try:
+                results.append(
+                    future.result(timeout=max(0.0, deadline - time.monotonic()))
+                )
+            except concurrent.futures.TimeoutError:
+                logging.error(f"Fan-out call timed out ({timeout=})")
+                raise DataSourceException(f"request timed out after {timeout}s")
+        return tuple(results)
+    finally:
+        for future in futures:  # no-op for those already running/done
+            future.cancel()
+
+
 #
 # Static Institution Info Functions
 #
@@ -126,6 +291,7 @@ class CurrentUser:
         return UserInfo(**resp)
 
     @staticmethod
+    @request_cached()
     def _get_info() -> UserInfo:
         """Query OIDC."""
         if ENV.CI_TEST:
@@ -172,6 +338,7 @@ class CurrentUser:
         return False
 
     @staticmethod
+    @request_cached()
     def is_admin() -> bool:
         """Is the user an admin?"""
         try:
@@ -185,6 +352,7 @@ class CurrentUser:
         return CurrentUser._get_info().preferred_username
 
     @staticmethod
+    @request_cached()
     def get_institutions() -> list[str]:
         """Get the user's editable institutions."""
 
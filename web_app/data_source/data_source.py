@@ -10,10 +10,15 @@ import universal_utils.types as uut
 from ..data_source.connections import CurrentUser
 from ..utils import types, utils
 from . import table_config as tc
-from .connections import mou_request
+from .connections import mou_request, mou_upload
 
 # constants
 _OC_SUFFIX: Final[str] = "_original"
+XLSX_MEDIA_TYPE: Final[
+    str
+] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# a long-poll's client timeout is its wait plus this
+CHANGES_TIMEOUT_MARGIN_SECS: Final[float] = 10.0
 
 
 # --------------------------------------------------------------------------------------
@@ -84,77 +89,11 @@ def _convert_table_rest_to_dash(
     return table
 
 
-def _is_valid_simple_dropdown(
-    parser: tc.TableConfigParser, record: uut.WebRecord, field: str
-) -> bool:
-    if not parser.is_simple_dropdown(field):
-        raise Exception(f"not simple dropdown: {field} ({record})")
-
-    if record[field] not in parser.get_simple_column_dropdown_menu(field):
-        return False
-
-    return True
-
-
-def _is_valid_conditional_dropdown(
-    parser: tc.TableConfigParser, record: uut.WebRecord, field: str
-) -> bool:
-    if not parser.is_conditional_dropdown(field):
-        raise Exception(f"not conditional dropdown: {field} ({record})")
-
-    try:
-        parent_value = cast(str, record[parser.get_conditional_column_parent(field)])
-
-        if record[field] not in parser.get_conditional_column_dropdown_menu(
-            field, parent_value
-        ):
-            return False
-    except KeyError:
-        pass
-
-    return True
-
-
 def _remove_invalid_data(
     record: uut.WebRecord, tconfig: tc.TableConfigParser
 ) -> uut.WebRecord:
     """Remove items whose data aren't valid."""
-
-    def _remove_orphans(_record: uut.WebRecord) -> uut.WebRecord:
-        """Remove orphaned child fields."""
-        return {
-            k: v
-            for k, v in record.items()
-            if not tconfig.is_conditional_dropdown(k)
-            or tconfig.get_conditional_column_parent(k) in record
-        }
-
-    # remove blank fields
-    record = {k: v for k, v in record.items() if v not in [None, ""]}
-    record = _remove_orphans(record)
-
-    # check that simple-dropdown selections are valid
-    record = {
-        k: v
-        for k, v in record.items()
-        if not tconfig.is_simple_dropdown(k)
-        or _is_valid_simple_dropdown(tconfig, record, k)
-    }
-    record = _remove_orphans(record)
-
-    # check that conditional-dropdown selections are valid
-    record = {
-        k: v
-        for k, v in record.items()
-        if not tconfig.is_conditional_dropdown(k)
-        or _is_valid_conditional_dropdown(tconfig, record, k)
-    }
-    record = _remove_orphans(record)
-
-    # add (back) missing fields as blanks
-    record.update({k: "" for k in tconfig.get_table_columns() if k not in record})
-
-    return record
+    return tconfig.get_record_validator().clean(record, tconfig.get_table_columns())
 
 
 def _convert_record_dash_to_rest(
@@ -284,7 +223,7 @@ def pull_data_table(  # pylint: disable=R0913
 
     response = cast(
         _RespTableData,
-        mou_request("GET", f"/table/data/{wbs_l1}", body=body),
+        mou_request("GET", f"/table/data/{wbs_l1}", body=body, columnar_tables=True),
     )
     # get & convert
     if raw:
@@ -292,6 +231,26 @@ def pull_data_table(  # pylint: disable=R0913
     return _convert_table_rest_to_dash(response["table"], tconfig)
 
 
+def pull_table_totals(
+    wbs_l1: str,
+    snapshot_ts: types.DashVal = uuc.LIVE_COLLECTION,
+    institution: types.DashVal = "",
+) -> uut.WebTable:
+    """Get the table's FTEs, summed per institution, L2, L3 & source of funds.
+
+    Each row has those columns and "FTE" -- much smaller than the table.
+    """
+    _validate(wbs_l1, str, falsy_okay=False)
+    institution = _validate(institution, types.DashVal_types, out=str)
+    if not snapshot_ts:
+        snapshot_ts = uuc.LIVE_COLLECTION
+    snapshot_ts = _validate(snapshot_ts, types.DashVal_types, out=str, falsy_okay=False)
+
+    body = {"snapshot": snapshot_ts, "institution": institution}
+    response = mou_request("GET", f"/table/totals/{wbs_l1}", body=body)
+    return cast(uut.WebTable, response["totals"])
+
+
 def push_record(  # pylint: disable=R0913
     wbs_l1: str,
     record: uut.WebRecord,
@@ -353,17 +312,20 @@ def delete_record(wbs_l1: str, record_id: str) -> None:
 # Snapshot Functions
 
 
-def list_snapshots(wbs_l1: str) -> list[uut.SnapshotInfo]:
-    """Get the list of snapshots."""
+def list_snapshots(wbs_l1: str, is_admin: bool | None = None) -> list[uut.SnapshotInfo]:
+    """Get the list of snapshots.
+
+    `is_admin` defaults to the current user's -- pass it where there's no
+    request (ex: a background callback).
+    """
     _validate(wbs_l1, str, falsy_okay=False)
 
     class _RespSnapshots(TypedDict):
         snapshots: list[dict]  # to be list[uut.SnapshotInfo]
 
-    body = {
-        "is_admin": CurrentUser.is_loggedin_with_permissions()
-        and CurrentUser.is_admin()
-    }
+    if is_admin is None:
+        is_admin = CurrentUser.is_loggedin_with_permissions() and CurrentUser.is_admin()
+    body = {"is_admin": is_admin}
     response = cast(
         _RespSnapshots, mou_request("GET", f"/snapshots/list/{wbs_l1}", body)
     )
@@ -392,39 +354,51 @@ def create_snapshot(wbs_l1: str, name: str) -> uut.SnapshotInfo:
 # Table-Override Functions
 
 
-def override_table(
-    wbs_l1: str, base64_file: str, filename: str
-) -> tuple[int, uut.SnapshotInfo | None, uut.SnapshotInfo]:
-    """Ingest .xlsx file as the new live collection.
+def override_table(wbs_l1: str, xlsx: bytes, filename: str) -> str:
+    """Start ingesting .xlsx file as the new live collection, as a job.
+
+    The file is uploaded as raw bytes (streamed to disk by the REST
+    server), instead of base64-encoded in a JSON body. Poll the job with
+    `pull_job()`, then get its outcome with `get_override_table_result()`.
 
     Arguments:
-        base64_file {str} -- xlsx file contents base64-encoded
+        xlsx {bytes} -- xlsx file contents
         filename {str} -- the name of the file
 
+    Returns:
+        str -- the job's id
+    """
+    _validate(wbs_l1, str, falsy_okay=False)
+    _validate(xlsx, bytes)
+    _validate(filename, str)
+
+    args = {
+        "filename": filename,
+        "creator": CurrentUser.get_username(),
+        "is_admin": CurrentUser.is_admin(),
+        "as_job": True,
+    }
+    response = mou_upload(f"/table/xlsx/{wbs_l1}", xlsx, XLSX_MEDIA_TYPE, args)
+    return cast(str, response["job_id"])
+
+
+def get_override_table_result(
+    job: uut.JobInfo,
+) -> tuple[int, uut.SnapshotInfo | None, uut.SnapshotInfo]:
+    """Get the outcome of a (succeeded) `override_table()` job.
+
     Returns:
         int -- number of records added in the table
         str -- snapshot name of the previous live table ('' if no prior table)
         str -- snapshot name of the current live table
     """
-    _validate(wbs_l1, str, falsy_okay=False)
-    _validate(base64_file, str)
-    _validate(filename, str)
 
     class _RespTableData(TypedDict):
         n_records: int
         previous_snapshot: dict | None  # to be uut.SnapshotInfo
         current_snapshot: dict  # to be uut.SnapshotInfo
 
-    body = {
-        "base64_file": base64_file,
-        "filename": filename,
-        "creator": CurrentUser.get_username(),
-        "is_admin": CurrentUser.is_admin(),
-    }
-    response = cast(
-        _RespTableData,
-        mou_request("POST", f"/table/data/{wbs_l1}", body=body),
-    )
+    response = cast(_RespTableData, job.result)
     return (
         response["n_records"],
         None
@@ -434,6 +408,18 @@ def override_table(
     )
 
 
+# --------------------------------------------------------------------------------------
+# Job Functions
+
+
+def pull_job(job_id: str) -> uut.JobInfo:
+    """Get the background job's state & progress."""
+    _validate(job_id, str, falsy_okay=False)
+
+    response = mou_request("GET", f"/jobs/{job_id}")
+    return dacite.from_dict(uut.JobInfo, response)
+
+
 # --------------------------------------------------------------------------------------
 # Institution-Value Functions
 
@@ -517,3 +503,23 @@ def get_touchstone(wbs_l1: str) -> int:
         "GET", f"/institution/values/confirmation/touchstone/{wbs_l1}"
     )
     return response["touchstone_timestamp"]  # type: ignore[no-any-return]
+
+
+# --------------------------------------------------------------------------------------
+# Change-Notification Functions
+
+
+def pull_changes(wbs_l1: str, since: float = 0.0, wait: float = 0.0) -> dict[str, Any]:
+    """Get what changed after `since` (a version), waiting up to `wait` secs.
+
+    Without `since`, only get the current version (to start from).
+    """
+    _validate(wbs_l1, str, falsy_okay=False)
+
+    body = {"since": since, "wait": wait}
+    return mou_request(
+        "GET",
+        f"/changes/{wbs_l1}",
+        body=body,
+        timeout=wait + CHANGES_TIMEOUT_MARGIN_SECS if wait else 0.0,
+    )
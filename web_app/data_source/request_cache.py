@@ -0,0 +1,67 @@
+"""Memoize values for the lifetime of a single request (Dash callback).
+
+Values are stored on `flask.g`, so they are dropped when the request's
+app context is torn down. Outside of an app context (scripts, unit tests)
+nothing is memoized.
+"""
+
+
+import collections
+import functools
+import threading
+from typing import Any, Callable, Final, TypeVar, cast
+
+import cachetools.keys
+import flask
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_G_ATTR: Final[str] = "_mou_request_cache"
+
+_stats_lock = threading.Lock()
+_hits: collections.Counter[str] = collections.Counter()
+_misses: collections.Counter[str] = collections.Counter()
+
+
+def request_cached(
+    key: Callable[..., Any] = cachetools.keys.hashkey
+) -> Callable[[F], F]:
+    """Decorate a function so its results are memoized per request.
+
+    `key` is called with the function's arguments to build the cache key,
+    like `cachetools.cached()`'s `key`.
+    """
+
+    def decorator(func: F) -> F:
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not flask.has_app_context():
+                return func(*args, **kwargs)
+
+            cache: dict[Any, Any] = flask.g.setdefault(_G_ATTR, {})
+            k = (name, key(*args, **kwargs))
+            try:
+                ret = cache[k]
+                hit = True
+            except KeyError:
+                ret = cache[k] = func(*args, **kwargs)
+                hit = False
+
+            with _stats_lock:
+                (_hits if hit else _misses)[name] += 1
+            return ret
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def get_stats() -> dict[str, dict[str, int]]:
+    """Get the number of hits (recomputations avoided) & misses, by function."""
+    with _stats_lock:
+        return {
+            name: {"hits": _hits[name], "misses": _misses[name]}
+            for name in sorted(_hits.keys() | _misses.keys())
+        }
@@ -2,13 +2,17 @@
 
 
 import dataclasses as dc
+import functools
 import logging
-from typing import Final
+from typing import Any, Final
 
 import cachetools.func
+import cachetools.keys
+from universal_utils.validation import RecordValidator
 
 from ..config import MAX_CACHE_MINS
 from .connections import mou_request
+from .request_cache import request_cached
 
 
 @dc.dataclass(frozen=True)
@@ -29,10 +33,22 @@ class _WBSTableCache:
     border_left_columns: list[str]
     page_size: int
 
+    @functools.cached_property
+    def validator(self) -> RecordValidator:
+        """Compile the record validator, once per (cached) config."""
+        return RecordValidator(
+            self.simple_dropdown_menus, self.conditional_dropdown_menus
+        )
+
 
 CacheType = dict[str, _WBSTableCache]  # The response dict from '/table/config'
 
 
+def _wbs_key(parser: "TableConfigParser", *args: Any) -> tuple[Any, ...]:
+    """Key by the WBS, so all of a request's parser instances share a memo."""
+    return cachetools.keys.hashkey(parser._wbs_l1, *args)  # pylint:disable=W0212
+
+
 class TableConfigParser:  # pylint: disable=R0904
     """Manage caching and parsing responses from '/table/config'."""
 
@@ -80,6 +96,7 @@ class TableConfigParser:  # pylint: disable=R0904
             for k, v in mou_request("GET", "/table/config").items()
         }
 
+    @request_cached(key=_wbs_key)
     def get_table_columns(self) -> list[str]:
         """Get table column's names."""
         cols = self._configs[self._wbs_l1].columns
@@ -107,6 +124,7 @@ class TableConfigParser:  # pylint: disable=R0904
         except KeyError:
             return column
 
+    @request_cached(key=_wbs_key)
     def get_simple_column_dropdown_menu(self, column: str) -> list[str]:
         """Get dropdown menu for a column."""
         return sorted(self._configs[self._wbs_l1].simple_dropdown_menus[column])
@@ -115,6 +133,7 @@ class TableConfigParser:  # pylint: disable=R0904
         """Get dropdown menu for a column."""
         return self.get_simple_column_dropdown_menu(self.const.WBS_L2)
 
+    @request_cached(key=_wbs_key)
     def get_labor_categories_w_abbrevs(self) -> list[tuple[str, str]]:
         """Get list of labors  and their abbreviations.."""
         return sorted(self._configs[self._wbs_l1].labor_categories, key=lambda k: k[1])
@@ -143,6 +162,7 @@ class TableConfigParser:  # pylint: disable=R0904
         """Get the columns that must be filled in by user."""
         return self._configs[self._wbs_l1].mandatories
 
+    @request_cached(key=_wbs_key)
     def get_always_hidden_columns(self) -> list[str]:
         """Get the columns that should never be shown to the user.
 
@@ -191,6 +211,10 @@ class TableConfigParser:  # pylint: disable=R0904
             parent_col_option
         ]
 
+    def get_record_validator(self) -> RecordValidator:
+        """Get the validator shared with the REST server."""
+        return self._configs[self._wbs_l1].validator
+
     def get_column_width(self, column: str, default: int = 35) -> int:
         """Get the pixel width of a given column."""
         try:
@@ -5,7 +5,12 @@ import logging
 import dash_bootstrap_components as dbc  # type: ignore[import]
 import visdcc  # type: ignore[import]
 from dash import dcc, html, no_update  # type: ignore[import]
-from dash.dependencies import Input, Output, State  # type: ignore
+from dash.dependencies import (  # type: ignore
+    ClientsideFunction,
+    Input,
+    Output,
+    State,
+)
 
 from .config import AUTO_RELOAD_MINS, ENV, REDIRECT_WBS, app
 from .contents import wbs_generic_layout
@@ -131,15 +136,17 @@ def layout() -> None:
     prevent_initial_call=True,
 )
 def interval_page_reload(_: int) -> str:
-    """Automatically refresh/reload page on interval.
+    """Reload the page on interval, if the session cookie has expired.
 
-    This will help re-check for login credentials in case of an expired
-    session cookie. The user will remain on the same page, unless they
-    need to log in again.
+    Otherwise, the page is kept up-to-date by change notifications
+    (see `utils/change_notifications.py`). The user will remain on the
+    same page, unless they need to log in again.
     """
     logging.critical(
         f"'{du.triggered()}' -> interval_page_reload() {AUTO_RELOAD_MINS=} {CurrentUser.get_summary()=}"
     )
+    if CurrentUser.is_loggedin():
+        return no_update
     return du.RELOAD
 
 
@@ -197,7 +204,8 @@ def main_redirect(_: bool, s_urlpath: str) -> tuple[str, bool, str]:
     return no_update, False, user_label
 
 
-@app.callback(  # type: ignore[misc]
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_navbar_collapse"),
     [
         Output("navbar-collapse", "is_open"),
         Output("navbar-collapse", "className"),
@@ -206,9 +214,13 @@ def main_redirect(_: bool, s_urlpath: str) -> tuple[str, bool, str]:
     [Input("navbar-toggler", "n_clicks")],
     [State("navbar-collapse", "is_open")],
 )
+
+
 def toggle_navbar_collapse(n_clicks: int, is_open: bool) -> tuple[bool, str, bool]:
     """Toggle the navbar collapse on small screens.
 
+    Runs clientside (see assets/ui_toggles.js), this is its oracle.
+
     https://dash-bootstrap-components.opensource.faculty.ai/docs/components/navbar/#
     """
     if n_clicks:
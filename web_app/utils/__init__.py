@@ -1,3 +1,11 @@
 """Init."""
 
-from . import dash_utils, types, utils  # noqa: F401
+from . import (  # noqa: F401
+    background,
+    callback_metrics,
+    change_notifications,
+    dash_utils,
+    profiler,
+    types,
+    utils,
+)
@@ -0,0 +1,170 @@
+"""Run heavy admin callbacks in background processes.
+
+With `dash[diskcache]` installed, an `admin_callback()` runs in a
+subprocess (so the Flask worker is free for everyone else), shows its
+progress, can be canceled, and its result is cached on disk -- by the WBS,
+the snapshot, and the WBS's data version, so an unchanged WBS isn't
+re-computed (nor is a process started for it). Otherwise, it's a plain
+callback.
+"""
+
+
+import functools
+import logging
+import os
+import tempfile
+from typing import Any, Callable, Final, TypeVar
+
+import cachetools.func
+import flask
+from dash import DiskcacheManager, callback_context  # type: ignore[import]
+from dash.exceptions import PreventUpdate  # type: ignore[import]
+
+from ..config import ENV, MAX_CACHE_MINS, app
+from ..data_source import connections
+from ..data_source import data_source as src
+from ..data_source.connections import CurrentUser
+from . import dash_utils as du
+
+T = TypeVar("T")
+
+SetProgress = Callable[[tuple[int, int, str]], None]  # (value, max, label)
+
+# the admin callbacks' states -- see `_cache_by()`
+URL_STATE: Final[str] = "url.pathname"
+SNAPSHOT_STATE: Final[str] = "wbs-current-snapshot-ts.value"
+
+# how long a WBS's data version is re-used for new jobs' cache keys
+DATA_VERSION_TTL_SECS: Final[float] = 5.0
+
+_NO_JOB: Final[int] = 0  # the "job" (pid) of an already-cached result
+
+
+def _require_admin() -> None:
+    """Let only admins through (run it in the request)."""
+    if not CurrentUser.is_admin():
+        logging.warning("Non-admin tried to run an admin callback")
+        raise PreventUpdate
+
+
+@cachetools.func.ttl_cache(ttl=DATA_VERSION_TTL_SECS)
+def _data_version(wbs_l1: str) -> str:
+    """Get the WBS's live data version (a REST call, so re-used briefly)."""
+    return str(src.pull_changes(wbs_l1)["version"])
+
+
+def _cache_by() -> tuple[str, str]:
+    """Get the rest of a result's cache key: the WBS & its data version.
+
+    This runs in the request (the job doesn't), so it's also where only
+    admins are let through. Snapshots don't change, so their version is ''.
+    Dash calls this for every progress poll too, but a poll's key was made
+    when its job started -- so, then, nothing else is looked up.
+    """
+    _require_admin()
+    if flask.request.args.get("cacheKey"):  # a poll
+        return "", ""
+    wbs_l1 = du.get_wbs_l1(callback_context.states[URL_STATE])
+    if callback_context.states.get(SNAPSHOT_STATE):
+        return wbs_l1, ""
+    return wbs_l1, _data_version(wbs_l1)
+
+
+class _Manager(DiskcacheManager):  # type: ignore[misc]
+    """A `DiskcacheManager` that doesn't start a job for a cached result.
+
+    The (already-ready) result is returned by the first poll.
+    """
+
+    def call_job_fn(self, key: str, job_fn: Any, args: Any, context: Any) -> int:
+        if self.result_ready(key):
+            return _NO_JOB
+        pid: int = super().call_job_fn(key, job_fn, args, context)
+        return pid
+
+    def terminate_job(self, job: Any) -> None:
+        if int(job or _NO_JOB) != _NO_JOB:  # pid 0 isn't one to kill
+            super().terminate_job(job)
+
+
+def _make_manager() -> Any:
+    """Make the background-callback manager, if the dependencies are installed."""
+    if not ENV.BACKGROUND_CALLBACKS:
+        return None
+    try:
+        import diskcache  # type: ignore[import]  # pylint:disable=import-outside-toplevel
+
+        # shared by all the web app's processes -- any one may poll for a result
+        cache_dir = ENV.BACKGROUND_CACHE_DIR or os.path.join(
+            tempfile.gettempdir(), "mou-background-callbacks"
+        )
+        return _Manager(
+            diskcache.Cache(cache_dir),
+            cache_by=[_cache_by],
+            expire=MAX_CACHE_MINS * 60,
+        )
+    except ImportError:
+        logging.warning("dash[diskcache] is not installed: admin callbacks block")
+        return None
+
+
+MANAGER: Final = _make_manager()
+
+
+def _no_progress(_: tuple[int, int, str]) -> None:
+    pass
+
+
+def admin_callback(
+    *dependencies: Any,
+    progress: list[Any],
+    running: list[tuple[Any, Any, Any]],
+    cancel: list[Any],
+    cache_args_to_ignore: list[int],
+    **kwargs: Any,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Register an admin-only callback, to run in the background if possible.
+
+    The function is called with `set_progress()` first (a no-op if not in
+    the background -- there, `progress`, `running` & `cancel` are unused).
+    Its states must include `URL_STATE` & `SNAPSHOT_STATE`; pass the
+    indexes of its other arguments that are not part of the result's cache
+    key (ex: the button's `n_clicks`).
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        if MANAGER:
+            return app.callback(  # type: ignore[no-any-return]
+                *dependencies,
+                background=True,
+                manager=MANAGER,
+                progress=progress,
+                running=running,
+                cancel=cancel,
+                cache_args_to_ignore=cache_args_to_ignore,
+                **kwargs,
+            )(func)
+
+        @functools.wraps(func)
+        def in_foreground(*args: Any) -> T:
+            _require_admin()
+            return func(_no_progress, *args)
+
+        return app.callback(*dependencies, **kwargs)(  # type: ignore[no-any-return]
+            in_foreground
+        )
+
+    return decorator
+
+
+def gather(
+    set_progress: SetProgress, label: str, calls: list[Callable[[], T]]
+) -> list[T]:
+    """Like `connections.gather()`, but report the progress after each batch."""
+    results: list[T] = []
+    batch = max(1, ENV.REST_FANOUT_MAX_WORKERS)
+    for i in range(0, len(calls), batch):
+        set_progress((i, len(calls), f"{label} ({i}/{len(calls)})"))
+        results += connections.gather(*calls[i : i + batch])
+    set_progress((len(calls), len(calls), f"{label} ({len(calls)}/{len(calls)})"))
+    return results
@@ -0,0 +1,114 @@
+"""Per-callback timing & payload instrumentation.
+
+Every Dash callback is one POST to `/_dash-update-component`, so the
+callback is instrumented at the Flask request level, keyed by its
+output(s). The aggregates are served (to admins) at `METRICS_ROUTE`.
+"""
+
+
+import dataclasses as dc
+import threading
+import time
+from typing import Any, Final
+
+import flask
+import werkzeug
+
+from ..config import ENV, server
+from ..data_source import request_cache
+from ..data_source.connections import G_REQUEST_TIMES, CurrentUser
+
+METRICS_ROUTE: Final[str] = "/debug/callback-metrics"
+_DASH_CALLBACK_PATH: Final[str] = "/_dash-update-component"
+
+
+@dc.dataclass
+class CallbackStats:
+    """Aggregate stats for one callback."""
+
+    calls: int = 0
+    errors: int = 0
+    wall_seconds: float = 0.0
+    max_wall_seconds: float = 0.0
+    rest_calls: int = 0
+    rest_seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    def add(
+        self, wall: float, rest_times: list[float], bytes_in: int, bytes_out: int
+    ) -> None:
+        """Add one call's measurements."""
+        self.calls += 1
+        self.wall_seconds += wall
+        self.max_wall_seconds = max(self.max_wall_seconds, wall)
+        self.rest_calls += len(rest_times)
+        self.rest_seconds += sum(rest_times)
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+
+_lock = threading.Lock()
+_stats: dict[str, CallbackStats] = {}
+
+
+def get_stats() -> dict[str, dict[str, Any]]:
+    """Get every callback's stats, most total wall time first."""
+    with _lock:
+        by_wall = sorted(_stats.items(), key=lambda kv: -kv[1].wall_seconds)
+        return {
+            output: dc.asdict(stats)
+            | {"mean_wall_seconds": stats.wall_seconds / stats.calls}
+            for output, stats in by_wall
+        }
+
+
+def _callback_id() -> str:
+    try:
+        return str(flask.request.get_json()["output"])
+    except Exception:  # pylint:disable=broad-except
+        return "unknown"
+
+
+@server.before_request  # type: ignore[misc]
+def start_callback_timer() -> None:
+    """Start timing a callback."""
+    if flask.request.path == _DASH_CALLBACK_PATH:
+        flask.g.callback_start = time.monotonic()
+
+
+@server.after_request  # type: ignore[misc]
+def record_callback(
+    response: werkzeug.wrappers.Response,
+) -> werkzeug.wrappers.Response:
+    """Record the callback's wall time, REST calls, and payload sizes."""
+    if (start := flask.g.pop("callback_start", None)) is None:
+        return response
+
+    wall = time.monotonic() - start
+    bytes_out = response.calculate_content_length() or 0
+    output = _callback_id()
+    with _lock:
+        stats = _stats.setdefault(output, CallbackStats())
+        stats.add(
+            wall,
+            flask.g.get(G_REQUEST_TIMES, []),
+            flask.request.content_length or 0,
+            bytes_out,
+        )
+        if response.status_code >= 400:
+            stats.errors += 1
+    return response
+
+
+@server.route(METRICS_ROUTE)  # type: ignore[misc]
+def callback_metrics() -> werkzeug.wrappers.Response:
+    """Serve the aggregated callback (and request-cache) stats, as JSON."""
+    if not (ENV.DEBUG or CurrentUser.is_loggedin() and CurrentUser.is_admin()):
+        flask.abort(403)
+    return flask.jsonify(
+        {
+            "callbacks": get_stats(),
+            "request_cache": request_cache.get_stats(),
+        }
+    )
@@ -0,0 +1,94 @@
+"""Tell open pages what changed, as server-sent events.
+
+Each page's `EventSource` (see `assets/change_notifications.js`) is
+relayed the REST server's `/changes/` long-polls, then updates only what
+changed -- instead of reloading the whole page on an interval.
+"""
+
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Final, Generator, Iterator
+
+import flask
+import werkzeug
+
+from ..config import ENV, server
+from ..data_source import data_source as src
+from ..data_source.connections import CurrentUser, DataSourceException
+from . import dash_utils as du
+
+CHANGES_ROUTE: Final[str] = "/changes/<wbs_l1>"
+CHANGES_EVENT: Final[str] = "changes"
+EXPIRED_EVENT: Final[str] = "expired"  # the page should log in again
+_RETRY_MS: Final[int] = 5 * 1000  # after a disconnect
+_ERROR_RETRY_MS: Final[int] = 30 * 1000  # after the REST server failed
+_BUSY_RETRY_MS: Final[int] = 60 * 1000  # when there are too many streams
+
+# each stream holds a worker thread, so only so many at a time
+_STREAMS: Final = threading.BoundedSemaphore(ENV.CHANGES_MAX_STREAMS)
+
+
+def _event(event: str, data: dict[str, Any], version: float | None = None) -> str:
+    """Format a server-sent event."""
+    lines = [f"event: {event}", f"data: {json.dumps(data)}"]
+    if version is not None:  # the browser sends it back on reconnecting
+        lines.append(f"id: {version}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _stream(wbs_l1: str, since: float) -> Iterator[str]:
+    """Relay the changes until it's time for the browser to reconnect."""
+    yield f"retry: {_RETRY_MS}\n\n"
+    deadline = time.monotonic() + ENV.CHANGES_STREAM_MINS * 60
+    try:
+        if not since:
+            since = src.pull_changes(wbs_l1)["version"]
+            yield f"id: {since}\n\n"
+
+        while time.monotonic() < deadline:
+            changes = src.pull_changes(wbs_l1, since, ENV.CHANGES_WAIT_SECS)
+            if changes["version"] == since:
+                yield ": nothing changed\n\n"  # also finds out if the page is gone
+                continue
+            since = changes["version"]
+            yield _event(CHANGES_EVENT, changes, since)
+    except DataSourceException:
+        logging.exception(f"Could not get changes ({wbs_l1=}), reconnecting...")
+        yield f"retry: {_ERROR_RETRY_MS}\n\n"  # back off
+
+
+def _limited(stream: Iterator[str]) -> Generator[str, None, None]:
+    """Relay the stream if there's room for another, else have the browser retry later.
+
+    The room is taken once the response starts, & given back when it ends.
+    """
+    if not _STREAMS.acquire(blocking=False):
+        logging.warning("Too many change streams, the page will reconnect later")
+        yield f"retry: {_BUSY_RETRY_MS}\n\n"
+        return
+    try:
+        yield from stream
+    finally:
+        _STREAMS.release()
+
+
+@server.route(CHANGES_ROUTE)  # type: ignore[misc]
+def stream_changes(wbs_l1: str) -> werkzeug.wrappers.Response:
+    """Stream what changed in the WBS, as server-sent events."""
+    if du.root_is_not_wbs(f"/{wbs_l1}"):
+        flask.abort(404)  # the browser won't retry
+
+    if not CurrentUser.is_loggedin():
+        return flask.Response(_event(EXPIRED_EVENT, {}), mimetype="text/event-stream")
+    if not CurrentUser.is_loggedin_with_permissions():
+        flask.abort(403)
+
+    since = float(flask.request.headers.get("Last-Event-ID") or 0)
+    return flask.Response(
+        flask.stream_with_context(_limited(_stream(wbs_l1, since))),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,50 @@
+"""Opt-in profiling of individual Dash callbacks, for admins.
+
+Enable with `PROFILE_DIR`, then (as an admin) send the callback request
+with the `X-MOU-Profile: true` header, or set the `mou-profile=true`
+cookie in the browser.
+"""
+
+
+from typing import Final
+
+import flask
+from universal_utils.profiling import RequestProfiler
+
+from ..config import ENV, server
+from ..data_source.connections import CurrentUser
+
+PROFILE_HEADER: Final[str] = "X-MOU-Profile"
+PROFILE_COOKIE: Final[str] = "mou-profile"
+_DASH_CALLBACK_PATH: Final[str] = "/_dash-update-component"
+
+
+def _is_requested() -> bool:
+    return "true" in (
+        flask.request.headers.get(PROFILE_HEADER, "").lower(),
+        flask.request.cookies.get(PROFILE_COOKIE, "").lower(),
+    )
+
+
+@server.before_request  # type: ignore[misc]
+def start_profiler() -> None:
+    """Start profiling the callback, if enabled & requested by an admin."""
+    if not ENV.PROFILE_DIR or flask.request.path != _DASH_CALLBACK_PATH:
+        return
+    if not _is_requested() or not CurrentUser.is_admin():
+        return
+
+    try:
+        output = flask.request.get_json()["output"]
+    except Exception:  # pylint:disable=broad-except
+        output = "unknown"
+    profiler = RequestProfiler(ENV.PROFILE_DIR, f"callback_{output}")
+    if profiler.start():
+        flask.g.profiler = profiler
+
+
+@server.teardown_request  # type: ignore[misc]
+def stop_profiler(_: BaseException | None) -> None:
+    """Stop profiling & dump, if the callback was profiled."""
+    if profiler := flask.g.pop("profiler", None):
+        profiler.stop()
@@ -23,3 +23,7 @@ TDDown = dict[str, dict[str, list[_StrDict]]]  # dropdown
 TDDownCond = list[dict[str, _StrDict | list[_StrDict]]]  # dropdown_conditional
 TFocus = dict[str, int] | None  # which cell to focus
 TTooltips = dict[str, dict[str, DashVal]]
+
+
+# "wbs-ui-config" store: what the clientside callbacks need (assets/ui_toggles.js)
+UIConfig = dict[str, object]